@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catalog benchmark suite for tess_infos, on synthetic catalogs.
+
+Generates synthetic catalogs with the exact schema of the real one (see
+tess_infos.synthetic) at the given row counts, writes them in every
+storage format, and measures for each storage backend, in a fresh
+interpreter each:
+    load          time of catalog(...)
+    load heap     memory that pyarrow allocated for catalog(...); the 
+                  memory-mapped backend must not copy the file into the heap, 
+                  and fails the benchmark if it does
+    peak memory   maximum resident memory of the process after all queries
+    single TIC    median latency of cat.get(tic_id=..., keys='default')
+    batch TICs    throughput of cat.get(tic_id=[1000 TICs], keys='default')
+    sector        median latency of cat.get(sector=..., keys='default')
+
+Usage:
+    python benchmarks/bench_catalog.py [--rows 10000 100000] [--backends strings pandas lazy memory_map dataset cache] [--workdir /tmp/bench]
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os, sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from tess_infos.tess_infos import convert_catalog, convert_to_dataset
+from tess_infos.synthetic import write_catalog
+
+
+
+
+#::: the storage backends: which file to open, and how
+BACKENDS = {'strings': ('strings.feather', {}),
+            'pandas': ('typed.feather', {}),
+            'lazy': ('typed.feather', {'lazy': True}),
+            'memory_map': ('typed_uncompressed.feather', {'memory_map': True}),
+            'dataset': ('typed_dataset', {}),
+            'cache': ('typed.feather', {'cache': True, 'lazy': True})}
+
+#::: the memory-mapped backend may allocate at most this much heap on load (only small buffers, no columns)
+MAX_MAPPED_HEAP_MB = 1.
+
+#::: runs in a fresh interpreter; prints all measurements as JSON
+SNIPPET = """
+import sys, json, resource
+import numpy as np
+import pyarrow as pa
+from time import perf_counter
+from tess_infos.tess_infos import catalog
+path, kwargs, repeat = sys.argv[1], json.loads(sys.argv[2]), int(sys.argv[3])
+
+t0 = perf_counter()
+heap = pa.total_allocated_bytes()
+cat = catalog(path=path, **kwargs)
+load = perf_counter() - t0
+heap = pa.total_allocated_bytes() - heap
+
+rng = np.random.default_rng(1)
+tic_ids = cat._tic_sorted[rng.integers(0, len(cat._tic_sorted), repeat + 1000)]
+
+single = []
+for tic_id in tic_ids[:repeat]:
+    t0 = perf_counter()
+    cat.get(tic_id=int(tic_id), keys='default')
+    single.append(perf_counter() - t0)
+
+t0 = perf_counter()
+cat.get(tic_id=tic_ids[repeat:], keys='default')
+batch = 1000 / (perf_counter() - t0)
+
+sector = []
+for s in range(1, 27):
+    t0 = perf_counter()
+    cat.get(sector=s, keys='default')
+    sector.append(perf_counter() - t0)
+
+#::: the peak resident memory (on Linux, ru_maxrss also counts the parent process before the fork)
+try:
+    with open('/proc/self/status') as f:
+        rss = [int(line.split()[1]) * 1024 for line in f if line.startswith('VmHWM:')][0]
+except (OSError, IndexError):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+print(json.dumps({'load': load, 'heap_mb': heap / 2**20, 'peak_mb': rss / 2**20, 'single_ms': 1e3*np.median(single),
+                  'batch_per_s': batch, 'sector_ms': 1e3*np.median(sector)}))
+"""
+
+
+
+
+def prepare(workdir, n_rows, seed=42):
+    """
+    Write one synthetic catalog in all storage formats (see BACKENDS).
+
+    Parameters
+    ----------
+    workdir : str
+        The directory for all files.
+    n_rows : int
+        The number of targets.
+    seed : int, optional
+        The random seed. The default is 42.
+
+    Returns
+    -------
+    None.
+    """
+
+    write_catalog(os.path.join(workdir, 'strings.feather'), n_rows=n_rows, seed=seed)
+    convert_catalog(os.path.join(workdir, 'strings.feather'), os.path.join(workdir, 'typed.feather'))
+    convert_catalog(os.path.join(workdir, 'strings.feather'), os.path.join(workdir, 'typed_uncompressed.feather'), compression='uncompressed')
+    convert_to_dataset(os.path.join(workdir, 'typed.feather'), os.path.join(workdir, 'typed_dataset'))
+
+
+
+def measure(path, kwargs, repeat=200):
+    """
+    Run all measurements for one backend in a fresh interpreter.
+
+    Parameters
+    ----------
+    path : str
+        The catalog file (or dataset directory).
+    kwargs : dict
+        The arguments of catalog(), e.g. {'lazy': True}.
+    repeat : int, optional
+        Number of single-TIC queries. The default is 200.
+
+    Returns
+    -------
+    results : dict
+    """
+
+    env = dict(os.environ, PYTHONPATH=ROOT+os.pathsep+os.environ.get('PYTHONPATH',''))
+    out = subprocess.check_output([sys.executable, '-c', SNIPPET, path, json.dumps(kwargs), str(repeat)], env=env)
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Catalog benchmark suite for tess_infos, on synthetic catalogs.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help='numbers of targets of the synthetic catalogs')
+    parser.add_argument('--backends', type=str, nargs='+', default=list(BACKENDS), choices=list(BACKENDS), help='storage backends')
+    parser.add_argument('--repeat', type=int, default=200, help='number of single-TIC queries')
+    parser.add_argument('--workdir', type=str, default=None, help='directory for the synthetic catalogs (kept); defaults to a temporary one')
+    args = parser.parse_args()
+
+    #::: catalog(path=...) permanently saves its path, so restore the stored one afterwards
+    savefile = os.path.join(ROOT, 'tess_infos', 'tess_infos_path.txt')
+    stored = open(savefile).read() if os.path.isfile(savefile) else None
+
+    workdir = tempfile.mkdtemp() if args.workdir is None else args.workdir
+    print('{:>8} {:>11} {:>9} {:>15} {:>12} {:>13} {:>15} {:>11}'.format('rows', 'backend', 'load [s]', 'load heap [MB]', 'peak [MB]', 
+                                                                       'single [ms]', 'batch [TIC/s]', 'sector [ms]'))
+    failed = []
+    try:
+        for n_rows in args.rows:
+            subdir = os.path.join(workdir, str(n_rows))
+            if not os.path.isdir(os.path.join(subdir, 'typed_dataset')): #written last
+                os.makedirs(subdir, exist_ok=True)
+                prepare(subdir, n_rows)
+            for backend in args.backends:
+                filename, kwargs = BACKENDS[backend]
+                if backend == 'cache':
+                    measure(os.path.join(subdir, filename), kwargs, repeat=1) #build the cache once, then measure warm starts
+                res = measure(os.path.join(subdir, filename), kwargs, repeat=args.repeat)
+                print('{:>8} {:>11} {:>9.3f} {:>15.1f} {:>12.0f} {:>13.3f} {:>15.0f} {:>11.2f}'.format(n_rows, backend, res['load'], res['heap_mb'], res['peak_mb'],
+                                                                                                     res['single_ms'], res['batch_per_s'], res['sector_ms']))
+                if kwargs.get('memory_map', False) and (res['heap_mb'] > MAX_MAPPED_HEAP_MB):
+                    failed.append(n_rows)
+    finally:
+        if stored is not None:
+            with open(savefile, 'w') as f:
+                f.write(stored)
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    if len(failed) > 0:
+        print('FAILED: memory_map copied the catalog into the heap on load (rows: {})'.format(', '.join(str(n) for n in failed)))
+    sys.exit(1 if len(failed) > 0 else 0)
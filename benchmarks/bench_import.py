@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import-time benchmark for tess_infos.
+
+Measures the cold-start cost of `from tess_infos.tess_infos import catalog`
+in fresh interpreters, and fails if it pulls in any of the heavy modules
+that the catalog does not need (or exceeds an optional time budget).
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 5] [--max-seconds 1.0]
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os, sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+
+
+
+#::: modules that must never be imported together with the catalog
+FORBIDDEN = ['matplotlib', 'seaborn', 'tqdm', 'feather']
+
+#::: runs in a fresh interpreter; prints the import time and all loaded top-level modules
+SNIPPET = """
+import sys, json
+from time import perf_counter
+t0 = perf_counter()
+from tess_infos.tess_infos import catalog
+t1 = perf_counter()
+print(json.dumps({'seconds': t1-t0, 'modules': sorted(set(m.split('.')[0] for m in sys.modules))}))
+"""
+
+
+
+def measure(repeat=5):
+    """
+    Import the catalog in fresh interpreters.
+
+    Parameters
+    ----------
+    repeat : int, optional
+        Number of fresh interpreters. The default is 5.
+
+    Returns
+    -------
+    seconds : array of float
+        The import time of each run.
+    modules : list of str
+        All top-level modules loaded by the import.
+    """
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root+os.pathsep+os.environ.get('PYTHONPATH',''))
+
+    seconds = []
+    for i in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', SNIPPET], env=env)
+        res = json.loads(out.decode().strip().splitlines()[-1])
+        seconds.append(res['seconds'])
+
+    return np.array(seconds), res['modules']
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import-time benchmark for tess_infos.')
+    parser.add_argument('--repeat', type=int, default=5, help='number of fresh interpreters')
+    parser.add_argument('--max-seconds', type=float, default=None, help='fail if the median import time exceeds this')
+    args = parser.parse_args()
+
+    seconds, modules = measure(args.repeat)
+    print('import time: median {:.3f} s, min {:.3f} s, max {:.3f} s ({} runs)'.format(np.median(seconds), seconds.min(), seconds.max(), len(seconds)))
+
+    failed = False
+    forbidden = [m for m in FORBIDDEN if m in modules]
+    if len(forbidden) > 0:
+        print('FAILED: importing the catalog also imports', ', '.join(forbidden))
+        failed = True
+    if (args.max_seconds is not None) and (np.median(seconds) > args.max_seconds):
+        print('FAILED: median import time exceeds', args.max_seconds, 's')
+        failed = True
+
+    sys.exit(1 if failed else 0)
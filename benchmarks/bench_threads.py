@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-core scaling benchmark for tess_infos.
+
+Measures the load time of the catalog, the dtype conversion of an
+(all-string) catalog file, a full sector sweep, and a where-filter, for
+an increasing number of threads (see catalog(n_threads=...)), and prints
+the speedup over a single thread.
+
+Usage:
+    python benchmarks/bench_threads.py [--path catalog.feather] [--threads 1 2 4 8] [--repeat 3] [--sector 1]
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os, sys
+import argparse
+import tempfile
+import numpy as np
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tess_infos.tess_infos import catalog, convert_catalog
+
+
+
+
+def best_of(func, repeat=3):
+    """
+    Time a function.
+
+    Parameters
+    ----------
+    func : callable
+        The function to time.
+    repeat : int, optional
+        Number of runs. The default is 3.
+
+    Returns
+    -------
+    seconds : float
+        The fastest run.
+    """
+
+    seconds = []
+    for i in range(repeat):
+        t0 = perf_counter()
+        func()
+        seconds.append(perf_counter() - t0)
+    return min(seconds)
+
+
+
+def measure(path, n_threads, repeat=3, sector=1):
+    """
+    Run all benchmarks for one number of threads.
+
+    Parameters
+    ----------
+    path : str or None
+        Path to the catalog (feather) file; None uses the stored path.
+    n_threads : int
+        The number of threads.
+    repeat : int, optional
+        Number of runs per benchmark. The default is 3.
+    sector : int, optional
+        The sector for the sweep. The default is 1.
+
+    Returns
+    -------
+    results : dict
+        The seconds for each benchmark.
+    """
+
+    results = {}
+    results['load'] = best_of(lambda: catalog(path=path, keys='all', n_threads=n_threads), repeat)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        outpath = os.path.join(tmpdir, 'catalog.feather')
+        results['convert'] = best_of(lambda: convert_catalog(path, outpath, n_threads=n_threads), repeat)
+
+    cat = catalog(path=path, keys='all', n_threads=n_threads)
+    results['sector sweep'] = best_of(lambda: cat.get(sector=sector, keys='all'), repeat)
+    results['where'] = best_of(lambda: cat.get(where=[('TICv8_Tmag', '<', 12), ('TICv8_Teff', 'between', (3000, 6000))], keys='all'), repeat)
+    return results
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Multi-core scaling benchmark for tess_infos.')
+    parser.add_argument('--path', type=str, default=None, help='catalog (feather) file; defaults to the stored path')
+    parser.add_argument('--threads', type=int, nargs='+', default=None, help='numbers of threads; defaults to 1, 2, 4, ... up to all cores')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark (the fastest is reported)')
+    parser.add_argument('--sector', type=int, default=1, help='sector for the sweep')
+    args = parser.parse_args()
+
+    threads = args.threads
+    if threads is None:
+        n_cores = os.cpu_count() or 1
+        threads = sorted(set([2**i for i in range(int(np.log2(n_cores))+1)] + [n_cores]))
+
+    #::: catalog(path=...) permanently saves its path, so restore the stored one afterwards
+    savefile = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tess_infos', 'tess_infos_path.txt')
+    stored = open(savefile).read() if os.path.isfile(savefile) else None
+
+    all_results = {}
+    try:
+        for n in threads:
+            all_results[n] = measure(args.path, n, repeat=args.repeat, sector=args.sector)
+    finally:
+        if stored is not None:
+            with open(savefile, 'w') as f:
+                f.write(stored)
+
+    print('{:>8}'.format('threads') + ''.join('{:>22}'.format(name) for name in all_results[threads[0]]))
+    for n in threads:
+        print('{:>8}'.format(n) + ''.join('{:>10.3f} s ({:>5.1f}x)'.format(sec, all_results[threads[0]][name]/sec)
+                                           for name, sec in all_results[n].items()))
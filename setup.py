@@ -34,8 +34,9 @@ setup(
                  'Intended Audience :: Science/Research',
                  'License :: OSI Approved :: MIT License',
                  'Programming Language :: Python'],
-    install_requires=['feather-format>=0.4.1', 'pyarrow', 'pandas',
-                      'numpy', 'tqdm', 'matplotlib'],
+    install_requires=['pyarrow', 'pandas>=2.0', 'numpy'],
+    extras_require={'plotting': ['matplotlib', 'seaborn'],
+                    'spatial': ['scipy']},
     include_package_data = False
     )
 
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Command line interface of tess_infos, e.g.
+
+    python -m tess_infos serve --socket /tmp/tess_infos.sock
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import sys
+
+#::: my modules
+from tess_infos.server import main
+
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
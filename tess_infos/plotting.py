@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Optional plotting helpers for tess_infos.
+
+This module imports matplotlib and seaborn, and is therefore kept separate 
+from tess_infos.tess_infos, which only needs numpy, pandas and pyarrow.
+Import it only when you need it:
+    
+    from tess_infos import plotting
+    plotting.set_style()
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research, 
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109, 
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import seaborn as sns
+
+
+
+
+def set_style():
+    """
+    Apply the tess_infos plotting style (seaborn 'paper' context, ticks pointing inwards).
+    
+    This changes the global matplotlib settings, so it is never done on import.
+
+    Returns
+    -------
+    None.
+    """
+    
+    sns.set(context='paper', style='ticks', palette='deep', font='sans-serif', font_scale=1.5, color_codes=True)
+    sns.set_style({"xtick.direction": "in","ytick.direction": "in"})
+    sns.set_context(rc={'lines.markeredgewidth': 1})
@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A local query server for tess_infos, and a client with the same interface
+as the catalog.
+
+The server loads the catalog once, and answers requests over localhost
+HTTP or a Unix socket; all results are sent as Arrow IPC streams. Many
+short-lived scripts and notebooks on the same machine can then share one
+loaded catalog, and each only pays for its queries:
+
+    python -m tess_infos serve --socket /tmp/tess_infos.sock
+
+    from tess_infos.server import client
+    cat = client(unix_socket='/tmp/tess_infos.sock')
+    infos = cat.get(tic_id=259377017, keys='Tmag')
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import json
+import socket
+import argparse
+import http.client
+import http.server
+import socketserver
+import pandas as pd
+import pyarrow as pa
+
+#::: my modules
+from .tess_infos import catalog, SUMMARY_KEYS
+
+
+
+
+#::: the content type of all results
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+#::: the catalog methods the server answers, and whether they stream their result in batches
+METHODS = {'get': False,
+           'get_many': False,
+           'cone_search': False,
+           'crossmatch': False,
+           'observations': False,
+           'get_on_ccd': False,
+           'banyan_probabilities': False,
+           'get_association': False,
+           'aggregate': False,
+           'summary': False,
+           'histogram': False,
+           'find_comoving': False,
+           'find_comoving_pairs': False,
+           'data': False,
+           'iter_batches': True}
+
+#::: the errors the client re-raises with their original type (all others become a RuntimeError)
+ERRORS = {'KeyError': KeyError,
+          'ValueError': ValueError,
+          'TypeError': TypeError,
+          'ImportError': ImportError}
+
+
+
+def _json_default(obj):
+    """
+    Encode numpy (and pandas) values in requests as plain JSON.
+    """
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError('Cannot send '+str(type(obj))+' to the server.')
+
+
+
+def _to_arrow(df):
+    """
+    Convert a result to an Arrow table for sending.
+
+    The index and all dtypes travel along (categorical columns as 
+    dictionaries, with all their categories).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The result.
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+
+    return pa.Table.from_pandas(df, preserve_index=True)
+
+
+
+def _from_arrow(table):
+    """
+    Convert a received Arrow table back to a result (see _to_arrow()).
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+        The received table.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+
+    return table.to_pandas()
+
+
+
+def _where_from_json(where):
+    """
+    Turn the predicates of catalog.get(where=...) back into tuples (JSON only knows lists).
+    """
+    if (where is None) or (len(where) == 0):
+        return where
+    elif isinstance(where[0], str):
+        return tuple(where)
+    else:
+        return [tuple(w) for w in where]
+
+
+
+class _ChunkedWriter(object):
+    """
+    A file-like sink that sends an Arrow IPC stream as HTTP chunks, one chunk per send().
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.buffer = bytearray()
+        self.closed = False
+
+    def write(self, data):
+        self.buffer += bytes(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def send(self):
+        if len(self.buffer) > 0:
+            self.wfile.write(('%X\r\n' % len(self.buffer)).encode() + bytes(self.buffer) + b'\r\n')
+            self.wfile.flush()
+            self.buffer = bytearray()
+
+    def finish(self):
+        self.send()
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """
+    Answer the requests of the client (see client).
+
+    GET /info returns some information about the catalog as JSON.
+    POST /<method> calls the catalog method with the keyword arguments
+    given as JSON body, and returns the result as Arrow IPC stream
+    (204 if the result is None, 400 with the error as JSON on failure).
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        #::: Unix sockets have no client address
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            http.server.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _send(self, code, body=b'', content_type='application/json'):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/info':
+            return self._send(404, json.dumps({'error': 'KeyError', 'message': 'Unknown request: '+self.path}).encode())
+        cat = self.server.catalog
+        info = {'path': cat.path, 'keys': list(cat.keys), 'lazy': cat.lazy, 'n_rows': int(cat._n_rows)}
+        self._send(200, json.dumps(info).encode())
+
+    def do_POST(self):
+        method = self.path.strip('/')
+        try:
+            if method not in METHODS:
+                raise KeyError('Unknown request: '+self.path)
+            kwargs = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if 'where' in kwargs:
+                kwargs['where'] = _where_from_json(kwargs['where'])
+            if 'requests' in kwargs:
+                kwargs['requests'] = [tuple(r) for r in kwargs['requests']]
+            if METHODS[method]:
+                #::: compute the first batch before answering, so that errors can still be reported
+                batches = getattr(self.server.catalog, method)(**kwargs)
+                first = next(batches, None)
+            elif method == 'data':
+                result = self.server.catalog.data
+            else:
+                result = getattr(self.server.catalog, method)(**kwargs)
+        except Exception as e:
+            #::: (str() of a KeyError quotes its message)
+            message = e.args[0] if isinstance(e, KeyError) and (len(e.args) == 1) else str(e)
+            return self._send(400, json.dumps({'error': type(e).__name__, 'message': str(message)}).encode())
+        
+        if METHODS[method]:
+            return self._stream(first, batches)
+        if result is None:
+            return self._send(204)
+        sink = pa.BufferOutputStream()
+        table = _to_arrow(result)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        self._send(200, sink.getvalue().to_pybytes(), ARROW_STREAM)
+
+    def _stream(self, first, batches):
+        self.send_response(200)
+        self.send_header('Content-Type', ARROW_STREAM)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        sink = _ChunkedWriter(self.wfile)
+        schema = _to_arrow(first).schema if first is not None else pa.schema([])
+        try:
+            with pa.ipc.new_stream(sink, schema) as writer:
+                df2 = first
+                while df2 is not None:
+                    writer.write_table(_to_arrow(df2).cast(schema))
+                    sink.send()
+                    df2 = next(batches, None)
+            sink.finish()
+        except (BrokenPipeError, ConnectionResetError):
+            #::: the client stopped reading early
+            self.close_connection = True
+
+
+
+class _TCPHandler(_Handler):
+    #::: send small answers right away
+    disable_nagle_algorithm = True
+
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+
+def make_server(cat, host='127.0.0.1', port=8765, unix_socket=None, quiet=True):
+    """
+    Create a server for a loaded catalog (see serve()), without starting it.
+
+    Parameters
+    ----------
+    cat : catalog
+        The loaded catalog.
+    host : str, optional
+        The host to listen on. The default is '127.0.0.1' (this machine only).
+    port : int, optional
+        The port to listen on. The default is 8765.
+    unix_socket : str, optional
+        If given, listen on this Unix socket instead of host and port.
+        The default is None.
+    quiet : bool, optional
+        If False, log every request. The default is True.
+
+    Returns
+    -------
+    server : socketserver.BaseServer
+        Call server.serve_forever() to start it, and server.shutdown() to stop it.
+    """
+
+    if unix_socket is not None:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = _UnixServer(unix_socket, _Handler)
+    else:
+        server = _HTTPServer((host, port), _TCPHandler)
+    server.catalog = cat
+    server.quiet = quiet
+
+    #::: all requests run in parallel threads: the catalog itself serializes the few steps
+    #::: that change it (loading keys in lazy mode, and building its indexes)
+    return server
+
+
+
+def serve(path=None, host='127.0.0.1', port=8765, unix_socket=None, quiet=True, **kwargs):
+    """
+    Load the catalog once, and answer requests until interrupted (Ctrl+C).
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to the catalog, see catalog(). The default is None.
+    host, port, unix_socket, quiet :
+        See make_server().
+    **kwargs :
+        All other arguments of catalog(), e.g. keys, lazy, memory_map, cache, n_threads.
+
+    Returns
+    -------
+    None.
+    """
+
+    cat = catalog(path=path, **kwargs)
+    server = make_server(cat, host=host, port=port, unix_socket=unix_socket, quiet=quiet)
+    print('Serving the catalog on', unix_socket if unix_socket is not None else 'http://'+host+':'+str(port), '(Ctrl+C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if (unix_socket is not None) and os.path.exists(unix_socket):
+            os.remove(unix_socket)
+
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    An HTTP connection over a Unix socket.
+    """
+
+    def __init__(self, unix_socket, timeout=None):
+        http.client.HTTPConnection.__init__(self, 'localhost', timeout=timeout)
+        self.unix_socket = unix_socket
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_socket)
+
+
+
+class client(object):
+    """
+    Query a running server (see serve()) with the same interface as catalog.
+    """
+
+
+    def __init__(self, host='127.0.0.1', port=8765, unix_socket=None, timeout=None):
+        """
+        Connect to a running server.
+
+        Parameters
+        ----------
+        host : str, optional
+            The host of the server. The default is '127.0.0.1'.
+        port : int, optional
+            The port of the server. The default is 8765.
+        unix_socket : str, optional
+            If given, connect to the server on this Unix socket instead.
+            The default is None.
+        timeout : float, optional
+            The timeout of each request in seconds. The default is None.
+
+        Returns
+        -------
+        None.
+        """
+
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.timeout = timeout
+        self._conn = None
+
+        #::: check the connection right away
+        self.path = self._info()['path']
+
+
+
+    def _connection(self):
+        """
+        The (persistent) connection to the server.
+        """
+        if self._conn is None:
+            if self.unix_socket is not None:
+                self._conn = _UnixHTTPConnection(self.unix_socket, timeout=self.timeout)
+            else:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self._conn
+
+
+
+    def _request(self, method, endpoint, kwargs=None):
+        """
+        Send one request, and reconnect once if the server closed the connection.
+
+        Returns
+        -------
+        response : http.client.HTTPResponse
+        """
+
+        body = None if kwargs is None else json.dumps(kwargs, default=_json_default)
+        headers = {} if body is None else {'Content-Type': 'application/json'}
+        for attempt in range(2):
+            try:
+                self._connection().request(method, '/'+endpoint, body=body, headers=headers)
+                response = self._conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, ConnectionError):
+                self.close()
+                if attempt == 1:
+                    raise
+
+        if response.status == 400:
+            error = json.loads(response.read())
+            raise ERRORS.get(error['error'], RuntimeError)(error['message'])
+        elif response.status >= 300:
+            message = response.read().decode(errors='replace')
+            raise RuntimeError('The server answered '+str(response.status)+': '+message)
+        return response
+
+
+
+    def _call(self, method, **kwargs):
+        """
+        Call a catalog method on the server, and return its result.
+
+        Returns
+        -------
+        df2 : pandas.DataFrame or None
+        """
+
+        response = self._request('POST', method, kwargs)
+        if response.status == 204:
+            response.read()
+            return None
+        return _from_arrow(pa.ipc.open_stream(response.read()).read_all())
+
+
+
+    def _info(self):
+        response = self._request('GET', 'info')
+        return json.loads(response.read())
+
+
+
+    def close(self):
+        """
+        Close the connection to the server (it is reopened on the next request).
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+
+    @property
+    def keys(self):
+        """
+        The keys loaded by the server's catalog.
+        """
+        return self._info()['keys']
+
+
+
+    @property
+    def data(self):
+        """
+        The full catalog (all loaded keys) as a pandas.DataFrame, see catalog.data.
+        """
+        return self._call('data')
+
+
+
+    def get(self, tic_id=None, sector=None, keys=None, where=None, gaia_id=None, twomass=None, hip=None, tyc=None, kic=None):
+        """
+        See catalog.get().
+        """
+        df2 = self._call('get', tic_id=tic_id, sector=sector, keys=keys, where=where, 
+                         gaia_id=gaia_id, twomass=twomass, hip=hip, tyc=tyc, kic=kic)
+        if df2 is None:
+            print("This combination of TIC ID/Sectors is incorrect.")
+        return df2
+
+
+
+    def get_many(self, requests, concat=False):
+        """
+        See catalog.get_many().
+        """
+        requests = [(t, k) for t, k in requests]
+        df = self._call('get_many', requests=requests, concat=True)
+        if concat:
+            return df
+
+        #::: split the long-form result back into one DataFrame per request (with only its own keys)
+        results = []
+        for i, (_, keys) in enumerate(requests):
+            if i in df.index.get_level_values('request'):
+                df2 = df.xs(i, level='request')
+            else:
+                df2 = df.iloc[:0].droplevel('request')
+            df2 = df2[self._translate_keys(keys)]
+            df2.index = pd.RangeIndex(len(df2))
+            results.append(df2)
+        return results
+
+
+
+    def iter_batches(self, tic_id=None, sector=None, keys=None, where=None, batch_size=10000, arrow=False):
+        """
+        See catalog.iter_batches(); the batches are streamed from the server.
+        """
+        #::: send the request right away, so that errors are raised here (as by catalog.iter_batches())
+        response = self._request('POST', 'iter_batches', dict(tic_id=tic_id, sector=sector, keys=keys, where=where, batch_size=batch_size))
+        return self._iter_batches(response, arrow)
+
+
+
+    def _iter_batches(self, response, arrow):
+        """
+        Yield the batches of self.iter_batches() from the response stream.
+        """
+        finished = False
+        try:
+            for batch in pa.ipc.open_stream(response):
+                df2 = _from_arrow(pa.Table.from_batches([batch]))
+                if arrow:
+                    yield pa.RecordBatch.from_pandas(df2, preserve_index=False)
+                else:
+                    yield df2
+            response.read()
+            finished = True
+        finally:
+            #::: a stream that was not read to its end leaves the connection unusable
+            if not finished:
+                self.close()
+
+
+
+    def cone_search(self, ra, dec, radius, keys=None):
+        """
+        See catalog.cone_search().
+        """
+        return self._call('cone_search', ra=ra, dec=dec, radius=radius, keys=keys)
+
+
+
+    def crossmatch(self, ra, dec, radius, keys=None, nearest=False):
+        """
+        See catalog.crossmatch().
+        """
+        return self._call('crossmatch', ra=ra, dec=dec, radius=radius, keys=keys, nearest=nearest)
+
+
+
+    def observations(self, tic_id=None, sector=None, camera=None, ccd=None):
+        """
+        See catalog.observations().
+        """
+        return self._call('observations', tic_id=tic_id, sector=sector, camera=camera, ccd=ccd)
+
+
+
+    def get_on_ccd(self, sector, camera=None, ccd=None, keys=None):
+        """
+        See catalog.get_on_ccd().
+        """
+        return self._call('get_on_ccd', sector=sector, camera=camera, ccd=ccd, keys=keys)
+
+
+
+    def get_associations(self):
+        """
+        See catalog.get_associations().
+        """
+        return list(self.banyan_probabilities(tic_id=[]).columns)
+
+
+
+    def banyan_probabilities(self, tic_id=None, associations=None):
+        """
+        See catalog.banyan_probabilities().
+        """
+        return self._call('banyan_probabilities', tic_id=tic_id, associations=associations)
+
+
+
+    def get_association(self, association, min_prob=0.5, top=None, keys=None):
+        """
+        See catalog.get_association().
+        """
+        return self._call('get_association', association=association, min_prob=min_prob, top=top, keys=keys)
+
+
+
+    def aggregate(self, by='sector', values=SUMMARY_KEYS, stats=('count', 'mean', 'min', 'max')):
+        """
+        See catalog.aggregate().
+        """
+        return self._call('aggregate', by=by, values=values, stats=stats)
+
+
+
+    def summary(self, by='sector'):
+        """
+        See catalog.summary().
+        """
+        return self._call('summary', by=by)
+
+
+
+    def histogram(self, key, by='sector'):
+        """
+        See catalog.histogram().
+        """
+        return self._call('histogram', key=key, by=by)
+
+
+
+    def find_comoving(self, tic_id, max_separation=1., max_dv=2., n_sigma=3., keys=None):
+        """
+        See catalog.find_comoving().
+        """
+        return self._call('find_comoving', tic_id=tic_id, max_separation=max_separation, max_dv=max_dv, n_sigma=n_sigma, keys=keys)
+
+
+
+    def find_comoving_pairs(self, max_separation=1., max_dv=2., n_sigma=3.):
+        """
+        See catalog.find_comoving_pairs().
+        """
+        return self._call('find_comoving_pairs', max_separation=max_separation, max_dv=max_dv, n_sigma=n_sigma)
+
+
+
+    _translate_keys = catalog._translate_keys
+    get_all_keys = staticmethod(catalog.get_all_keys)
+    get_schema = staticmethod(catalog.get_schema)
+    get_default_keys = staticmethod(catalog.get_default_keys)
+    get_magnitude_keys = staticmethod(catalog.get_magnitude_keys)
+
+
+
+def main(argv=None):
+    """
+    The command line interface, see python -m tess_infos serve --help.
+    """
+
+    parser = argparse.ArgumentParser(prog='python -m tess_infos', description='tess_infos command line interface.')
+    commands = parser.add_subparsers(dest='command')
+    parser_serve = commands.add_parser('serve', help='load the catalog once, and answer queries from tess_infos.server.client')
+    parser_serve.add_argument('--path', type=str, default=None, help='path to the catalog; defaults to the stored path')
+    parser_serve.add_argument('--host', type=str, default='127.0.0.1', help='host to listen on')
+    parser_serve.add_argument('--port', type=int, default=8765, help='port to listen on')
+    parser_serve.add_argument('--socket', type=str, default=None, help='listen on this Unix socket instead of host and port')
+    parser_serve.add_argument('--keys', type=str, nargs='+', default=None, help='keys to load, see catalog(keys=...); defaults to all')
+    parser_serve.add_argument('--lazy', action='store_true', help='see catalog(lazy=True)')
+    parser_serve.add_argument('--memory-map', action='store_true', help='see catalog(memory_map=True)')
+    parser_serve.add_argument('--cache', action='store_true', help='see catalog(cache=True)')
+    parser_serve.add_argument('--n-threads', type=int, default=None, help='see catalog(n_threads=...)')
+    parser_serve.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args(argv)
+
+    if args.command != 'serve':
+        parser.print_help()
+        return 1
+
+    serve(path=args.path, host=args.host, port=args.port, unix_socket=args.socket, quiet=(not args.verbose),
+          keys=('all' if args.keys is None else args.keys), lazy=args.lazy, memory_map=args.memory_map, cache=args.cache, n_threads=args.n_threads)
+    return 0
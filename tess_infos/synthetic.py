@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A synthetic catalog with the exact schema of the real one, for benchmarks
+and offline tests.
+
+All keys of catalog.get_all_keys() are filled with plausible values:
+positions, distances, proper motions and magnitudes are consistent across
+the TICv8 and GAIADR2 keys, OBS_Sector/OBS_Camera/OBS_CCD follow the TESS
+observing pattern (one ecliptic hemisphere per year, consecutive sectors
+towards the ecliptic poles), and a few percent of targets are members of
+young associations (BANYAN_*) or of comoving groups. Like the real catalog
+file, all columns are stored as strings unless typed=True.
+
+    from tess_infos.synthetic import write_catalog
+    write_catalog('synthetic.feather', n_rows=100000)
+    cat = catalog(path='synthetic.feather')
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import numpy as np
+import pandas as pd
+
+#::: my modules
+from .tess_infos import ALL_KEYS, INT_KEYS, CATEGORY_KEYS, MAGNITUDE_KEYS, SCHEMA, FEATHER_CHUNKSIZE, _apply_schema
+
+
+
+
+#::: the young associations of BANYAN Sigma
+ASSOCIATIONS = ('118TAU', 'ABDMG', 'BPMG', 'CAR', 'CARN', 'CBER', 'COL', 'CRA', 'EPSC', 'ETAC',
+                'HYA', 'IC2391', 'IC2602', 'LCC', 'OCT', 'PL8', 'PLE', 'ROPH', 'TAU', 'THA',
+                'THOR', 'TWA', 'UCL', 'UCRA', 'UMA', 'USCO', 'XFOR')
+
+#::: the values of the categorical keys (None for missing)
+CATEGORIES = {'TICv8_version': ['20190415'],
+              'TICv8_objType': ['STAR'],
+              'TICv8_typeSrc': ['tmgaia2', 'tmgaia', 'hip', 'tmmgaia2'],
+              'TICv8_POSflag': ['gaia2', 'tmgaia2', 'hip'],
+              'TICv8_PMflag': ['gaia2', 'tgas', 'hip', None],
+              'TICv8_PARflag': ['gaia2', 'tgas', None],
+              'TICv8_TESSflag': ['gaiaj', 'gaiah', 'vjk', 'cdwrf', 'bpbj'],
+              'TICv8_SPFlag': ['spect', 'cdwrf', 'gaia2', None],
+              'TICv8_lumclass': ['DWARF', 'GIANT', 'SUBGIANT', None],
+              'TICv8_disposition': [None, None, None, 'SPLIT', 'DUPLICATE'],
+              'TICv8_EBVflag': ['panstarrs', 'schlegel', None],
+              'TICv8_distflag': ['bj2018', 'hip', None],
+              'TICv8_TeffFlag': ['gaiabp-rp', 'spect', 'cdwrf', None],
+              'TICv8_gaiaqflag': ['1', '0'],
+              'TICv8_starchareFlag': [None, None, 'cdwrf'],
+              'TICv8_VmagFlag': ['hip', 'tycho2v', 'tmgaia', 'ucac4'],
+              'TICv8_BmagFlag': ['hip', 'tycho2b', 'ucac4', None],
+              'GAIADR2_astrometric_primary_flag': ['False', 'True'],
+              'GAIADR2_duplicated_source': ['False', 'True'],
+              'GAIADR2_phot_variable_flag': ['NOT_AVAILABLE', 'VARIABLE']}
+
+#::: the fraction of missing values in the numeric keys
+MISSING = 0.05
+
+
+
+
+def _sky_to_ecliptic(ra, dec):
+    """
+    Convert equatorial to ecliptic coordinates (J2000, in degrees).
+    """
+    eps = np.radians(23.4393)
+    ra, dec = np.radians(ra), np.radians(dec)
+    lat = np.arcsin(np.sin(dec)*np.cos(eps) - np.cos(dec)*np.sin(eps)*np.sin(ra))
+    lon = np.arctan2(np.sin(ra)*np.cos(eps) + np.tan(dec)*np.sin(eps), np.cos(ra))
+    return np.degrees(lon) % 360, np.degrees(lat)
+
+
+
+def _sky_to_galactic(ra, dec):
+    """
+    Convert equatorial to galactic coordinates (J2000, in degrees).
+    """
+    rot = np.array([[-0.0548755604, -0.8734370902, -0.4838350155],
+                    [ 0.4941094279, -0.4448296300,  0.7469822445],
+                    [-0.8676661490, -0.1980763734,  0.4559837762]])
+    ra, dec = np.radians(ra), np.radians(dec)
+    xyz = rot @ np.array([np.cos(dec)*np.cos(ra), np.cos(dec)*np.sin(ra), np.sin(dec)])
+    return np.degrees(np.arctan2(xyz[1], xyz[0])) % 360, np.degrees(np.arcsin(np.clip(xyz[2], -1, 1)))
+
+
+
+def _observations(eclon, eclat, n_sectors, rng):
+    """
+    Simulate the TESS sectors, cameras and CCDs of each target.
+
+    Each year of 13 sectors covers one ecliptic hemisphere (south first),
+    and each sector a band of ecliptic longitude. Targets are observed in
+    more consecutive sectors towards the ecliptic poles (all 13 in the
+    continuous viewing zone), and the camera follows the ecliptic latitude.
+
+    Returns
+    -------
+    sectors, cameras, ccds : array of str
+        The ';'-joined sectors, cameras and CCDs of each target.
+    """
+
+    n_rows = len(eclon)
+    beta = np.abs(eclat)
+    n_obs = np.where(beta > 78, 13, np.clip(np.round(1/np.cos(np.radians(np.minimum(beta, 89)))), 1, 13)).astype(int)
+    first = (eclon // (360/13)).astype(int)
+    camera = np.clip((np.maximum(beta, 6) - 6) // 24 + 1, 1, 4).astype(int)
+    north = (eclat > 0)
+
+    sectors, cameras, ccds = [], [], []
+    for i in range(n_rows):
+        s = (first[i] + np.arange(n_obs[i])) % 13 + 1 + 13*north[i]
+        s = np.concatenate([s + 26*year for year in range((n_sectors + 25) // 26)])
+        s = np.sort(s[s <= n_sectors])
+        if len(s) == 0:
+            s = np.array([rng.integers(1, n_sectors+1)])
+        sectors.append(';'.join(map(str, s)))
+        cameras.append(';'.join([str(camera[i])]*len(s)))
+        ccds.append(';'.join(map(str, rng.integers(1, 5, len(s)))))
+    return np.array(sectors, dtype=object), np.array(cameras, dtype=object), np.array(ccds, dtype=object)
+
+
+
+def _banyan(n_rows, rng, fraction=0.03):
+    """
+    Simulate the BANYAN Sigma membership probabilities.
+
+    Returns
+    -------
+    columns : dict
+        BANYAN_YA_PROB, BANYAN_LIST_PROB_YAS, BANYAN_BEST_HYP and BANYAN_BEST_YA.
+    """
+
+    prob = np.full(n_rows, np.nan)
+    lists = np.full(n_rows, None, dtype=object)
+    best_hyp = np.full(n_rows, 'FIELD', dtype=object)
+    best_ya = np.full(n_rows, None, dtype=object)
+
+    for i in np.flatnonzero(rng.random(n_rows) < fraction):
+        names = rng.choice(ASSOCIATIONS, rng.integers(1, 4), replace=False)
+        p = np.sort(rng.dirichlet(np.ones(len(names)+1)) )[::-1][:len(names)]
+        lists[i] = ';'.join('{}({:.4f})'.format(name, q) for name, q in zip(names, p))
+        prob[i] = p[0]
+        best_ya[i] = names[0]
+        best_hyp[i] = names[0] if p[0] > 0.5 else 'FIELD'
+
+    return {'BANYAN_YA_PROB': prob,
+            'BANYAN_LIST_PROB_YAS': lists,
+            'BANYAN_BEST_HYP': best_hyp,
+            'BANYAN_BEST_YA': best_ya}
+
+
+
+def _to_strings(values):
+    """
+    Format one column as strings, like in the catalog file (None for missing).
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        out = np.round(values, 6).astype(str).astype(object)
+        out[~np.isfinite(values)] = None
+        return out
+    elif values.dtype.kind in 'iu':
+        return values.astype(str).astype(object)
+    else:
+        return values.astype(object)
+
+
+
+def make_catalog(n_rows=10000, n_sectors=26, seed=42, typed=False):
+    """
+    Generate a synthetic catalog.
+
+    Parameters
+    ----------
+    n_rows : int, optional
+        The number of targets. The default is 10000.
+    n_sectors : int, optional
+        The number of TESS sectors (S001 to S<n_sectors>). The default is 26.
+    seed : int, optional
+        The random seed; the same seed always gives the same catalog.
+        The default is 42.
+    typed : bool, optional
+        If True, return all columns with their proper dtypes (see SCHEMA),
+        like a catalog file after convert_catalog(). The default is False,
+        i.e. all columns as strings, like the original catalog file.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        One row per target, with all keys of catalog.get_all_keys().
+    """
+
+    rng = np.random.default_rng(seed)
+    n = n_rows
+    d = {}
+
+    #::: generic values for all keys; the important ones are overwritten below
+    for key in ALL_KEYS:
+        if key in CATEGORY_KEYS:
+            d[key] = rng.choice(np.array(CATEGORIES.get(key, [None]), dtype=object), n)
+        elif key in INT_KEYS:
+            d[key] = rng.integers(0, 100, n)
+        else:
+            d[key] = np.round(rng.lognormal(0, 1, n), 4)
+            d[key][rng.random(n) < MISSING] = np.nan
+
+    #::: identifiers
+    tic = np.unique(rng.integers(1, 10**9, 2*n))[:n]
+    rng.shuffle(tic)
+    gaia = np.unique(rng.integers(10**15, 7*10**18, 2*n))[:n]
+    rng.shuffle(gaia)
+    for key in ['TIC_ID', 'OBS_TICID', 'TICv8_ID', 'BANYAN_TIC_ID']:
+        d[key] = tic
+    d['TICv8_GAIA'] = d['GAIADR2_source_id'] = gaia
+    d['TICv8_objID'] = rng.integers(10**8, 10**9, n)
+    d['TICv8_duplicate_id'] = np.where(rng.random(n) < 0.01, rng.integers(1, 10**9, n), -1)
+
+    #::: positions, also as ecliptic and galactic coordinates
+    ra = rng.uniform(0, 360, n)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+
+    #::: distances and space motions
+    dist = 10 + rng.lognormal(5, 0.8, n)
+    pmra = rng.normal(0, 2000/dist + 5, n)
+    pmdec = rng.normal(0, 2000/dist + 5, n)
+    rv = rng.normal(0, 30, n)
+
+    #::: comoving groups: a few percent of the targets get the motion and distance of a nearby "primary"
+    members = np.flatnonzero(rng.random(n) < 0.04)
+    primaries = rng.choice(n, len(members))
+    ra[members] = (ra[primaries] + rng.normal(0, 0.05, len(members)) / np.cos(np.radians(dec[primaries]))) % 360
+    dec[members] = np.clip(dec[primaries] + rng.normal(0, 0.05, len(members)), -90, 90)
+    dist[members] = dist[primaries] * (1 + rng.normal(0, 0.01, len(members)))
+    pmra[members] = pmra[primaries] + rng.normal(0, 0.5, len(members))
+    pmdec[members] = pmdec[primaries] + rng.normal(0, 0.5, len(members))
+
+    eclon, eclat = _sky_to_ecliptic(ra, dec)
+    gallon, gallat = _sky_to_galactic(ra, dec)
+    plx = 1000 / dist
+    e_plx = 0.02 + 0.03*rng.random(n)
+    e_pm = 0.03 + 0.1*rng.random(n)
+
+    for key, values in [('OBS_RA', ra), ('OBS_Dec', dec), ('TICv8_ra', ra), ('TICv8_dec', dec),
+                        ('TICv8_RA_orig', ra), ('TICv8_Dec_orig', dec), ('GAIADR2_ra', ra), ('GAIADR2_dec', dec),
+                        ('TICv8_eclong', eclon), ('TICv8_eclat', eclat), ('GAIADR2_ecl_lon', eclon), ('GAIADR2_ecl_lat', eclat),
+                        ('TICv8_gallong', gallon), ('TICv8_gallat', gallat), ('GAIADR2_l', gallon), ('GAIADR2_b', gallat),
+                        ('TICv8_plx', plx), ('GAIADR2_parallax', plx), ('TICv8_e_plx', e_plx), ('GAIADR2_parallax_error', e_plx),
+                        ('TICv8_pmRA', pmra), ('GAIADR2_pmra', pmra), ('TICv8_e_pmRA', e_pm), ('GAIADR2_pmra_error', e_pm),
+                        ('TICv8_pmDEC', pmdec), ('GAIADR2_pmdec', pmdec), ('TICv8_e_pmDEC', e_pm), ('GAIADR2_pmdec_error', e_pm),
+                        ('GAIADR2_parallax_over_error', plx/e_plx), ('TICv8_d', dist), ('TICv8_e_d', 0.05*dist),
+                        ('GAIADR2_ref_epoch', np.full(n, 2015.5))]:
+        d[key] = values
+    d['GAIADR2_radial_velocity'] = np.where(rng.random(n) < 0.3, rv, np.nan)
+    d['GAIADR2_radial_velocity_error'] = np.where(np.isfinite(d['GAIADR2_radial_velocity']), rng.uniform(0.2, 5, n), np.nan)
+
+    #::: stellar parameters and magnitudes (brighter for nearby, hotter stars)
+    teff = np.clip(rng.normal(5200, 1200, n), 2800, 12000)
+    rad = np.clip((teff/5772)**1.5 * rng.lognormal(0, 0.3, n), 0.1, 50)
+    tmag = np.clip(4.8 - 2.5*np.log10(rad**2 * (teff/5772)**4) + 5*np.log10(dist/10) - 0.5*(teff/5772 - 1), -1, 19)
+    for key, values in [('TICv8_Teff', teff), ('GAIADR2_teff_val', teff), ('TICv8_rad', rad), ('GAIADR2_radius_val', rad),
+                        ('TICv8_mass', np.clip(rad**1.1, 0.08, 20)), ('TICv8_logg', rng.normal(4.4, 0.3, n)),
+                        ('TICv8_MH', rng.normal(0, 0.2, n)), ('TICv8_lum', rad**2 * (teff/5772)**4),
+                        ('TICv8_ebv', rng.exponential(0.05, n)), ('TICv8_contratio', rng.exponential(0.1, n)),
+                        ('TICv8_priority', rng.random(n) * 0.01), ('TICv8_e_Teff', rng.uniform(50, 200, n))]:
+        d[key] = values
+    for key in MAGNITUDE_KEYS + ('GAIADR2_phot_g_mean_mag', 'GAIADR2_phot_bp_mean_mag', 'GAIADR2_phot_rp_mean_mag'):
+        if key.endswith('mag'):
+            d[key] = rng.uniform(0.005, 0.05, n) if '_e_' in key else tmag + 0.6 + rng.normal(0, 0.5, n)
+    d['OBS_Tmag'] = d['TICv8_Tmag'] = tmag
+    for key in ALL_KEYS:
+        if (key in d) and (np.asarray(d[key]).dtype.kind == 'f') and (key.startswith('TICv8_') or key.startswith('GAIADR2_')) \
+           and (key not in ('TICv8_ra', 'TICv8_dec', 'TICv8_Tmag')):
+            d[key] = np.where(rng.random(n) < MISSING, np.nan, d[key])
+
+    #::: cross-identifiers of the other catalogs (only some targets are in them)
+    hip = rng.random(n) < 0.02
+    d['TICv8_HIP'] = np.where(hip, rng.integers(1, 120000, n), -1)
+    d['TICv8_KIC'] = np.where(rng.random(n) < 0.03, rng.integers(757076, 12935144, n), -1)
+    d['TICv8_TYC'] = np.array(['{}-{}-1'.format(a, b) for a, b in zip(rng.integers(1, 9538, n), rng.integers(1, 12000, n))], dtype=object)
+    d['TICv8_TYC'][rng.random(n) > 0.1] = None
+    d['TICv8_UCAC'] = np.array(['{:03d}-{:06d}'.format(a, b) for a, b in zip(rng.integers(1, 900, n), rng.integers(1, 400000, n))], dtype=object)
+    h, m, s = (ra/15).astype(int), ((ra/15 % 1)*60).astype(int), (ra/15*3600 % 60)
+    sign = np.where(dec < 0, '-', '+')
+    dd, dm, ds = np.abs(dec).astype(int), ((np.abs(dec) % 1)*60).astype(int), (np.abs(dec)*3600 % 60)
+    d['TICv8_TWOMASS'] = np.array(['{:02d}{:02d}{:04d}{}{:02d}{:02d}{:03d}'.format(*v) for v in
+                                   zip(h, m, (s*100).astype(int), sign, dd, dm, (ds*10).astype(int))], dtype=object)
+    d['TICv8_ALLWISE'] = np.array(['J{:02d}{:02d}{:05.2f}{}{:02d}{:02d}{:04.1f}'.format(*v) for v in zip(h, m, s, sign, dd, dm, ds)], dtype=object)
+    d['TICv8_SDSS'] = np.where(rng.random(n) < 0.2, rng.integers(10**17, 10**18, n).astype(str), None).astype(object)
+    d['TICv8_APASS'] = np.where(rng.random(n) < 0.5, rng.integers(10**7, 10**8, n).astype(str), None).astype(object)
+    d['TICv8_TWOMflag'] = rng.choice(np.array(['AAA-222-111-000-0-0', 'AAA-222-111-000-0-1', 'EEA-222-111-000-0-0'], dtype=object), n)
+    d['TICv8_splists'] = rng.choice(np.array([None, None, None, 'cooldwarfs_v8', 'hotsubdwarfs_v8'], dtype=object), n)
+
+    #::: observations and young associations
+    d['OBS_Sector'], d['OBS_Camera'], d['OBS_CCD'] = _observations(eclon, eclat, n_sectors, rng)
+    d.update(_banyan(n, rng))
+
+    #::: as strings, like the original catalog file (negative IDs mean missing)
+    for key in INT_KEYS:
+        d[key] = np.where(np.asarray(d[key]) < 0, None, _to_strings(d[key]))
+    df = pd.DataFrame({key: _to_strings(d[key]) for key in ALL_KEYS})
+    
+    #::: or with proper dtypes, exactly like after convert_catalog()
+    if typed:
+        df = _apply_schema(df, SCHEMA)
+    return df
+
+
+
+def write_catalog(path, n_rows=10000, n_sectors=26, seed=42, typed=False, compression='lz4'):
+    """
+    Generate a synthetic catalog (see make_catalog()), and write it as feather file.
+
+    Parameters
+    ----------
+    path : str
+        The catalog (feather) file.
+    n_rows, n_sectors, seed, typed :
+        See make_catalog().
+    compression : str, optional
+        'lz4', 'zstd' or 'uncompressed'. The default is 'lz4'.
+
+    Returns
+    -------
+    path : str
+    """
+
+    df = make_catalog(n_rows=n_rows, n_sectors=n_sectors, seed=seed, typed=typed)
+    df.to_feather(path, compression=compression, chunksize=FEATHER_CHUNKSIZE)
+    return path
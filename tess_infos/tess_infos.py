@@ -17,25 +17,32 @@ Web: www.mnguenther.com
 from __future__ import print_function, division, absolute_import
 
 #::: modules
-import os, sys
+import os
+import json
+import shutil
+import pickle
+import hashlib
+import operator
+import collections
+import atexit
+import functools
+import contextlib
+import logging
+import threading
+import concurrent.futures
 import numpy as np
-import matplotlib.pyplot as plt
+import pyarrow as pa
+import pyarrow.feather
+import pyarrow.ipc
+import pyarrow.dataset
 import pandas as pd
-from tqdm import tqdm
-from glob import glob
-from pprint import pprint
-import feather
-from time import time as timer
-from pathlib import Path
+from time import perf_counter
 
 #::: my modules
 #import allesfitter
 
-#::: plotting settings
-import seaborn as sns
-sns.set(context='paper', style='ticks', palette='deep', font='sans-serif', font_scale=1.5, color_codes=True)
-sns.set_style({"xtick.direction": "in","ytick.direction": "in"})
-sns.set_context(rc={'lines.markeredgewidth': 1})
+#::: plotting (matplotlib/seaborn) lives in tess_infos.plotting, 
+#::: so that importing the catalog stays fast
 
 
 
@@ -44,534 +51,3996 @@ __version__ = '0.1.1'
 
 
 
-class catalog(object):
+#::: all keys of the catalog, in their order in the catalog file (immutable, built once on import)
+ALL_KEYS = ('TIC_ID',
+            'OBS_TICID',
+            'OBS_Tmag',
+            'OBS_RA',
+            'OBS_Dec',
+            'OBS_Sector',
+            'OBS_Camera',
+            'OBS_CCD',
+            'TICv8_ID',
+            'TICv8_version',
+            'TICv8_HIP',
+            'TICv8_TYC',
+            'TICv8_UCAC',
+            'TICv8_TWOMASS',
+            'TICv8_SDSS',
+            'TICv8_ALLWISE',
+            'TICv8_GAIA',
+            'TICv8_APASS',
+            'TICv8_KIC',
+            'TICv8_objType',
+            'TICv8_typeSrc',
+            'TICv8_ra',
+            'TICv8_dec',
+            'TICv8_POSflag',
+            'TICv8_pmRA',
+            'TICv8_e_pmRA',
+            'TICv8_pmDEC',
+            'TICv8_e_pmDEC',
+            'TICv8_PMflag',
+            'TICv8_plx',
+            'TICv8_e_plx',
+            'TICv8_PARflag',
+            'TICv8_gallong',
+            'TICv8_gallat',
+            'TICv8_eclong',
+            'TICv8_eclat',
+            'TICv8_Bmag',
+            'TICv8_e_Bmag',
+            'TICv8_Vmag',
+            'TICv8_e_Vmag',
+            'TICv8_umag',
+            'TICv8_e_umag',
+            'TICv8_gmag',
+            'TICv8_e_gmag',
+            'TICv8_rmag',
+            'TICv8_e_rmag',
+            'TICv8_imag',
+            'TICv8_e_imag',
+            'TICv8_zmag',
+            'TICv8_e_zmag',
+            'TICv8_Jmag',
+            'TICv8_e_Jmag',
+            'TICv8_Hmag',
+            'TICv8_e_Hmag',
+            'TICv8_Kmag',
+            'TICv8_e_Kmag',
+            'TICv8_TWOMflag',
+            'TICv8_prox',
+            'TICv8_w1mag',
+            'TICv8_e_w1mag',
+            'TICv8_w2mag',
+            'TICv8_e_w2mag',
+            'TICv8_w3mag',
+            'TICv8_e_w3mag',
+            'TICv8_w4mag',
+            'TICv8_e_w4mag',
+            'TICv8_GAIAmag',
+            'TICv8_e_GAIAmag',
+            'TICv8_Tmag',
+            'TICv8_e_Tmag',
+            'TICv8_TESSflag',
+            'TICv8_SPFlag',
+            'TICv8_Teff',
+            'TICv8_e_Teff',
+            'TICv8_logg',
+            'TICv8_e_logg',
+            'TICv8_MH',
+            'TICv8_e_MH',
+            'TICv8_rad',
+            'TICv8_e_rad',
+            'TICv8_mass',
+            'TICv8_e_mass',
+            'TICv8_rho',
+            'TICv8_e_rho',
+            'TICv8_lumclass',
+            'TICv8_lum',
+            'TICv8_e_lum',
+            'TICv8_d',
+            'TICv8_e_d',
+            'TICv8_ebv',
+            'TICv8_e_ebv',
+            'TICv8_numcont',
+            'TICv8_contratio',
+            'TICv8_disposition',
+            'TICv8_duplicate_id',
+            'TICv8_priority',
+            'TICv8_eneg_EBV',
+            'TICv8_epos_EBV',
+            'TICv8_EBVflag',
+            'TICv8_eneg_Mass',
+            'TICv8_epos_Mass',
+            'TICv8_eneg_Rad',
+            'TICv8_epos_Rad',
+            'TICv8_eneg_rho',
+            'TICv8_epos_rho',
+            'TICv8_eneg_logg',
+            'TICv8_epos_logg',
+            'TICv8_eneg_lum',
+            'TICv8_epos_lum',
+            'TICv8_eneg_dist',
+            'TICv8_epos_dist',
+            'TICv8_distflag',
+            'TICv8_eneg_Teff',
+            'TICv8_epos_Teff',
+            'TICv8_TeffFlag',
+            'TICv8_gaiabp',
+            'TICv8_e_gaiabp',
+            'TICv8_gaiarp',
+            'TICv8_e_gaiarp',
+            'TICv8_gaiaqflag',
+            'TICv8_starchareFlag',
+            'TICv8_VmagFlag',
+            'TICv8_BmagFlag',
+            'TICv8_splists',
+            'TICv8_e_RA',
+            'TICv8_e_Dec',
+            'TICv8_RA_orig',
+            'TICv8_Dec_orig',
+            'TICv8_e_RA_orig',
+            'TICv8_e_Dec_orig',
+            'TICv8_raddflag',
+            'TICv8_wdflag',
+            'TICv8_objID',
+            'GAIADR2_source_id',
+            'GAIADR2_random_index',
+            'GAIADR2_ref_epoch',
+            'GAIADR2_ra',
+            'GAIADR2_ra_error',
+            'GAIADR2_dec',
+            'GAIADR2_dec_error',
+            'GAIADR2_parallax',
+            'GAIADR2_parallax_error',
+            'GAIADR2_parallax_over_error',
+            'GAIADR2_pmra',
+            'GAIADR2_pmra_error',
+            'GAIADR2_pmdec',
+            'GAIADR2_pmdec_error',
+            'GAIADR2_ra_dec_corr',
+            'GAIADR2_ra_parallax_corr',
+            'GAIADR2_ra_pmra_corr',
+            'GAIADR2_ra_pmdec_corr',
+            'GAIADR2_dec_parallax_corr',
+            'GAIADR2_dec_pmra_corr',
+            'GAIADR2_dec_pmdec_corr',
+            'GAIADR2_parallax_pmra_corr',
+            'GAIADR2_parallax_pmdec_corr',
+            'GAIADR2_pmra_pmdec_corr',
+            'GAIADR2_astrometric_n_obs_al',
+            'GAIADR2_astrometric_n_obs_ac',
+            'GAIADR2_astrometric_n_good_obs_al',
+            'GAIADR2_astrometric_n_bad_obs_al',
+            'GAIADR2_astrometric_gof_al',
+            'GAIADR2_astrometric_chi2_al',
+            'GAIADR2_astrometric_excess_noise',
+            'GAIADR2_astrometric_excess_noise_sig',
+            'GAIADR2_astrometric_params_solved',
+            'GAIADR2_astrometric_primary_flag',
+            'GAIADR2_astrometric_weight_al',
+            'GAIADR2_astrometric_pseudo_colour',
+            'GAIADR2_astrometric_pseudo_colour_error',
+            'GAIADR2_mean_varpi_factor_al',
+            'GAIADR2_astrometric_matched_observations',
+            'GAIADR2_visibility_periods_used',
+            'GAIADR2_astrometric_sigma5d_max',
+            'GAIADR2_frame_rotator_object_type',
+            'GAIADR2_matched_observations',
+            'GAIADR2_duplicated_source',
+            'GAIADR2_phot_g_n_obs',
+            'GAIADR2_phot_g_mean_flux',
+            'GAIADR2_phot_g_mean_flux_error',
+            'GAIADR2_phot_g_mean_flux_over_error',
+            'GAIADR2_phot_g_mean_mag',
+            'GAIADR2_phot_bp_n_obs',
+            'GAIADR2_phot_bp_mean_flux',
+            'GAIADR2_phot_bp_mean_flux_error',
+            'GAIADR2_phot_bp_mean_flux_over_error',
+            'GAIADR2_phot_bp_mean_mag',
+            'GAIADR2_phot_rp_n_obs',
+            'GAIADR2_phot_rp_mean_flux',
+            'GAIADR2_phot_rp_mean_flux_error',
+            'GAIADR2_phot_rp_mean_flux_over_error',
+            'GAIADR2_phot_rp_mean_mag',
+            'GAIADR2_phot_bp_rp_excess_factor',
+            'GAIADR2_phot_proc_mode',
+            'GAIADR2_bp_rp',
+            'GAIADR2_bp_g',
+            'GAIADR2_g_rp',
+            'GAIADR2_radial_velocity',
+            'GAIADR2_radial_velocity_error',
+            'GAIADR2_rv_nb_transits',
+            'GAIADR2_rv_template_teff',
+            'GAIADR2_rv_template_logg',
+            'GAIADR2_rv_template_fe_h',
+            'GAIADR2_phot_variable_flag',
+            'GAIADR2_l',
+            'GAIADR2_b',
+            'GAIADR2_ecl_lon',
+            'GAIADR2_ecl_lat',
+            'GAIADR2_priam_flags',
+            'GAIADR2_teff_val',
+            'GAIADR2_teff_percentile_lower',
+            'GAIADR2_teff_percentile_upper',
+            'GAIADR2_a_g_val',
+            'GAIADR2_a_g_percentile_lower',
+            'GAIADR2_a_g_percentile_upper',
+            'GAIADR2_e_bp_min_rp_val',
+            'GAIADR2_e_bp_min_rp_percentile_lower',
+            'GAIADR2_e_bp_min_rp_percentile_upper',
+            'GAIADR2_flame_flags',
+            'GAIADR2_radius_val',
+            'GAIADR2_radius_percentile_lower',
+            'GAIADR2_radius_percentile_upper',
+            'GAIADR2_lum_val',
+            'GAIADR2_lum_percentile_lower',
+            'GAIADR2_lum_percentile_upper',
+            'BANYAN_TIC_ID',
+            'BANYAN_YA_PROB',
+            'BANYAN_LIST_PROB_YAS',
+            'BANYAN_BEST_HYP',
+            'BANYAN_BEST_YA')
+
+#::: the default keys (only the most important ones)
+DEFAULT_KEYS = ('TIC_ID',
+                'OBS_Sector',
+                'TICv8_TWOMASS',
+                'TICv8_GAIA',
+                'TICv8_ra',
+                'TICv8_dec',
+                'TICv8_pmRA',
+                'TICv8_e_pmRA',
+                'TICv8_pmDEC',
+                'TICv8_e_pmDEC',
+                'TICv8_plx',
+                'TICv8_e_plx',
+                'TICv8_Vmag',
+                'TICv8_Kmag',
+                'TICv8_GAIAmag',
+                'TICv8_Tmag',
+                'TICv8_Teff',
+                'TICv8_e_Teff',
+                'TICv8_logg',
+                'TICv8_e_logg',
+                'TICv8_MH',
+                'TICv8_e_MH',
+                'TICv8_rad',
+                'TICv8_e_rad',
+                'TICv8_mass',
+                'TICv8_e_mass',
+                'TICv8_rho',
+                'TICv8_e_rho',
+                'TICv8_lumclass',
+                'TICv8_lum',
+                'TICv8_e_lum',
+                'TICv8_d',
+                'TICv8_e_d',
+                'TICv8_ebv',
+                'TICv8_e_ebv',
+                'TICv8_contratio',
+                'TICv8_disposition',
+                'TICv8_gaiabp',
+                'TICv8_gaiarp',
+                'TICv8_e_RA',
+                'TICv8_e_Dec',
+                'GAIADR2_radial_velocity',
+                'GAIADR2_radial_velocity_error',
+                'BANYAN_YA_PROB',
+                'BANYAN_BEST_HYP')
+
+#::: all TICv8 keys containing magnitudes
+MAGNITUDE_KEYS = ('TICv8_Bmag',
+                  'TICv8_e_Bmag',
+                  'TICv8_Vmag',
+                  'TICv8_e_Vmag',
+                  'TICv8_umag',
+                  'TICv8_e_umag',
+                  'TICv8_gmag',
+                  'TICv8_e_gmag',
+                  'TICv8_rmag',
+                  'TICv8_e_rmag',
+                  'TICv8_imag',
+                  'TICv8_e_imag',
+                  'TICv8_zmag',
+                  'TICv8_e_zmag',
+                  'TICv8_Jmag',
+                  'TICv8_e_Jmag',
+                  'TICv8_Hmag',
+                  'TICv8_e_Hmag',
+                  'TICv8_Kmag',
+                  'TICv8_e_Kmag',
+                  'TICv8_TWOMflag',
+                  'TICv8_prox',
+                  'TICv8_w1mag',
+                  'TICv8_e_w1mag',
+                  'TICv8_w2mag',
+                  'TICv8_e_w2mag',
+                  'TICv8_w3mag',
+                  'TICv8_e_w3mag',
+                  'TICv8_w4mag',
+                  'TICv8_e_w4mag',
+                  'TICv8_GAIAmag',
+                  'TICv8_e_GAIAmag',
+                  'TICv8_Tmag',
+                  'TICv8_e_Tmag')
+
+#::: the position of each key in ALL_KEYS
+KEY_POSITION = {key: i for i, key in enumerate(ALL_KEYS)}
+
+
+
+#::: the dtypes of all catalog columns (all others are float64, see SCHEMA)
+INT_KEYS = ('TIC_ID',
+            'OBS_TICID',
+            'TICv8_ID',
+            'TICv8_HIP',
+            'TICv8_GAIA',
+            'TICv8_KIC',
+            'TICv8_numcont',
+            'TICv8_duplicate_id',
+            'TICv8_raddflag',
+            'TICv8_wdflag',
+            'TICv8_objID',
+            'GAIADR2_source_id',
+            'GAIADR2_random_index',
+            'GAIADR2_astrometric_n_obs_al',
+            'GAIADR2_astrometric_n_obs_ac',
+            'GAIADR2_astrometric_n_good_obs_al',
+            'GAIADR2_astrometric_n_bad_obs_al',
+            'GAIADR2_astrometric_params_solved',
+            'GAIADR2_astrometric_matched_observations',
+            'GAIADR2_visibility_periods_used',
+            'GAIADR2_frame_rotator_object_type',
+            'GAIADR2_matched_observations',
+            'GAIADR2_phot_g_n_obs',
+            'GAIADR2_phot_bp_n_obs',
+            'GAIADR2_phot_rp_n_obs',
+            'GAIADR2_phot_proc_mode',
+            'GAIADR2_rv_nb_transits',
+            'GAIADR2_priam_flags',
+            'GAIADR2_flame_flags',
+            'BANYAN_TIC_ID')
+
+CATEGORY_KEYS = ('TICv8_version',
+                 'TICv8_objType',
+                 'TICv8_typeSrc',
+                 'TICv8_POSflag',
+                 'TICv8_PMflag',
+                 'TICv8_PARflag',
+                 'TICv8_TESSflag',
+                 'TICv8_SPFlag',
+                 'TICv8_lumclass',
+                 'TICv8_disposition',
+                 'TICv8_EBVflag',
+                 'TICv8_distflag',
+                 'TICv8_TeffFlag',
+                 'TICv8_gaiaqflag',
+                 'TICv8_starchareFlag',
+                 'TICv8_VmagFlag',
+                 'TICv8_BmagFlag',
+                 'GAIADR2_astrometric_primary_flag',
+                 'GAIADR2_duplicated_source',
+                 'GAIADR2_phot_variable_flag',
+                 'BANYAN_BEST_HYP',
+                 'BANYAN_BEST_YA')
+
+STRING_KEYS = ('OBS_Sector',
+               'OBS_Camera',
+               'OBS_CCD',
+               'TICv8_TYC',
+               'TICv8_UCAC',
+               'TICv8_TWOMASS',
+               'TICv8_SDSS',
+               'TICv8_ALLWISE',
+               'TICv8_APASS',
+               'TICv8_TWOMflag',
+               'TICv8_splists',
+               'BANYAN_LIST_PROB_YAS')
+
+
+
+def _build_schema():
     """
-    The heart of it.
+    Build the dtype of each key (see SCHEMA).
+
+    Returns
+    -------
+    schema : dict
+    """
+    
+    schema = {}
+    for key in ALL_KEYS:
+        if key in INT_KEYS:
+            schema[key] = 'Int64'
+        elif key in CATEGORY_KEYS:
+            schema[key] = 'category'
+        elif key in STRING_KEYS:
+            schema[key] = 'str'
+        elif key in MAGNITUDE_KEYS:
+            schema[key] = 'float32'
+        else:
+            schema[key] = 'float64'
+    return schema
+
+SCHEMA = _build_schema()
+
+
+#::: the cross-identifiers that catalog.get() can look up directly, and 
+#::: the prefixes that are dropped from them (e.g. 'HIP 12345', '2MASS J12345678+1234567')
+IDENTIFIER_KEYS = {'gaia_id': 'TICv8_GAIA',
+                   'twomass': 'TICv8_TWOMASS',
+                   'hip': 'TICv8_HIP',
+                   'tyc': 'TICv8_TYC',
+                   'kic': 'TICv8_KIC'}
+
+IDENTIFIER_PREFIXES = {'TICv8_GAIA': r'^(?:Gaia\s*DR2\s*)',
+                       'TICv8_TWOMASS': r'^(?:2MASS\s*)?J',
+                       'TICv8_HIP': r'^HIP\s*',
+                       'TICv8_TYC': r'^TYC\s*',
+                       'TICv8_KIC': r'^KIC\s*'}
+
+
+#::: the keys of catalog.summary(), and the default histogram bins of catalog.histogram()
+SUMMARY_KEYS = ('TICv8_Tmag', 'TICv8_Teff')
+
+HISTOGRAM_BINS = {'TICv8_Tmag': np.arange(-2., 21., 1.),
+                  'TICv8_Teff': np.arange(2000., 12001., 500.)}
+
+#::: the dimensions of catalog.aggregate()
+AGGREGATE_BY = ('sector', 'camera', 'ccd')
+
+
+#::: km/s per (mas/yr * kpc), to convert velocity tolerances into proper motions (see catalog.find_comoving())
+KAPPA = 4.740470463533348
+
+#::: the number of targets per batch of catalog.find_comoving_pairs()
+COMOVING_BATCH = 100000
+
+
+#::: one entry of BANYAN_LIST_PROB_YAS, e.g. 'BPMG(0.9123)', also 'BPMG:0.9123' or 'BPMG=0.9123'
+BANYAN_PATTERN = r'([A-Za-z0-9_+\-]+?)\s*[(:=]\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*\)?'
+
+
+#::: the rows per record batch of all catalog files written here (see convert_catalog()), so that
+#::: lazy reads (e.g. catalog.iter_batches()) only decompress the batches they need, even for compressed files
+FEATHER_CHUNKSIZE = 10000
+
+
+#::: the version of the on-disk cache layout (see catalog(cache=True)); bump it whenever the layout changes
+CACHE_VERSION = 1
+
+
+
+#::: the comparison operators allowed in catalog.get(where=...)
+OPERATORS = {'<': operator.lt,
+             '<=': operator.le,
+             '>': operator.gt,
+             '>=': operator.ge,
+             '==': operator.eq,
+             '!=': operator.ne}
+
+
+
+#::: the logger of catalog(stats=True, log_stats=...)
+LOGGER = logging.getLogger('tess_infos')
+
+#::: a do-nothing phase, used whenever the instrumentation is off
+_NO_STATS = contextlib.nullcontext()
+
+
+
+#::: operations on fewer rows than this always run in a single thread (the thread overhead would dominate)
+PARALLEL_MIN_ROWS = 100000
+
+
+
+def _may_match(stats, op, value):
+    """
+    Check whether a row group can hold any row matching a predicate, from its statistics.
+
+    Parameters
+    ----------
+    stats : dict or None
+        The statistics of one key in one row group, {'min': ..., 'max': ...}.
+    op : str
+        The operator, see catalog.get().
+    value : 
+        The value, see catalog.get().
+
+    Returns
+    -------
+    bool
+        False only if the statistics guarantee that there is no match.
+    """
+    
+    if (stats is None) or (stats.get('min', None) is None) or (stats.get('max', None) is None):
+        return True
+    vmin, vmax = stats['min'], stats['max']
+    try:
+        if op in ['<', '<=']:
+            return OPERATORS[op](vmin, value)
+        elif op in ['>', '>=']:
+            return OPERATORS[op](vmax, value)
+        elif op == '==':
+            return (vmin <= value) and (value <= vmax)
+        elif op == 'between':
+            return (vmax >= value[0]) and (vmin <= value[1])
+        elif op == 'in':
+            return any( (vmin <= v) and (v <= vmax) for v in np.atleast_1d(value) )
+        else:
+            return True
+    except TypeError:
+        return True
+
+
+
+def _n_threads(n_threads=None):
+    """
+    Resolve the number of threads (see catalog(n_threads=...)).
+
+    Parameters
+    ----------
+    n_threads : int or None
+        The number of threads; None means all cores.
+
+    Returns
+    -------
+    n_threads : int
+    """
+    
+    if n_threads is None:
+        return os.cpu_count() or 1
+    return max(1, int(n_threads))
+
+
+
+def _use_threads(n_threads=None):
+    """
+    The use_threads argument of pyarrow calls for the given number of threads.
+    
+    pyarrow uses one global thread pool for the whole process, so it is 
+    never resized here: a single thread switches it off per call, more 
+    threads use it as it is (by default, with all cores).
+
+    Parameters
+    ----------
+    n_threads : int or None
+        The number of threads; None means all cores.
+
+    Returns
+    -------
+    use_threads : bool
+        The use_threads argument for pyarrow (and pandas.read_feather).
+    """
+    
+    return _n_threads(n_threads) > 1
+
+
+
+@functools.lru_cache(maxsize=None)
+def _thread_pool(n_threads):
+    """
+    One persistent thread pool per number of threads, shared by all catalogs.
+
+    Parameters
+    ----------
+    n_threads : int
+        The number of threads.
+
+    Returns
+    -------
+    concurrent.futures.ThreadPoolExecutor
+    """
+    
+    return concurrent.futures.ThreadPoolExecutor(max_workers=n_threads, thread_name_prefix='tess_infos')
+
+
+
+def _map_threads(func, items, n_threads=1):
+    """
+    Apply func to all items, in parallel threads if n_threads > 1.
+    
+    This speeds up work that releases the GIL, i.e. most of pyarrow and 
+    numpy (decoding, casting, gathering, comparing). Calls from within 
+    the thread pool itself always run serially, so nested calls can never 
+    wait on their own pool.
+
+    Parameters
+    ----------
+    func : callable
+        The function to apply to each item.
+    items : iterable
+        The items.
+    n_threads : int, optional
+        The number of threads. The default is 1.
+
+    Returns
+    -------
+    list
+        The results, in the order of items.
+    """
+    
+    items = list(items)
+    if (n_threads <= 1) or (len(items) <= 1) or threading.current_thread().name.startswith('tess_infos'):
+        return [func(item) for item in items]
+    return list(_thread_pool(n_threads).map(func, items))
+
+
+
+def _map_chunks(func, n_items, n_threads=1):
+    """
+    Apply func to contiguous chunks of n_items rows, in parallel threads 
+    if n_threads > 1 and there are enough rows (see PARALLEL_MIN_ROWS).
+
+    Parameters
+    ----------
+    func : callable
+        The function to apply to each chunk; it gets a slice, and returns an array.
+    n_items : int
+        The number of rows.
+    n_threads : int, optional
+        The number of threads. The default is 1.
+
+    Returns
+    -------
+    array
+        The concatenated results of all chunks.
+    """
+    
+    n_chunks = int(max(1, min(n_threads, n_items // PARALLEL_MIN_ROWS)))
+    bounds = np.linspace(0, n_items, n_chunks+1).astype(int)
+    return np.concatenate(_map_threads(lambda i: func(slice(bounds[i], bounds[i+1])), range(n_chunks), n_threads))
+
+
+
+def _convert_column(values, dtype):
+    """
+    Convert one column to its proper dtype (see _apply_schema()).
+
+    Parameters
+    ----------
+    values : pandas.Series
+        The column.
+    dtype : str
+        The dtype, see SCHEMA.
+
+    Returns
+    -------
+    pandas.Series
+    """
+    
+    if dtype == 'Int64':
+        if pd.api.types.is_numeric_dtype(values.dtype):
+            return values.astype('Int64')
+        
+        #::: '' is missing; integers are parsed exactly (no detour via float, which would round 19-digit Gaia IDs)
+        strings = values.to_numpy(dtype=object)
+        positions = np.flatnonzero(pd.notna(strings))
+        strings = pd.Series(strings[positions]).astype(str).str.strip()
+        integers = strings.str.fullmatch(r'[+-]?\d+').to_numpy(dtype=bool)
+        floats = pd.to_numeric(strings[~integers], errors='coerce').to_numpy(dtype=float)
+        valid = integers.copy()
+        valid[~integers] = np.isfinite(floats)
+        numbers = np.zeros(len(strings), dtype=np.int64)
+        numbers[integers] = pd.to_numeric(strings[integers]).to_numpy(dtype=np.int64)
+        numbers[~integers] = np.where(np.isfinite(floats), floats, 0).astype(np.int64)
+        numbers, positions = numbers[valid], positions[valid]
+        
+        data = np.zeros(len(values), dtype=np.int64)
+        data[positions] = numbers
+        missing = np.ones(len(values), dtype=bool)
+        missing[positions] = False
+        return pd.Series(pd.arrays.IntegerArray(data, missing), index=values.index, name=values.name)
+    elif dtype == 'category':
+        return values.astype('category')
+    else:
+        return pd.to_numeric(values, errors='coerce').astype(dtype)
+
+
+
+def _to_pandas(table, use_threads=True):
     """
+    Convert rows read from Arrow (a memory-mapped file or a dataset) into a pandas.DataFrame.
+    
+    Integer columns become Int64 right away, so that nulls (e.g. rows of 
+    unknown TIC IDs) never turn them into float64, which would round 
+    19-digit Gaia IDs.
+    """
+    return table.to_pandas(use_threads=use_threads, types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+
+
+def _apply_schema(df, schema, n_threads=1):
+    """
+    Convert the columns of a DataFrame (in place) to their proper dtypes.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The catalog, or parts of it. Columns that already have the right 
+        dtype (e.g. from a converted catalog file) are left untouched.
+    schema : dict
+        The dtype for each key, see SCHEMA.
+    n_threads : int, optional
+        Convert this many columns in parallel. The default is 1.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+    """
+    
+    keys = [key for key in df.columns 
+            if (schema.get(key, None) not in (None, 'str')) and (str(df[key].dtype) != schema[key])]
+    if len(df) < PARALLEL_MIN_ROWS:
+        n_threads = 1
+    columns = _map_threads(lambda key: _convert_column(df[key], schema[key]), keys, n_threads)
+    for key, values in zip(keys, columns):
+        df[key] = values
+    return df
+
+
+
+@functools.lru_cache(maxsize=1024)
+def _translate_keys_cached(keys):
+    """
+    Translate the (frozen) user-input into the actual keys (see catalog._translate_keys()).
+
+    Parameters
+    ----------
+    keys : None, str or tuple of str
+        See catalog.__init__().
+
+    Returns
+    -------
+    tuple of str
+    """
+    
+    if (keys is None) or (keys == 'default'):
+        return DEFAULT_KEYS # return the default keys (a light-weight version)
+    
+    elif (keys == 'all') or (keys == '*'):
+        return ALL_KEYS # return all keys
+                                                                                                                            
+    else:                                                                                                                                
+        keys = np.atleast_1d(keys) # make sure the user-input is now a list
+
+        if ('all' in keys) or ('*' in keys):
+            return ALL_KEYS  # return all keys
+        
+        else: 
+            #::: create a set of the actual keys, chosen by which ones match the user-given substrings
+            #::: (always include TIC_ID and OBS_Sector)
+            keys2 = {'TIC_ID', 'OBS_Sector'}
+            for k in keys:
+                if k == 'default':
+                    keys2.update(DEFAULT_KEYS)
+                else:
+                    keys2.update(ak for ak in ALL_KEYS if k in ak)
+    
+            #::: sort them in the same order as ALL_KEYS
+            return tuple(sorted(keys2, key=KEY_POSITION.get))
+
+
+def _radec_to_xyz(ra, dec):
+    """
+    Convert sky positions into unit vectors.
+
+    Parameters
+    ----------
+    ra : array of float
+        Right ascension in degrees.
+    dec : array of float
+        Declination in degrees.
+
+    Returns
+    -------
+    xyz : array of float, shape (N, 3)
+    """
+    
+    ra, dec = np.deg2rad(ra), np.deg2rad(dec)
+    return np.column_stack(( np.cos(dec)*np.cos(ra), np.cos(dec)*np.sin(ra), np.sin(dec) ))
+
+
+
+def _normalize_identifiers(key, values):
+    """
+    Bring cross-identifiers into the form of the catalog index.
+
+    Parameters
+    ----------
+    key : str
+        The identifier key, e.g. 'TICv8_HIP' (see IDENTIFIER_KEYS).
+    values : array-like
+        The identifiers, as numbers or strings (with or without prefix).
+
+    Returns
+    -------
+    values : array of int64 or bytes
+        Integer identifiers as int64 (-1 if invalid), all others as 
+        stripped bytes (b'' if invalid).
+    """
+    
+    values = np.atleast_1d(values)
+    if (SCHEMA[key] == 'Int64') and (values.dtype.kind in 'iu'):
+        return values.astype(np.int64)
+    
+    strings = pd.Series(values, dtype=object)
+    valid = strings.notna().to_numpy()
+    strings = strings.astype(str).str.strip().str.replace(IDENTIFIER_PREFIXES[key], '', regex=True, case=False).str.strip()
+    
+    if SCHEMA[key] == 'Int64':
+        #::: no detour via float, which would round 19-digit Gaia IDs
+        def to_int(v):
+            try:
+                return int(v)
+            except ValueError:
+                try:
+                    return int(float(v))
+                except ValueError:
+                    return -1
+        return np.array([to_int(v) if ok else -1 for v, ok in zip(strings, valid)], dtype=np.int64)
+    else:
+        return np.char.encode(np.where(valid, strings.to_numpy(dtype=str), ''), 'utf-8')
+
+
+
+def _observation_code(sector, camera, ccd):
+    """
+    Combine sector, camera and CCD into one sortable int64 code.
+    """
+    
+    return (np.asarray(sector, dtype=np.int64) << 16) | (np.asarray(camera, dtype=np.int64) << 8) | np.asarray(ccd, dtype=np.int64)
+
+
+
+def _read_path(path=None):
+    """
+    Read (and, if given, first permanently save) the path to the catalog file.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to where the catalog (feather) file is stored on your computer. 
+        The default is None.
+
+    Returns
+    -------
+    path : str
+    """
+    
+    #::: savefile storing the path to the catalog file
+    savefile = os.path.join( os.path.dirname(os.path.abspath(__file__)), 'tess_infos_path.txt' )
+    
+    #::: if given, set the path to the catalog file
+    if path is not None:
+        with open(savefile, 'w') as sf:
+            sf.write(path)
+    
+    #::: read the path to the catalog file
+    with open(savefile, 'r') as sf:
+        path = sf.read()
+        
+    return path
+
+
+
+def convert_catalog(path=None, outpath=None, compression='lz4', n_threads=None):
+    """
+    Rewrite an (all-string) catalog file with proper dtypes, once.
+    
+    Typed columns use many times less memory than string columns, load 
+    faster, and can directly be used for numeric filters.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to the catalog (feather) file. 
+        The default is None, i.e. the path stored by catalog(path=...).
+    outpath : str, optional
+        Path to the converted catalog (feather) file. 
+        The default is None, i.e. overwrite the original file.
+    compression : str, optional
+        'lz4', 'zstd' or 'uncompressed'. Use 'uncompressed' for 
+        catalog(memory_map=True), so the file can be mapped without copying.
+        The default is 'lz4'.
+    n_threads : int, optional
+        Decode and convert the columns in this many threads, 
+        see catalog(n_threads=...). The default is None, i.e. all cores.
+
+    Returns
+    -------
+    outpath : str
+    """
+    
+    path = _read_path() if path is None else path
+    outpath = path if outpath is None else outpath
+    
+    df = pd.read_feather(path, use_threads=_use_threads(n_threads))
+    df = _apply_schema(df, SCHEMA, n_threads=_n_threads(n_threads))
+    
+    #::: write to a temporary file first, so a failure never leaves a broken catalog behind
+    df.to_feather(outpath+'.tmp', compression=compression, chunksize=FEATHER_CHUNKSIZE)
+    os.replace(outpath+'.tmp', outpath)
+    
+    return outpath
+
+
+
+def convert_to_dataset(path=None, outdir=None, row_group_size=10000, n_threads=None):
+    """
+    Rewrite the catalog file as a partitioned (Parquet) dataset, once.
+    
+    The targets are partitioned by the first sector they were observed in,
+    and sorted by their last sector within each partition, so that the 
+    targets of any sector sit together in few row groups. Each row group 
+    stores the min and max of every key, so that catalog.get(where=...) 
+    can skip row groups without reading them. Open it via 
+    catalog(path=outdir).
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to the catalog (feather) file. 
+        The default is None, i.e. the path stored by catalog(path=...).
+    outdir : str, optional
+        The dataset directory. If it exists, it is replaced.
+        The default is None, i.e. the catalog file path without its extension + '_dataset'.
+    row_group_size : int, optional
+        The maximum number of rows per row group. Smaller row groups mean 
+        more precise skipping, but more overhead. The default is 10000.
+    n_threads : int, optional
+        Decode and convert the columns in this many threads, 
+        see catalog(n_threads=...). The default is None, i.e. all cores.
+
+    Returns
+    -------
+    outdir : str
+    """
+    
+    path = _read_path() if path is None else path
+    outdir = os.path.splitext(path)[0]+'_dataset' if outdir is None else outdir
+    
+    df = _apply_schema(pd.read_feather(path, use_threads=_use_threads(n_threads)), SCHEMA, n_threads=_n_threads(n_threads))
+    _write_dataset(df, outdir, row_group_size=row_group_size)
+    
+    return outdir
+
+
+
+def _write_dataset(df, outdir, row_group_size=10000):
+    """
+    Write the catalog as a partitioned dataset (see convert_to_dataset()).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The full catalog.
+    outdir : str
+        The dataset directory. If it exists, it is replaced.
+    row_group_size : int, optional
+        The maximum number of rows per row group. The default is 10000.
+
+    Returns
+    -------
+    None.
+    """
+    
+    #::: the first and last sector of each target
+    sectors = pd.to_numeric(pd.Series(df['OBS_Sector'].to_numpy(dtype=object)).str.split(';').explode(), errors='coerce')
+    sectors = sectors.groupby(level=0).agg(['min', 'max']).fillna(0).astype(int)
+    order = np.lexsort((sectors['max'].to_numpy(), sectors['min'].to_numpy()))
+    df = df.iloc[order].reset_index(drop=True)
+    df['first_sector'] = sectors['min'].to_numpy()[order]
+    
+    #::: write to a temporary directory first, so a failure never leaves a broken dataset behind
+    pyarrow.dataset.write_dataset(pa.Table.from_pandas(df, preserve_index=False), outdir+'.tmp', 
+                                  format='parquet', partitioning=['first_sector'], partitioning_flavor='hive',
+                                  max_rows_per_group=row_group_size, min_rows_per_group=min(row_group_size, 1024),
+                                  preserve_order=True, existing_data_behavior='delete_matching')
+    if os.path.isdir(outdir):
+        shutil.rmtree(outdir)
+    os.replace(outdir+'.tmp', outdir)
+
+
+
+def _delta_dir(path):
+    """
+    The directory holding all ingested deltas of a catalog (see ingest()).
+    """
+    return path.rstrip(os.sep) + '.deltas'
+
+
+
+def _delta_files(path):
+    """
+    All ingested delta files of a catalog, in the order they were ingested.
+    """
+    deltadir = _delta_dir(path)
+    if not os.path.isdir(deltadir):
+        return []
+    return [os.path.join(deltadir, f) for f in sorted(os.listdir(deltadir)) if f.endswith('.feather')]
+
+
+
+def _feather_compression(path):
+    """
+    The compression of a feather file: 'uncompressed' if its columns can be 
+    memory-mapped without copying (see convert_catalog()), else 'lz4'.
+    """
+    with pa.memory_map(path) as source:
+        mapped = source.read_buffer()
+        reader = pa.ipc.open_file(source)
+        if reader.num_record_batches == 0:
+            return 'uncompressed'
+        #::: the buffers of an uncompressed batch point right into the mapped file
+        buffers = [b for column in reader.get_batch(0).columns for b in column.buffers() if (b is not None) and (b.size > 0)]
+        inside = all(mapped.address <= b.address < mapped.address+mapped.size for b in buffers)
+    return 'uncompressed' if inside else 'lz4'
+
+
+
+def _source_stamp(path):
+    """
+    Name, size and modification time of the catalog file (or dataset directory) and all its deltas.
+    
+    Anything derived from the catalog has to be rebuilt whenever this changes.
+    """
+    stamp = []
+    for f in [path] + _delta_files(path):
+        stat = os.stat(f)
+        stamp.append( (os.path.basename(f), stat.st_size, stat.st_mtime_ns) )
+    return tuple(stamp)
+
+
+
+def _source_hash(path):
+    """
+    SHA-1 hash of the content of the catalog file (or dataset directory) and all its deltas.
+    """
+    if os.path.isdir(path):
+        files = sorted(os.path.join(d, f) for d, _, fs in os.walk(path) for f in fs)
+    else:
+        files = [path]
+    sha = hashlib.sha1()
+    for f in files + _delta_files(path):
+        with open(f, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1 << 24), b''):
+                sha.update(chunk)
+    return sha.hexdigest()
+
+
+
+def _cache_dir(path):
+    """
+    The cache directory of a catalog (see catalog(cache=True)).
+    """
+    return path.rstrip(os.sep) + '.cache'
+
+
+
+def _cache_valid(path):
+    """
+    Check whether the prepared catalog in the cache is up to date.
+    
+    The cache is valid if it has the current CACHE_VERSION, and was built 
+    from a catalog file (and deltas) with the same name, size and 
+    modification time -- or, if these changed (e.g. the file was copied), 
+    with the same content hash.
+    """
+    
+    manifestfile = os.path.join(_cache_dir(path), 'manifest.json')
+    try:
+        with open(manifestfile, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    
+    if manifest.get('version', None) != CACHE_VERSION:
+        return False
+    
+    stamp = json.loads(json.dumps(_source_stamp(path)))
+    if manifest.get('stamp', None) == stamp:
+        return True
+    
+    #::: same content, just touched or copied: refresh the stamp and keep the cache
+    if manifest.get('hash', None) == _source_hash(path):
+        manifest['stamp'] = stamp
+        try:
+            with open(manifestfile, 'w') as f:
+                json.dump(manifest, f)
+        except OSError:
+            pass
+        return True
+    
+    return False
+
+
+
+def _prepare_cache(path, n_threads=None):
+    """
+    Build the cache of a catalog (see catalog(cache=True)), unless it is still valid.
+    
+    The cache directory holds the typed catalog with all deltas merged in 
+    (as an uncompressed Arrow file, data.arrow), the TIC_ID index 
+    (tic_sorted.npy, tic_rows.npy), the sector bitmasks (sector_bits.npy),
+    and a manifest.json, which is written last.
+
+    Parameters
+    ----------
+    path : str
+        Path to the catalog (feather) file.
+    n_threads : int, optional
+        See catalog(n_threads=...). The default is None, i.e. all cores.
+
+    Returns
+    -------
+    cachedir : str or None
+        The cache directory; None if it could not be written.
+    """
+    
+    cachedir = _cache_dir(path)
+    if _cache_valid(path):
+        return cachedir
+    
+    #::: prepare everything once, the normal way
+    cat = catalog.__new__(catalog)
+    cat._load(path, keys='all', n_threads=n_threads)
+    manifest = {'version': CACHE_VERSION,
+                'source': os.path.abspath(path),
+                'stamp': json.loads(json.dumps(_source_stamp(path))),
+                'hash': _source_hash(path)}
+    
+    #::: write everything to a temporary directory first, so a failure never leaves a broken cache behind
+    tmpdir = cachedir + '.tmp' + str(os.getpid())
+    try:
+        if os.path.isdir(tmpdir):
+            shutil.rmtree(tmpdir)
+        os.makedirs(tmpdir)
+        pa.feather.write_feather(cat.data, os.path.join(tmpdir, 'data.arrow'), compression='uncompressed', chunksize=FEATHER_CHUNKSIZE)
+        np.save(os.path.join(tmpdir, 'tic_sorted.npy'), cat._tic_sorted)
+        np.save(os.path.join(tmpdir, 'tic_rows.npy'), cat._tic_rows)
+        np.save(os.path.join(tmpdir, 'sector_bits.npy'), cat._sector_bits)
+        with open(os.path.join(tmpdir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        if os.path.isdir(cachedir):
+            shutil.rmtree(cachedir)
+        os.replace(tmpdir, cachedir)
+    except OSError:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        #::: another process may have just built it
+        return cachedir if _cache_valid(path) else None
+    
+    return cachedir
+
+
+
+def ingest(delta, path=None, max_deltas=10, compression=None):
+    """
+    Ingest a delta (e.g. a new TESS sector) into the catalog, without 
+    rewriting the catalog file.
+    
+    The delta is stored next to the catalog file (in path+'.deltas'), and 
+    merged into the catalog whenever it is loaded: targets that are already 
+    in the catalog get the non-null values of the delta (e.g. their updated 
+    'OBS_Sector', 'OBS_Camera' and 'OBS_CCD' strings), and new targets are 
+    appended. Later deltas override earlier ones. Once there are more than 
+    max_deltas deltas, they are compacted into the catalog file (see compact()).
+
+    Parameters
+    ----------
+    delta : pandas.DataFrame or str
+        The delta (or the path to a feather file holding it). It needs a 
+        'TIC_ID' column; all other columns must be catalog keys.
+    path : str, optional
+        Path to the catalog (feather) file or dataset directory. 
+        The default is None, i.e. the path stored by catalog(path=...).
+    max_deltas : int or None, optional
+        Compact once there are more deltas than this. 
+        The default is 10; None never compacts automatically.
+    compression : str, optional
+        The compression of the catalog file when it is compacted, see compact().
+        The default is None, i.e. keep its current compression.
+
+    Returns
+    -------
+    deltafile : str or None
+        The path of the new delta file (None if it was compacted right away).
+    """
+    
+    path = _read_path() if path is None else path
+    if isinstance(delta, str):
+        delta = pd.read_feather(delta)
+    
+    #::: check the delta
+    if 'TIC_ID' not in delta.columns:
+        raise KeyError('The delta needs a TIC_ID column.')
+    unknown = [k for k in delta.columns if k not in KEY_POSITION]
+    if len(unknown) > 0:
+        raise KeyError('Unknown keys in the delta: '+', '.join(unknown)+'. The full list of available keys can be seen by calling catalog.get_all_keys().')
+    delta = _apply_schema(delta.reset_index(drop=True), SCHEMA)
+    
+    #::: store it as the next delta file
+    deltadir = _delta_dir(path)
+    os.makedirs(deltadir, exist_ok=True)
+    files = _delta_files(path)
+    number = int(os.path.basename(files[-1]).split('.')[0])+1 if len(files) > 0 else 1
+    deltafile = os.path.join(deltadir, '{:06d}.feather'.format(number))
+    delta.to_feather(deltafile+'.tmp')
+    os.replace(deltafile+'.tmp', deltafile)
+    
+    #::: compact, if there are too many deltas
+    if (max_deltas is not None) and (len(files)+1 > max_deltas):
+        compact(path, compression=compression)
+        return None
+    return deltafile
+
+
+
+def compact(path=None, compression=None, row_group_size=10000):
+    """
+    Merge all ingested deltas (see ingest()) into the catalog file, and remove them.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to the catalog (feather) file or dataset directory. 
+        The default is None, i.e. the path stored by catalog(path=...).
+    compression : str, optional
+        The compression of a feather file, see convert_catalog(). 
+        The default is None, i.e. keep the current compression (so an 
+        uncompressed catalog for catalog(memory_map=True) stays uncompressed; 
+        compressed files are rewritten with 'lz4').
+    row_group_size : int, optional
+        The row group size of a dataset, see convert_to_dataset(). 
+        The default is 10000.
+
+    Returns
+    -------
+    path : str
+    """
+    
+    path = _read_path() if path is None else path
+    if len(_delta_files(path)) == 0:
+        return path
+    
+    #::: load the merged catalog (without changing the stored path)
+    cat = catalog.__new__(catalog)
+    cat._load(path, keys='all')
+    if cat._dataset is not None:
+        keys = [k for k in cat._dataset.schema.names if k in KEY_POSITION]
+    else:
+        keys = list(cat.data.columns)
+    df = cat._take(None, keys)
+    
+    #::: rewrite the catalog, then remove the deltas
+    if os.path.isdir(path):
+        _write_dataset(df, path, row_group_size=row_group_size)
+    else:
+        if compression is None:
+            compression = _feather_compression(path)
+        df.to_feather(path+'.tmp', compression=compression, chunksize=FEATHER_CHUNKSIZE)
+        os.replace(path+'.tmp', path)
+    shutil.rmtree(_delta_dir(path))
+    
+    return path
+
+
+
+def _freeze(value):
+    """
+    Turn a (nested) query value into a hashable one, for the result cache.
+
+    Parameters
+    ----------
+    value : 
+        Any value of a query, e.g. a predicate of catalog.get(where=...).
+
+    Returns
+    -------
+    value : 
+        The same value, with all lists and arrays as tuples.
+    """
+    
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        return tuple(_freeze(v) for v in value)
+    elif isinstance(value, np.generic):
+        return value.item()
+    else:
+        return value
+
+
+
+#::: the running background loaders (see catalog(background=True)), as (stop, thread)
+_LOADERS = set()
+
+@atexit.register
+def _stop_loaders():
+    """
+    Stop all background loaders before the interpreter shuts down 
+    (a daemon thread that is still reading a file can hang the shutdown).
+    """
+    for stop, thread in list(_LOADERS):
+        stop.set()
+        thread.join()
+
+
+
+class _ResultCache(object):
+    """
+    A bounded LRU cache of query results (see catalog(result_cache=...)).
+    
+    The least recently used results are dropped once there are more than 
+    max_entries results, or once they take more than max_bytes of memory.
+    It can be shared by several threads (e.g. see catalog.aget()).
+    """
+    
+    def __init__(self, max_entries=128, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+            return None
+    
+    def put(self, key, df):
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        if (self.max_bytes is not None) and (nbytes > self.max_bytes):
+            return
+        with self.lock:
+            if key in self.entries:
+                self.nbytes -= self.entries.pop(key)[1]
+            self.entries[key] = (df, nbytes)
+            self.nbytes += nbytes
+            while (len(self.entries) > self.max_entries) or ((self.max_bytes is not None) and (self.nbytes > self.max_bytes)):
+                _, (_, n) = self.entries.popitem(last=False)
+                self.nbytes -= n
+            
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+        
+    def info(self):
+        return {'hits': self.hits, 
+                'misses': self.misses, 
+                'entries': len(self.entries), 
+                'bytes': self.nbytes,
+                'max_entries': self.max_entries, 
+                'max_bytes': self.max_bytes}
+
+
+
+class catalog_stats(object):
+    """
+    Timings and counters of the operations of a catalog (see catalog(stats=True)).
+    
+    Each operation ('load', 'get') is split into phases (e.g. 'read', 
+    'schema', 'tic_index' for loading; 'translate_keys', 'select_tic', 
+    'select_sector', 'select_where', 'materialize' for queries), and 
+    counts e.g. rows_scanned, rows_returned, bytes_loaded, and 
+    result_cache_hits/misses.
+    
+    Attributes
+    ----------
+    calls : dict
+        The number of calls of each operation.
+    seconds : dict
+        The total time of each operation and phase, over all calls.
+    counts : dict
+        The totals of all counters, over all calls.
+    last : dict
+        The operation, seconds and counts of the most recently finished call only.
+    log_level : int or None
+        If given, every call is also logged at this level to the 
+        'tess_infos' logger (see the logging module).
+    """
+    
+    def __init__(self, log_level=None):
+        self.log_level = log_level
+        self._lock = threading.Lock()
+        self.reset()
+        
+    def reset(self):
+        """
+        Set all timings and counters back to zero.
+        """
+        with self._lock:
+            self.calls = {}
+            self.seconds = {}
+            self.counts = {}
+            self.last = {}
+            #::: the call in progress, per thread (e.g. concurrent catalog.aget() calls each have their own)
+            self._local = threading.local()
+    
+    @contextlib.contextmanager
+    def operation(self, name):
+        """
+        Time one call of an operation (nested operations count as phases of the outer one).
+        """
+        local = self._local
+        if getattr(local, 'record', None) is not None:
+            with self.phase(name):
+                yield
+            return
+        local.record = record = {'operation': name, 'seconds': {}, 'counts': {}}
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            local.record = None
+            self._add(self.seconds, record['seconds'], name, perf_counter() - t0)
+            self.last = record
+            if self.log_level is not None:
+                LOGGER.log(self.log_level, '%s', self._format(record))
+    
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Time one phase of the current operation.
+        """
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self._add(self.seconds, self._record('seconds'), name, perf_counter() - t0)
+    
+    def count(self, name, n):
+        """
+        Add n to a counter of the current operation.
+        """
+        self._add(self.counts, self._record('counts'), name, int(n))
+        
+    def _record(self, part):
+        """
+        The seconds or counts of the call in progress in this thread (a throwaway dict if there is none).
+        """
+        record = getattr(self._local, 'record', None)
+        return {} if record is None else record[part]
+        
+    def _add(self, total, last, name, value):
+        with self._lock:
+            total[name] = total.get(name, 0) + value
+        last[name] = last.get(name, 0) + value
+        
+    @staticmethod
+    def _format(record):
+        seconds = ', '.join('{}={:.4f}s'.format(k, v) for k, v in record['seconds'].items())
+        counts = ', '.join('{}={}'.format(k, v) for k, v in record['counts'].items())
+        return '{}: {}{}'.format(record['operation'], seconds, (', '+counts) if counts else '')
+    
+    def as_dict(self):
+        """
+        All timings and counters as one (JSON-serializable) dict.
+        """
+        with self._lock:
+            return {'calls': dict(self.calls), 'seconds': dict(self.seconds), 'counts': dict(self.counts), 'last': dict(self.last)}
+        
+    def __repr__(self):
+        with self._lock:
+            calls, seconds, counts = dict(self.calls), dict(self.seconds), dict(self.counts)
+        lines = ['catalog_stats']
+        for name, n in calls.items():
+            lines.append('  {:<20} {:>8} calls {:>12.4f} s'.format(name, n, seconds.get(name, 0)))
+        for name, sec in seconds.items():
+            if name not in calls:
+                lines.append('    {:<18} {:>21.4f} s'.format(name, sec))
+        for name, n in counts.items():
+            lines.append('  {:<20} {:>14}'.format(name, n))
+        return '\n'.join(lines)
+
+
+
+class catalog(object):
+    """
+    The heart of it.
+    """
+    
+    #::: the instrumentation (see catalog(stats=True)); off for internal catalogs
+    stats = None
+    
+    
+    def __init__(self, keys='all', path=None, lazy=False, memory_map=False, cache=False, n_threads=None, 
+                 result_cache=0, result_cache_bytes=None, stats=False, log_stats=None, background=False):
+        """
+        Initialize the catalog class.
+
+        Parameters
+        ----------
+        keys : list, optional
+             The table columns you want returned. 
+             Options:
+                None / 'default'   defaults to self.default_keys
+                '*' / 'all'        load all columns
+                'OBS'              load all columns starting with OBS_
+                                   (the TESS observing information)
+                'TICv8'            load all columns starting with TICv8_
+                                   (TESS Input Catalog version 8)
+                'GAIADR2'          load all columns starting with GAIADR2_
+                                   (Gaia Data Release 2 information)
+                'BANYAN'           load all columns starting with BANYAN_
+                                   (BANYAN Sigma information)
+             More options (examples):
+                mag                              find and load all TICv8 columns containing magnitudes
+                ['parallax', 'radial_velocity']  find and load columns with those strings
+                ['default','OBS','mag']          find and load all default columns + all columns from OBS + all magnitudes
+             The full list of available keys can be seen by calling 'self.keys'.
+        path : str, optional
+            Path to where the catalog (feather) file is stored on your computer. 
+            This can also be the directory of a partitioned dataset, see 
+            convert_to_dataset(); then only 'TIC_ID' and 'OBS_Sector' are 
+            loaded at first (like in lazy mode), and self.get() only reads 
+            the row groups on disk that hold the requested rows.
+            The default is None.
+        lazy : bool, optional
+            If True, only load 'TIC_ID' and 'OBS_Sector' at first (ignoring keys),
+            and load (and keep) all other columns from the file on first use 
+            in self.get(). This makes the startup sub-second, and the memory 
+            usage scales with what you actually access.
+            The default is False.
+        memory_map : bool, optional
+            If True, memory-map the catalog file instead of reading it into 
+            memory. All processes on a machine then share the same (read-only)
+            pages of the OS page cache, and self.get() only copies the rows and 
+            keys it returns. This needs an uncompressed catalog file, see 
+            convert_catalog(compression='uncompressed'); the dtypes are then 
+            applied to the returned rows only.
+            The default is False.
+        cache : bool, optional
+            If True, keep the fully prepared catalog (typed columns with all 
+            deltas merged in, the TIC_ID index and the sector bitmasks) in a 
+            cache directory next to the catalog file (path+'.cache'), in an 
+            uncompressed, memory-mappable format. It is built on the first 
+            load, and rebuilt automatically whenever the catalog file or its 
+            deltas change. Warm starts then take milliseconds with 
+            lazy=True or memory_map=True. Not used for partitioned datasets.
+            The default is False.
+        n_threads : int, optional
+            The number of threads for decoding the columns on load (pyarrow),
+            converting them to their dtypes, reading row groups, and 
+            gathering and filtering rows in self.get() (columns and row 
+            chunks are processed in parallel). Only large operations 
+            (see PARALLEL_MIN_ROWS) are split up. Use 1 to run everything 
+            in a single thread (pyarrow's own, process-wide thread pool is 
+            then switched off per call, but never resized). 
+            The default is None, i.e. all cores.
+        result_cache : int, optional
+            If > 0, keep the results of up to this many distinct queries of 
+            self.get() in memory, and answer repeated queries from there 
+            (least recently used results are dropped first). Queries are 
+            matched by their set of TIC IDs, set of sectors, actual keys, 
+            and predicates, so e.g. the same TIC IDs in another order are 
+            a hit. Each call still returns its own copy. The cache is 
+            cleared whenever the catalog is (re)loaded, see self.reload(); 
+            its statistics are in self.result_cache_info().
+            The default is 0, i.e. no result cache.
+        result_cache_bytes : int, optional
+            Also drop the least recently used results once all results 
+            together take more than this many bytes of memory. 
+            The default is None, i.e. no limit.
+        stats : bool, optional
+            If True, time every phase of loading and of self.get(), and 
+            count the rows scanned and returned, the bytes loaded, and the 
+            result cache hits, in self.stats (see catalog_stats). 
+            The default is False, i.e. self.stats is None.
+        log_stats : int, optional
+            If given (e.g. logging.INFO), also log the timings and counts 
+            of every load and query at this level to the 'tess_infos' 
+            logger. Implies stats=True. The default is None.
+        background : bool, optional
+            If True, return as soon as 'TIC_ID' and 'OBS_Sector' are loaded 
+            and indexed (as with lazy=True), and load all other keys in a 
+            background thread, one by one, the default keys first (see 
+            self.get_default_keys()). Queries can run right away; keys that 
+            are not loaded yet are read on demand. See self.wait_loaded(),
+            and catalog.aload() for asyncio. 
+            The default is False.
+
+        Returns
+        -------
+        None.
+        """
+        
+        #::: read (and, if given, first save) the path to the catalog file
+        path = _read_path(path)
+        self._load_args = dict(keys=keys, lazy=(lazy or background), memory_map=memory_map, cache=cache, n_threads=n_threads,
+                               result_cache=result_cache, result_cache_bytes=result_cache_bytes)
+        self._background_keys = keys if background else None
+        self.stats = catalog_stats(log_stats) if (stats or (log_stats is not None)) else None
+        with self._operation('load'):
+            self._load(path, **self._load_args)
+        self._start_loader()
+        
+        
+        
+    def reload(self):
+        """
+        Load the catalog again from disk (e.g. after ingest() or compact()), 
+        with the same settings, and clear the result cache.
+
+        Returns
+        -------
+        None.
+        """
+        
+        self._stop_loader()
+        with self._operation('load'):
+            self._load(self.path, **self._load_args)
+        self._start_loader()
+        
+        
+        
+    def _start_loader(self):
+        """
+        Start loading all keys in a background thread (see catalog(background=True)).
+
+        Returns
+        -------
+        None.
+        """
+        
+        self._loader = None
+        if (self._background_keys is None) or (self._data is None):
+            return
+        
+        #::: the default keys first, then all others in catalog order
+        keys = self._translate_keys(self._background_keys)
+        keys = [k for k in DEFAULT_KEYS if k in keys] + [k for k in keys if k not in DEFAULT_KEYS]
+        
+        self._loader_stop = threading.Event()
+        self._loader_done = threading.Event()
+        self._loader_error = None
+        self._loader = threading.Thread(target=self._run_loader, args=(keys, self._loader_stop, self._loader_done), 
+                                        name='tess_infos_loader', daemon=True)
+        _LOADERS.add((self._loader_stop, self._loader))
+        self._loader.start()
+        
+        
+        
+    def _run_loader(self, keys, stop, done):
+        """
+        Load the given keys one by one, until all are loaded or stop is set.
+        """
+        
+        try:
+            for key in keys:
+                if stop.is_set():
+                    return
+                self._load_keys([key])
+            #::: finally, the columns in catalog order (as if loaded at once)
+            with self._keys_lock:
+                self._data = self._data[self.keys]
+        except Exception as e:
+            self._loader_error = e
+        finally:
+            _LOADERS.discard((stop, threading.current_thread()))
+            done.set()
+        
+        
+        
+    def _stop_loader(self):
+        """
+        Stop the background loading (after the key that is being loaded).
+        """
+        
+        if getattr(self, '_loader', None) is not None:
+            self._loader_stop.set()
+            self._loader.join()
+            self._loader = None
+            
+            
+            
+    def wait_loaded(self, timeout=None):
+        """
+        Wait until the background loading is done (see catalog(background=True)).
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Wait at most this many seconds. The default is None, i.e. until done.
+
+        Returns
+        -------
+        done : bool
+            True if all keys are loaded (always True without background loading).
+        """
+        
+        if getattr(self, '_loader', None) is None:
+            return True
+        done = self._loader_done.wait(timeout)
+        if self._loader_error is not None:
+            raise self._loader_error
+        return done
+    
+    
+    
+    @classmethod
+    async def aload(cls, *args, **kwargs):
+        """
+        Load the catalog without blocking the asyncio event loop, e.g.
+            cat = await catalog.aload(keys='all')
+        
+        Takes the same arguments as catalog(), but background defaults to 
+        True: the catalog is returned as soon as it can answer queries, 
+        and all other keys keep loading in a background thread.
+
+        Returns
+        -------
+        cat : catalog
+        """
+        
+        import asyncio
+        kwargs.setdefault('background', True)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(cls, *args, **kwargs))
+    
+    
+    
+    async def aget(self, *args, **kwargs):
+        """
+        Run self.get() without blocking the asyncio event loop, e.g.
+            infos = await cat.aget(tic_id=259377017, keys='Tmag')
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            See self.get().
+        """
+        
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self.get, *args, **kwargs))
+    
+    
+    
+    async def await_loaded(self):
+        """
+        Wait until the background loading is done, without blocking the asyncio event loop.
+
+        Returns
+        -------
+        done : bool
+            See self.wait_loaded().
+        """
+        
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(None, self.wait_loaded)
+        
+        
+        
+    def _operation(self, name):
+        """
+        Time one call of an operation, if self.stats is on (see catalog_stats).
+        """
+        return _NO_STATS if self.stats is None else self.stats.operation(name)
+    
+    
+    
+    def _phase(self, name):
+        """
+        Time one phase of the current operation, if self.stats is on (see catalog_stats).
+        """
+        return _NO_STATS if self.stats is None else self.stats.phase(name)
+    
+    
+    
+    def _count(self, name, n):
+        """
+        Add to a counter of the current operation, if self.stats is on (see catalog_stats).
+        """
+        if self.stats is not None:
+            self.stats.count(name, n)
+        
+        
+        
+    def _load(self, path, keys='all', lazy=False, memory_map=False, cache=False, n_threads=None, 
+              result_cache=0, result_cache_bytes=None):
+        """
+        Load the catalog (see self.__init__()), apply all ingested deltas 
+        (see ingest()), and build all indexes.
+
+        Returns
+        -------
+        None.
+        """
+        
+        self.path = path
+        self.lazy = lazy
+        self.n_threads = _n_threads(n_threads)
+        self._use_threads = _use_threads(n_threads)
+        
+        #::: a fresh (empty) result cache, so that no result of the previous data survives a reload
+        self._result_cache = _ResultCache(result_cache, result_cache_bytes) if result_cache > 0 else None
+        
+        #::: the file to actually read: the catalog file, or its prepared copy in the cache
+        self._file = path
+        self._cachedir = None
+        if cache and os.path.isfile(path):
+            with self._phase('prepare_cache'):
+                self._cachedir = _prepare_cache(path, n_threads=n_threads)
+            if self._cachedir is not None:
+                self._file = os.path.join(self._cachedir, 'data.arrow')
+        
+        #::: translate input into keys
+        if lazy:
+            keys = ['TIC_ID', 'OBS_Sector']
+        else:
+            keys = self._translate_keys(keys)
+        self.keys = keys
+                
+        #::: 15.8 seconds to load all
+        # f = '/Users/mx/Dropbox (Personal)/Science/TESS/TESS_SC_target_lists/unique_targets_S001-S023_obs_tic_gaia_banyan.csv.gz'
+        # self.data = pd.read_csv(f, dtype=str, usecols=keys)
+        
+        #::: 11.8 seconds to load all
+        # f = '/Users/mx/Dropbox (Personal)/Science/TESS/TESS_SC_target_lists/unique_targets_S001-S023_obs_tic_gaia_banyan.h5'
+        # self.data = pd.read_hdf(f, dtype=str, usecols=keys)
+        
+        #::: 8.2 seconds to load all
+        # f = '/Users/mx/Dropbox (Personal)/Science/TESS/TESS_SC_target_lists/unique_targets_S001-S023_obs_tic_gaia_banyan.feather'
+        # self.data = pd.read_feather(f, columns=keys)
+        
+        ## TO DO ## 
+        ## ADD LINK TO DOWNLOAD FROM WHEREEVER THE CATALOG WILL BE STORED   
+        self._data = None
+        self._table = None
+        self._file_batches_cache = None
+        self._file_batch_last = None
+        self._sky_tree_cache = None
+        self._observations_cache = None
+        self._identifier_cache = {}
+        self._banyan_cache = None
+        self._aggregate_cache = {}
+        self._comoving_tree_cache = None
+        self._keys_lock = threading.Lock()
+        self._cached_lock = threading.RLock()
+        self._dataset = None
+        self._delta = None
+        try:
+            with self._phase('read'):
+                if os.path.isdir(path):
+                    #::: a partitioned dataset is always lazy
+                    self.lazy = True
+                    self._open_dataset(path)
+                    self.keys = ['TIC_ID', 'OBS_Sector']
+                    self._data = self._take(None, self.keys)
+                elif memory_map:
+                    #::: only map the file, nothing is copied into memory yet: always map all columns
+                    #::: (pyarrow copies explicitly requested columns into the heap), then select the keys
+                    #::: (in lazy mode keep all columns, they cost nothing until used)
+                    self._table = pa.feather.read_table(self._file, memory_map=True, use_threads=self._use_threads)
+                    if not lazy:
+                        self._table = self._table.select([k for k in keys if k in self._table.column_names])
+                    self.keys = self._table.column_names
+                else:
+                    self._data = pd.read_feather(self._file, columns=keys, use_threads=self._use_threads)
+        except:
+            print('WARNING:',
+                  '--------',
+                  'No catalog found.',
+                  'The following path was searched:',
+                  path,
+                  'You can permanently change this path by calling the function once as catalog(path=blabla).',
+                  'Simply replace blabla with the path were you stored the catalog.',
+                  'If you do not have the latest catalog, please first download it here:',
+                  'https://www.dropbox.com/s/kx5w4xombyvf4tg/unique_targets_S001-S026_obs_tic_gaia_banyan.feather?dl=0',
+                  sep='\n')
+            return
+        
+        if self._dataset is not None:
+            self._n_base = self._row_group_starts[-1]
+        elif self._table is not None:
+            self._n_base = self._table.num_rows
+        else:
+            self._n_base = len(self._data)
+        self._n_rows = self._n_base
+        
+        #::: convert all columns to their proper dtypes 
+        #::: (instant if the catalog file was already converted via convert_catalog())
+        if self._data is not None:
+            with self._phase('schema'):
+                self._data = _apply_schema(self._data, SCHEMA, n_threads=self.n_threads)
+            self._count('bytes_loaded', self._data.memory_usage(index=False).sum())
+        self._count('rows_loaded', self._n_base)
+        
+        #::: the cache already holds the prepared catalog and indexes (memory-mapped)
+        if self._cachedir is not None:
+            with self._phase('load_indexes'):
+                self._tic_sorted = np.load(os.path.join(self._cachedir, 'tic_sorted.npy'), mmap_mode='r')
+                self._tic_rows = np.load(os.path.join(self._cachedir, 'tic_rows.npy'), mmap_mode='r')
+                self._sector_bits = np.load(os.path.join(self._cachedir, 'sector_bits.npy'), mmap_mode='r')
+            return
+        
+        #::: merge all ingested deltas (see ingest()) into the catalog
+        with self._phase('deltas'):
+            self._load_deltas()
+        
+        #::: build the TIC_ID index and sector bitmasks once, for fast lookups in self.get()
+        with self._phase('tic_index'):
+            self._build_tic_index()
+        with self._phase('sector_index'):
+            self._build_sector_index()
+        
+        
+        
+    def _load_deltas(self):
+        """
+        Read all ingested deltas (see ingest()), and merge them into the catalog.
+        
+        All deltas are combined into one (later deltas override earlier 
+        ones), and split into updates of existing targets (self._delta['rows'] 
+        are their row positions, sorted) and new targets (appended after the 
+        last row of the catalog file). Rows in memory are patched right away,
+        all other rows whenever they are read from the file.
+
+        Returns
+        -------
+        None.
+        """
+        
+        files = _delta_files(self.path)
+        if len(files) == 0:
+            return
+        
+        #::: combine all deltas; non-null values in later deltas override earlier ones
+        delta = _apply_schema(pd.concat([pd.read_feather(f) for f in files], ignore_index=True), SCHEMA)
+        delta = delta.groupby('TIC_ID', sort=False).last().reset_index()
+        
+        #::: find the targets that are already in the catalog file
+        self._build_tic_index()
+        rows = self._lookup_tic_rows(delta['TIC_ID'].to_numpy(dtype=float))
+        is_new = (rows < 0)
+        order = np.argsort(rows[~is_new])
+        self._delta = {'rows': rows[~is_new][order],
+                       'update': delta[~is_new].iloc[order].reset_index(drop=True),
+                       'new': delta[is_new].reset_index(drop=True)}
+        self._n_rows = self._n_base + len(self._delta['new'])
+        
+        #::: patch the rows in memory
+        if self._data is not None:
+            self._data = self._apply_delta(self._data)
+            
+            
+            
+    def _apply_delta(self, df, rows=None):
+        """
+        Apply the ingested deltas to rows read from the catalog file.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The rows, as read from the catalog file.
+        rows : array of int, optional
+            The row positions of df (rows of new targets were read as rows 
+            of NaNs). The default is None, i.e. df holds all rows of the 
+            catalog file, and the new targets get appended.
+
+        Returns
+        -------
+        df : pandas.DataFrame
+        """
+        
+        if self._delta is None:
+            return df
+        update, new = self._delta['update'], self._delta['new']
+        
+        if rows is None:
+            pos, src = self._delta['rows'], np.arange(len(update))
+            pos_new, src_new = np.arange(self._n_base, self._n_rows), np.arange(len(new))
+            df = df.reindex(pd.RangeIndex(self._n_rows))
+        else:
+            if len(update) > 0:
+                i = np.minimum(np.searchsorted(self._delta['rows'], rows), len(update)-1)
+                pos = np.flatnonzero(self._delta['rows'][i] == rows)
+                src = i[pos]
+            else:
+                pos = src = np.array([], dtype=int)
+            pos_new = np.flatnonzero(rows >= self._n_base)
+            src_new = rows[pos_new] - self._n_base
+            
+        #::: only patch non-null values, so a delta can update single keys of a target
+        for key in df.columns:
+            patches = [(p, frame[key].to_numpy(dtype=object)[s]) for p, s, frame in [(pos, src, update), (pos_new, src_new, new)] 
+                       if (key in frame.columns) and (len(p) > 0)]
+            if len(patches) == 0:
+                continue
+            values = df[key].to_numpy(dtype=object, copy=True)
+            for p, patch in patches:
+                notnull = ~pd.isna(patch)
+                values[p[notnull]] = patch[notnull]
+            dtype = 'category' if isinstance(df[key].dtype, pd.CategoricalDtype) else df[key].dtype
+            df[key] = pd.Series(values, index=df.index).astype(dtype)
+        return df
+        
+        
+        
+    def _load_keys(self, keys):
+        """
+        Load all keys that are not in memory yet from the catalog file (lazy mode only).
+
+        Parameters
+        ----------
+        keys : list of str
+            The actual keys (see self._translate_keys()).
+
+        Returns
+        -------
+        None.
+        """
+        
+        if (not self.lazy) or (self._table is not None):
+            return
+        
+        missing = [k for k in keys if k not in self._data.columns]
+        if len(missing) == 0:
+            return
+        
+        #::: one at a time (e.g. queries and the background loading), each key is only read once
+        with self._keys_lock:
+            missing = [k for k in keys if k not in self._data.columns]
+            if len(missing) == 0:
+                return
+            
+            #::: read only the missing columns from the file and append them
+            if self._dataset is not None:
+                new = _to_pandas(self._read_row_groups(None, missing), use_threads=self._use_threads)
+            else:
+                new = pd.read_feather(self._file, columns=missing, use_threads=self._use_threads)
+            new = _apply_schema(new, SCHEMA, n_threads=self.n_threads)
+            new = self._apply_delta(new)
+            self._count('bytes_loaded', new.memory_usage(index=False).sum())
+            data = pd.concat([self._data, new], axis=1)
+            self.keys = sorted(data.columns, key=lambda k: KEY_POSITION.get(k, len(ALL_KEYS)))
+            self._data = data
+        
+        
+        
+    @property
+    def data(self):
+        """
+        The full catalog (all loaded keys) as a pandas.DataFrame.
+        
+        If the catalog is memory-mapped, it is only copied into memory once 
+        this is called for the first time.
+        """
+        if self._data is None:
+            self._data = self._apply_delta(_apply_schema(_to_pandas(self._table, use_threads=self._use_threads), SCHEMA, n_threads=self.n_threads))
+        return self._data
+    
+    
+    
+    def _column(self, key):
+        """
+        Get one full column, without materializing any other columns.
+
+        Parameters
+        ----------
+        key : str
+            The actual key.
+
+        Returns
+        -------
+        pandas.Series
+        """
+        
+        if self._table is not None:
+            return self._take(None, [key])[key]
+        else:
+            self._load_keys([key])
+            return self._data[key]
+        
+        
+        
+    def _check_loaded(self, keys):
+        """
+        Raise a KeyError for keys that were not loaded (lazy catalogs load them on demand instead).
+
+        Parameters
+        ----------
+        keys : list of str
+            The actual keys.
+
+        Returns
+        -------
+        None.
+        """
+        
+        if self.lazy:
+            return
+        missing = [k for k in keys if k not in self.keys]
+        if len(missing) > 0:
+            raise KeyError('These keys were not loaded: '+', '.join(missing)+'. Load them via catalog(keys=...), or use catalog(lazy=True) to load keys on first use.')
+        
+        
+        
+    def _take(self, rows, keys, load=True):
+        """
+        Materialize the given rows and keys as a pandas.DataFrame.
+
+        Parameters
+        ----------
+        rows : array of int or None
+            The row positions; -1 returns a row of NaNs. 
+            None returns all rows.
+        keys : list of str
+            The actual keys.
+        load : bool, optional
+            Only for lazy mode: if True, load (and keep) all keys that are 
+            not in memory yet. If False, only read the given rows of these 
+            keys from the (memory-mapped) file. The default is True.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        
+        self._check_loaded(keys)
+        
+        #::: new targets from ingested deltas are not in the catalog file
+        file_rows = rows
+        if (rows is not None) and (self._delta is not None):
+            file_rows = np.where(rows < self._n_base, rows, -1)
+        
+        #::: gather large results column by column in parallel threads
+        n_threads = self.n_threads if (rows is None) or (len(rows) >= PARALLEL_MIN_ROWS) else 1
+        
+        if self._dataset is not None:
+            #::: only read the row groups that hold the requested rows
+            df = _to_pandas(self._read_row_groups(file_rows, keys), use_threads=self._use_threads)
+            return self._apply_delta(_apply_schema(df, SCHEMA, n_threads=n_threads), rows)
+        elif self._table is not None:
+            #::: slice the (memory-mapped) Arrow buffers, and only copy the result
+            table = self._take_table(self._table, file_rows, keys, n_threads)
+            return self._apply_delta(_apply_schema(_to_pandas(table, use_threads=self._use_threads), SCHEMA, n_threads=n_threads), rows)
+        elif self.lazy and (not load) and (rows is not None) and any(k not in self._data.columns for k in keys):
+            #::: lazy mode: read the keys that are not in memory yet for these rows only
+            missing = [k for k in keys if k not in self._data.columns]
+            table = self._read_file_rows(file_rows, missing, n_threads)
+            df = self._apply_delta(_apply_schema(_to_pandas(table, use_threads=self._use_threads), SCHEMA, n_threads=n_threads), rows)
+            df.index = rows
+            df = pd.concat([self._data.reindex(index=rows, columns=[k for k in keys if k not in missing]), df], axis=1)
+            return df[keys]
+        else:
+            #::: in lazy mode, first load all keys that are not in memory yet
+            self._load_keys(keys)
+            if rows is None:
+                return self._data[keys]
+            elif (n_threads > 1) and (len(keys) > 1):
+                columns = _map_threads(lambda key: self._data[key].reindex(rows), keys, n_threads)
+                return pd.concat(columns, axis=1)
+            else:
+                return self._data.reindex(index=rows, columns=keys)
+        
+        
+        
+    def _take_table(self, table, rows, keys, n_threads=1):
+        """
+        Gather the given rows and keys from an Arrow table (one thread per column).
+
+        Parameters
+        ----------
+        table : pyarrow.Table
+            The (memory-mapped) catalog.
+        rows : array of int or None
+            The row positions in the table; -1 returns a row of nulls. 
+            None returns all rows.
+        keys : list of str
+            The actual keys.
+        n_threads : int, optional
+            The number of threads. The default is 1.
+
+        Returns
+        -------
+        pyarrow.Table
+        """
+        
+        table = table.select(keys)
+        if rows is None:
+            return table
+        indices = pa.array(rows, mask=(rows < 0))
+        columns = _map_threads(lambda key: table.column(key).take(indices), keys, n_threads)
+        return pa.table(columns, names=keys)
+        
+        
+        
+    def _file_batches(self):
+        """
+        The record batches of the catalog file (only for reading single rows in lazy mode, see self._read_file_rows()).
+
+        Returns
+        -------
+        names : list of str
+            All keys in the file.
+        starts : array of int
+            The first row of each record batch, and the number of rows at the end.
+        """
+        
+        if self._file_batches_cache is None:
+            with pa.memory_map(self._file) as source:
+                names = pa.ipc.open_file(source).schema.names
+                #::: only decode the (small) TIC_ID column to count the rows of each batch
+                reader = pa.ipc.open_file(source, options=pa.ipc.IpcReadOptions(included_fields=[names.index('TIC_ID')]))
+                lengths = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+            self._file_batches_cache = (names, np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]))
+        return self._file_batches_cache
+        
+        
+        
+    def _read_file_rows(self, rows, keys, n_threads=1):
+        """
+        Read the given rows and keys straight from the (memory-mapped) catalog file.
+        
+        Only the record batches that hold these rows are read, and only the 
+        given keys of them are decompressed, so the memory stays bounded by 
+        the batch size of the file (see FEATHER_CHUNKSIZE), even if it is 
+        compressed.
+
+        Parameters
+        ----------
+        rows : array of int
+            The row positions in the file; -1 returns a row of nulls. 
+        keys : list of str
+            The actual keys.
+        n_threads : int, optional
+            The number of threads. The default is 1.
+
+        Returns
+        -------
+        pyarrow.Table
+        """
+        
+        names, starts = self._file_batches()
+        valid = np.flatnonzero(rows >= 0)
+        batch_ids = np.searchsorted(starts, rows[valid], side='right') - 1
+        
+        pieces, positions = [], []
+        options = pa.ipc.IpcReadOptions(included_fields=sorted(names.index(k) for k in keys), use_threads=self._use_threads)
+        with pa.memory_map(self._file) as source:
+            reader = pa.ipc.open_file(source, options=options)
+            schema = reader.schema
+            for b in np.unique(batch_ids):
+                inside = (batch_ids == b)
+                #::: keep the last decoded batch, as consecutive calls (e.g. of self.iter_batches()) mostly hit the same one
+                last = self._file_batch_last
+                if (last is not None) and (last[:2] == (b, tuple(keys))):
+                    batch = last[2]
+                else:
+                    batch = pa.Table.from_batches([reader.get_batch(int(b))])
+                    self._file_batch_last = (b, tuple(keys), batch)
+                pieces.append(batch.take(pa.array(rows[valid][inside] - starts[b])))
+                positions.append(valid[inside])
+        
+        if len(pieces) == 0:
+            return pa.table([pa.nulls(len(rows), schema.field(k).type) for k in keys], names=keys)
+        
+        #::: back into the order of rows (with nulls for -1)
+        indices = np.full(len(rows), -1, dtype=np.int64)
+        indices[np.concatenate(positions)] = np.arange(len(valid))
+        return self._take_table(pa.concat_tables(pieces), indices, keys, n_threads)
+        
+        
+        
+    def _open_dataset(self, path):
+        """
+        Open a partitioned dataset (see convert_to_dataset()), and list all its row groups.
+        
+        The rows of the catalog are numbered in the order of the row groups,
+        which are kept in self._row_groups together with their statistics 
+        (the min and max of each key), and self._row_group_starts holds the 
+        first row of each row group (plus the total number of rows).
+
+        Parameters
+        ----------
+        path : str
+            The dataset directory.
+
+        Returns
+        -------
+        None.
+        """
+        
+        self._dataset = pyarrow.dataset.dataset(path, format='parquet', partitioning='hive')
+        self._row_groups = []
+        starts = [0]
+        for fragment in self._dataset.get_fragments():
+            for row_group in fragment.row_groups:
+                self._row_groups.append( (fragment.subset(row_group_ids=[row_group.id]), row_group.statistics) )
+                starts.append(starts[-1] + row_group.num_rows)
+        self._row_group_starts = np.array(starts)
+        
+        
+        
+    def _read_row_groups(self, rows, keys):
+        """
+        Read the given rows and keys from the partitioned dataset, touching
+        only the row groups that hold these rows.
+
+        Parameters
+        ----------
+        rows : array of int or None
+            The row positions; -1 returns a row of nulls. 
+            None returns all rows.
+        keys : list of str
+            The actual keys.
+
+        Returns
+        -------
+        pyarrow.Table
+        """
+        
+        schema = self._dataset.schema
+        if rows is None:
+            pieces = _map_threads(lambda rg: rg[0].to_table(schema=schema, columns=keys, use_threads=False), self._row_groups, self.n_threads)
+            return pa.concat_tables(pieces or [schema.empty_table().select(keys)])
+        
+        #::: group the requested rows by row group, and read each needed row group once
+        valid = np.flatnonzero(rows >= 0)
+        group = np.searchsorted(self._row_group_starts, rows[valid], side='right') - 1
+        order = np.argsort(group, kind='stable')
+        
+        def read(chunk):
+            g = group[chunk[0]]
+            table = self._row_groups[g][0].to_table(schema=schema, columns=keys, use_threads=False)
+            return table.take(rows[valid[chunk]] - self._row_group_starts[g])
+        
+        chunks = [chunk for chunk in np.split(order, np.flatnonzero(np.diff(group[order])) + 1) if len(chunk) > 0]
+        n_threads = self.n_threads if len(valid) >= PARALLEL_MIN_ROWS else 1
+        table = pa.concat_tables([schema.empty_table().select(keys)] + _map_threads(read, chunks, n_threads))
+        
+        #::: put the rows back into the requested order (-1 becomes a row of nulls)
+        ind = np.full(len(rows), -1)
+        ind[valid[order]] = np.arange(len(order))
+        return table.take(pa.array(ind, mask=(ind < 0)))
+
+
+
+    def _build_tic_index(self):
+        """
+        Build a sorted integer index over the TIC_ID column.
+        
+        self._tic_sorted holds all TIC IDs as sorted int64 values, and 
+        self._tic_rows holds the matching row positions in the catalog, 
+        so that any TIC ID can be found via np.searchsorted in O(log n).
+
+        Returns
+        -------
+        None.
+        """
+        
+        tic = pd.to_numeric(self._column('TIC_ID'), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        valid = np.isfinite(tic)
+        tic = tic[valid].astype(np.int64)
+        rows = np.flatnonzero(valid)
+        order = np.argsort(tic, kind='stable')
+        self._tic_sorted = tic[order]
+        self._tic_rows = rows[order]
+        
+        
+        
+    def _build_sector_index(self):
+        """
+        Parse the ';'-joined OBS_Sector strings once into a bitmask per target.
+        
+        self._sector_bits is a (rows x words) uint64 array, in which bit 
+        (sector % 64) of word (sector // 64) is set if the target was 
+        observed in that sector. This scales to any number of sectors.
+
+        Returns
+        -------
+        None.
+        """
+        
+        sectors = pd.Series(self._column('OBS_Sector').to_numpy(dtype=object))
+        n_rows = len(sectors)
+        sectors = sectors.str.split(';').explode()
+        sectors = pd.to_numeric(sectors, errors='coerce')
+        valid = sectors.notna().to_numpy()
+        rows = sectors.index.to_numpy()[valid]
+        sectors = sectors.to_numpy()[valid].astype(np.int64)
+        
+        n_words = (sectors.max() // 64 + 1) if len(sectors) > 0 else 1
+        self._sector_bits = np.zeros((n_rows, n_words), dtype=np.uint64)
+        np.bitwise_or.at(self._sector_bits, (rows, sectors // 64), np.left_shift(np.uint64(1), (sectors % 64).astype(np.uint64)))
+        
+        
+        
+    def _in_sectors(self, sector, rows=None):
+        """
+        Check which targets were observed in any of the given sectors.
+
+        Parameters
+        ----------
+        sector : int or list of int
+            The sector(s).
+        rows : array of int, optional
+            Only check these row positions (-1 never matches). 
+            The default is None, i.e. check all rows.
+
+        Returns
+        -------
+        ind : array of bool
+        """
+        
+        n_words = self._sector_bits.shape[1]
+        sector = np.atleast_1d(sector).astype(float).astype(np.int64)
+        sector = sector[ (sector >= 0) & (sector < 64*n_words) ]
+        mask = np.zeros(n_words, dtype=np.uint64)
+        np.bitwise_or.at(mask, sector // 64, np.left_shift(np.uint64(1), (sector % 64).astype(np.uint64)))
+        
+        if rows is None:
+            return _map_chunks(lambda chunk: (self._sector_bits[chunk] & mask).any(axis=1), len(self._sector_bits), self.n_threads)
+        else:
+            return (self._sector_bits[rows] & mask).any(axis=1) & (rows >= 0)
+        
+        
+        
+    def _evaluate_where(self, where, rows):
+        """
+        Evaluate predicates (see self.get()) on the given rows.
+
+        Parameters
+        ----------
+        where : tuple or list of tuples
+            The predicates (key, operator, value).
+        rows : array of int
+            The row positions to check (-1 never matches).
+
+        Returns
+        -------
+        ind : array of bool
+        """
+        
+        if isinstance(where, tuple):
+            where = [where]
+            
+        for key, op, value in where:
+            if key not in KEY_POSITION:
+                raise KeyError('Unknown key in where: '+str(key)+'. The full list of available keys can be seen by calling catalog.get_all_keys().')
+            if (op not in OPERATORS) and (op not in ('between', 'in', 'isnull', 'notnull')):
+                raise ValueError('Unknown operator in where: '+str(op)+'. Options are '+', '.join(list(OPERATORS)+['between', 'in', 'isnull', 'notnull'])+'.')
+        
+        #::: all predicates are checked up front, also those never reached because no rows are left
+        self._check_loaded([key for key, _, _ in where])
+            
+        ind = (rows >= 0)
+        if self._dataset is not None:
+            in_delta = (rows >= self._n_base)
+            if self._delta is not None:
+                in_delta |= np.isin(rows, self._delta['rows'])
+        for key, op, value in where:
+            #::: in a partitioned dataset, skip all row groups whose statistics rule out a match
+            #::: (targets from ingested deltas are always checked: new ones are not in any row group, 
+            #::: and updated ones may no longer match the statistics of their row group)
+            if self._dataset is not None:
+                group = np.searchsorted(self._row_group_starts, rows, side='right') - 1
+                may_match = np.array([_may_match(stats.get(key, None), op, value) for _, stats in self._row_groups] + [False])
+                ind &= may_match[group] | in_delta
+            
+            #::: only look at the rows that still match all previous predicates 
+            #::: (large selections are checked in parallel chunks of rows)
+            left = np.flatnonzero(ind)
+            if len(left) == 0:
+                continue
+            #::: in lazy mode, load the key once up front, not once per chunk
+            #::: (a partitioned dataset only reads the row groups of the remaining rows, see self._match())
+            if self._dataset is None:
+                self._load_keys([key])
+            ind[left] = _map_chunks(lambda chunk: self._match(rows[left[chunk]], key, op, value), len(left), self.n_threads)
+            
+        return ind
+    
+    
+    
+    def _match(self, rows, key, op, value):
+        """
+        Evaluate one predicate (see self.get()) on the given rows.
+
+        Parameters
+        ----------
+        rows : array of int
+            The row positions to check.
+        key, op, value : 
+            The predicate.
+
+        Returns
+        -------
+        match : array of bool
+        """
+        
+        values = self._take(rows, [key])[key].reset_index(drop=True)
+        
+        if op == 'between':
+            match = (values >= value[0]) & (values <= value[1])
+        elif op == 'in':
+            match = values.isin(list(np.atleast_1d(value)))
+        elif op == 'isnull':
+            match = values.isna()
+        elif op == 'notnull':
+            match = values.notna()
+        else:
+            match = OPERATORS[op](values, value)
+        
+        return match.to_numpy(dtype=bool, na_value=False)
+        
+        
+        
+    def _lookup_tic_rows(self, tic_id):
+        """
+        Find the row positions of the given TIC IDs.
+
+        Parameters
+        ----------
+        tic_id : int or list of int
+            The TESS Input Catalog ID(s).
+
+        Returns
+        -------
+        rows : array of int
+            The row positions in the catalog, in the same order as tic_id;
+            -1 for all TIC IDs that are not in the catalog.
+        """
+        
+        tic_id = np.atleast_1d(tic_id).astype(float).astype(np.int64)
+        if len(self._tic_sorted) == 0:
+            return np.full(len(tic_id), -1, dtype=np.int64)
+        pos = np.searchsorted(self._tic_sorted, tic_id)
+        pos = np.minimum(pos, len(self._tic_sorted)-1)
+        found = (self._tic_sorted[pos] == tic_id)
+        return np.where(found, self._tic_rows[pos], -1)
+    
+    
+    
+    def _build_identifier_index(self, key):
+        """
+        Build a sorted index over one cross-identifier column (see IDENTIFIER_KEYS).
+
+        Parameters
+        ----------
+        key : str
+            The identifier key, e.g. 'TICv8_GAIA'.
+
+        Returns
+        -------
+        values : array of int64 or bytes
+            All identifiers of the catalog, sorted (see _normalize_identifiers()).
+        rows : array of int
+            The matching row positions in the catalog.
+        """
+        
+        column = self._column(key)
+        valid = column.notna().to_numpy()
+        rows = np.flatnonzero(valid)
+        if SCHEMA[key] == 'Int64':
+            values = column[valid].to_numpy(dtype=np.int64)
+        else:
+            values = _normalize_identifiers(key, column[valid].to_numpy(dtype=object))
+        keep = (values != b'') if values.dtype.kind == 'S' else (values >= 0)
+        values, rows = values[keep], rows[keep]
+        order = np.argsort(values, kind='stable')
+        return values[order], rows[order]
+    
+    
+    
+    def _identifier_index(self, key):
+        """
+        Get the index over one cross-identifier column (built once, and cached to disk).
+        """
+        
+        if key not in self._identifier_cache:
+            self._identifier_cache[key] = self._cached('index_'+key, lambda: self._build_identifier_index(key))
+        return self._identifier_cache[key]
+    
+    
+    
+    def _lookup_identifier_rows(self, name, values):
+        """
+        Find the row positions of the given cross-identifiers.
+
+        Parameters
+        ----------
+        name : str
+            The kind of identifier, e.g. 'gaia_id' (see IDENTIFIER_KEYS).
+        values : int, str or list
+            The identifier(s).
+
+        Returns
+        -------
+        rows : array of int
+            The row positions in the catalog, in the same order as values;
+            all rows if an identifier belongs to several targets, and -1 if 
+            it is not in the catalog.
+        index : array of int
+            The position in values of each row.
+        """
+        
+        key = IDENTIFIER_KEYS[name]
+        values = _normalize_identifiers(key, values)
+        index_values, index_rows = self._identifier_index(key)
+        
+        #::: the range of matches of each identifier (at least one entry, -1 if there is none)
+        lo = np.searchsorted(index_values, values, side='left')
+        hi = np.searchsorted(index_values, values, side='right')
+        found = (hi > lo)
+        n = np.where(found, hi - lo, 1)
+        index = np.repeat(np.arange(len(values)), n)
+        pos = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + np.repeat(lo, n)
+        found = np.repeat(found, n)
+        rows = np.where(found, index_rows[np.minimum(pos, len(index_rows)-1)] if len(index_rows) > 0 else -1, -1)
+        return rows.astype(np.int64), index
+
+
+
+    def _translate_keys(self, keys):
+        """
+        Translate the user-input into the actual keys.
+        
+        Each distinct input is only translated once, and then looked up 
+        from a cache (see _translate_keys_cached()).
+
+        Parameters
+        ----------
+        keys : str or list of str
+            See above.
+
+        Returns
+        -------
+        list of str
+        """
+        
+        #::: freeze the user-input, so it can be looked up in the cache
+        if (keys is not None) and (not isinstance(keys, str)):
+            keys = tuple(str(k) for k in np.atleast_1d(keys))
+        return list(_translate_keys_cached(keys))
+    
+    
+    
+    def _select_rows(self, tic_id=None, sector=None, where=None, ids=None):
+        """
+        Select the rows for self.get() and self.iter_batches().
+
+        Parameters
+        ----------
+        tic_id, sector, where : 
+            See self.get().
+        ids : dict, optional
+            At most one cross-identifier lookup, e.g. {'gaia_id': [...]} (see self.get()).
+
+        Returns
+        -------
+        rows : array of int or None
+            The row positions (-1 for TIC IDs that are not in the catalog);
+            None for all rows.
+        index : array of int or None
+            The index labels of the returned rows: the position in tic_id 
+            (or in the identifiers) if given, otherwise the row positions.
+        """
+        
+        #::: filter by tic_id(s), select only requested rows
+        #::: (rows are taken by position from the TIC_ID index, in the requested order;
+        #:::  TIC IDs that are not in the catalog return a row of NaNs)
+        rows = index = None
+        if tic_id is not None: 
+            with self._phase('select_tic'):
+                rows = self._lookup_tic_rows(tic_id)
+                index = np.arange(len(rows))
+        elif ids:
+            with self._phase('select_identifier'):
+                (name, values), = ids.items()
+                rows, index = self._lookup_identifier_rows(name, values)
+        
+        
+        #::: filter by sector(s), select only requested rows
+        #::: (a single bitwise-AND against the precomputed sector bitmasks)
+        if sector is not None: 
+            with self._phase('select_sector'):
+                self._count('rows_scanned', self._n_rows if rows is None else len(rows))
+                if rows is None:
+                    rows = np.flatnonzero(self._in_sectors(sector))
+                    index = rows
+                else:
+                    ind = self._in_sectors(sector, rows)
+                    rows = rows[ind]
+                    index = index[ind]
+            
+            
+        #::: filter by predicate(s) on any keys, select only matching rows
+        #::: (evaluated column by column, and only on the rows that are still left)
+        if where is not None: 
+            with self._phase('select_where'):
+                if rows is None:
+                    rows = np.arange(self._n_rows)
+                    index = rows
+                self._count('rows_scanned', len(rows))
+                ind = self._evaluate_where(where, rows)
+                rows = rows[ind]
+                index = index[ind]
+            
+        return rows, index
+    
+    
+    
+    def get(self, tic_id=None, sector=None, keys=None, where=None, gaia_id=None, twomass=None, hip=None, tyc=None, kic=None):
+        """
+        Parameters
+        ----------
+        tic_id : int, optional
+             The TESS Input Catalog ID for an object.
+        sector : list, optional
+             The sectors you want to search for stars.
+        keys : list, optional
+             The table columns you want returned. 
+             Options:
+                None / 'default'   defaults to self.default_keys
+                '*' / 'all'        load all columns
+                'OBS'              load all columns starting with OBS_
+                                   (the TESS observing information)
+                'TICv8'            load all columns starting with TICv8_
+                                   (TESS Input Catalog version 8)
+                'GAIADR2'          load all columns starting with GAIADR2_
+                                   (Gaia Data Release 2 information)
+                'BANYAN'           load all columns starting with BANYAN_
+                                   (BANYAN Sigma information)
+             More options (examples):
+                mag                              find and load all TICv8 columns containing magnitudes
+                ['parallax', 'radial_velocity']  find and load columns with those strings
+                ['default','OBS','mag']          find and load all default columns + all columns from OBS + all magnitudes
+             The full list of available keys can be seen by calling 'self.keys'.
+        where : tuple or list of tuples, optional
+             Only return rows matching all these predicates, each given as 
+             (key, operator, value), with the full key name, e.g.
+                ('TICv8_Tmag', '<', 10)
+                [('TICv8_Teff', 'between', (3000, 4000)), ('BANYAN_YA_PROB', '>', 0.9)]
+             Operators: '<', '<=', '>', '>=', '==', '!=', 
+                        'between' (value = (min, max), inclusive), 
+                        'in' (value = list), 'isnull', 'notnull' (value = None)
+             Only the keys used in the predicates are read (in lazy mode),
+             and only the matching rows are materialized.
+        gaia_id, twomass, hip, tyc, kic : int, str or list, optional
+             Instead of tic_id, look up targets by their Gaia DR2 source_id,
+             2MASS designation, HIP, TYC or KIC number (TICv8_GAIA, 
+             TICv8_TWOMASS, TICv8_HIP, TICv8_TYC, TICv8_KIC), e.g.
+                gaia_id=[5853498713160606720, 4706630501049679744]
+                twomass='J04051234-1234567', hip='HIP 12345'
+             Like for tic_id, the rows follow the requested order (the index 
+             holds the position in the input), identifiers that are not in 
+             the catalog return a row of NaNs, and identifiers shared by 
+             several targets return all of them. Only one kind of identifier
+             (or tic_id) can be given at a time.
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+        """
+        
+        ids = {name: values for name, values in [('gaia_id', gaia_id), ('twomass', twomass), ('hip', hip), ('tyc', tyc), ('kic', kic)] 
+               if values is not None}
+        if len(ids) + (tic_id is not None) > 1:
+            raise ValueError('Only one of tic_id, '+', '.join(IDENTIFIER_KEYS)+' can be given at a time.')
+
+        with self._operation('get'):
+            #::: translate user-input into keys                                                                                                                                          
+            with self._phase('translate_keys'):
+                keys2 = self._translate_keys(keys)
+            
+            
+            #::: answer repeated queries from the result cache, if any
+            if self._result_cache is not None:
+                df2 = self._get_cached(tic_id, sector, keys2, where, ids)
+            else:
+                df2 = self._get(tic_id, sector, keys2, where, ids)
+            self._count('rows_returned', len(df2))
+            
+            
+        if len(df2) == 0:
+            print("This combination of TIC ID/Sectors is incorrect.")
+            return None
+        else:
+            return df2
+    
+    
+    
+    def _get(self, tic_id, sector, keys2, where, ids=None):
+        """
+        Select and materialize the rows of self.get().
+
+        Parameters
+        ----------
+        tic_id, sector, where : 
+            See self.get().
+        keys2 : list of str
+            The actual keys.
+        ids : dict, optional
+            See self._select_rows().
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+        """
+        
+        #::: select the requested rows
+        rows, index = self._select_rows(tic_id=tic_id, sector=sector, where=where, ids=ids)
+            
+        #::: only now materialize the requested rows and keys
+        with self._phase('materialize'):
+            df2 = self._take(rows, keys2)
+            if rows is not None:
+                df2.index = index
+        return df2
+    
+    
+    
+    def _get_cached(self, tic_id, sector, keys2, where, ids=None):
+        """
+        Look up the rows of self.get() in the result cache, or compute and store them.
+        
+        Results are stored for the sorted, unique TIC IDs of a query, and 
+        then handed out in the requested order (with the requested index).
+        Cross-identifier queries are stored as they were asked.
+
+        Parameters
+        ----------
+        tic_id, sector, where : 
+            See self.get().
+        keys2 : list of str
+            The actual keys.
+        ids : dict, optional
+            See self._select_rows().
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            A copy, which the caller may change freely.
+        """
+        
+        #::: normalize the query
+        if tic_id is not None:
+            tic_id = np.atleast_1d(tic_id).astype(float).astype(np.int64)
+            unique_tic_ids, inverse = np.unique(tic_id, return_inverse=True)
+        if sector is not None:
+            sector = np.unique(np.atleast_1d(sector).astype(float).astype(np.int64))
+        query = (None if tic_id is None else _freeze(unique_tic_ids), 
+                 None if sector is None else _freeze(sector), 
+                 tuple(keys2), 
+                 _freeze(where),
+                 _freeze(sorted(ids.items())) if ids else None)
+        try:
+            hash(query)
+        except TypeError:
+            return self._get(tic_id, sector, keys2, where, ids)
+        
+        df = self._result_cache.get(query)
+        self._count('result_cache_misses' if df is None else 'result_cache_hits', 1)
+        if df is None:
+            df = self._get(None if tic_id is None else unique_tic_ids, sector, keys2, where, ids)
+            self._result_cache.put(query, df)
+        
+        if tic_id is None:
+            return df.copy()
+        
+        #::: hand out the rows of the unique TIC IDs in the requested order
+        keep = np.isin(inverse, df.index)
+        df2 = df.loc[inverse[keep]]
+        df2.index = np.flatnonzero(keep)
+        return df2
+    
+    
+    
+    def result_cache_info(self):
+        """
+        The statistics of the result cache (see catalog(result_cache=...)).
+
+        Returns
+        -------
+        info : dict
+            The number of hits and misses (since the last (re)load), 
+            the number of stored results and their total bytes, and the 
+            limits max_entries and max_bytes. None if there is no result cache.
+        """
+        
+        if self._result_cache is None:
+            return None
+        return self._result_cache.info()
+    
+    
+    
+    def clear_result_cache(self):
+        """
+        Drop all stored results from the result cache (the statistics are kept).
+
+        Returns
+        -------
+        None.
+        """
+        
+        if self._result_cache is not None:
+            self._result_cache.clear()
+    
+    
+    
+    def iter_batches(self, tic_id=None, sector=None, keys=None, where=None, batch_size=10000, arrow=False):
+        """
+        Iterate over the rows of self.get() in batches, in bounded memory.
+        
+        The rows are selected exactly like in self.get(), but only 
+        batch_size rows are materialized at a time. In lazy mode, the keys 
+        that are not in memory yet are read batch by batch from the 
+        (memory-mapped) catalog file, instead of being loaded completely; 
+        memory-mapped catalogs and partitioned datasets always read only 
+        the rows of the current batch.
+
+        Parameters
+        ----------
+        tic_id, sector, keys, where : 
+            See self.get().
+        batch_size : int, optional
+            The number of rows per batch. The default is 10000.
+        arrow : bool, optional
+            If True, yield pyarrow.RecordBatch objects instead of 
+            pandas.DataFrame objects. The default is False.
+
+        Yields
+        ------
+        df2 : pandas.DataFrame or pyarrow.RecordBatch
+            The next batch of rows (with the same index as in self.get()).
+        """
+        
+        #::: select the rows right away (not on the first batch), so that 
+        #::: unknown or unloaded keys raise the same KeyError as in self.get()
+        keys2 = self._translate_keys(keys)
+        self._check_loaded(keys2)
+        rows, index = self._select_rows(tic_id=tic_id, sector=sector, where=where)
+        if rows is None:
+            rows = index = np.arange(self._n_rows)
+        return self._iter_batches(rows, index, keys2, batch_size, arrow)
+    
+    
+    
+    def _iter_batches(self, rows, index, keys2, batch_size, arrow):
+        """
+        Yield the batches of self.iter_batches() for the selected rows.
+        """
+        
+        for start in range(0, len(rows), batch_size):
+            df2 = self._take(rows[start:start+batch_size], keys2, load=False)
+            df2.index = index[start:start+batch_size]
+            if arrow:
+                yield pa.RecordBatch.from_pandas(df2, preserve_index=False)
+            else:
+                yield df2
+    
+    
+    
+    def get_many(self, requests, concat=False):
+        """
+        Get many (tic_id, keys) requests at once.
+        
+        All TIC IDs are resolved in one indexed pass, and the rows for each 
+        distinct set of keys are materialized only once, so the cost scales 
+        with the unique rows touched rather than the number of requests.
+
+        Parameters
+        ----------
+        requests : list of tuples
+             Each request is a tuple (tic_id, keys), with tic_id and keys as 
+             in self.get(), e.g.
+                [(259377017, 'Tmag'), ([1078, 2733208], 'BANYAN'), (1078, 'Tmag')]
+        concat : bool, optional
+             If True, return all results in one long-form pandas.DataFrame,
+             with the request number as the first index level.
+             The default is False.
+
+        Returns
+        -------
+        results : list of pandas.DataFrame, or pandas.DataFrame
+            One DataFrame per request (in the same order as requests), 
+            each exactly like self.get(tic_id=tic_id, keys=keys).
+        """
+        
+        #::: resolve all TIC IDs in one indexed pass
+        tic_ids = [np.atleast_1d(t).astype(float).astype(np.int64) for t, _ in requests]
+        lengths = [len(t) for t in tic_ids]
+        unique_tic_ids, inverse = np.unique(np.concatenate(tic_ids) if len(tic_ids) > 0 else np.array([], dtype=np.int64), return_inverse=True)
+        rows = np.split(self._lookup_tic_rows(unique_tic_ids)[inverse], np.cumsum(lengths)[:-1])
+        
+        #::: group the requests by their actual keys
+        groups = {}
+        for i, (_, keys) in enumerate(requests):
+            groups.setdefault(tuple(self._translate_keys(keys)), []).append(i)
+        
+        #::: materialize the rows of each key group once, then hand them out per request
+        results = [None]*len(requests)
+        for keys2, members in groups.items():
+            keys2 = list(keys2)
+            block_rows = np.unique(np.concatenate([rows[i] for i in members]))
+            block = self._take(block_rows, keys2)
+            for i in members:
+                df2 = block.iloc[np.searchsorted(block_rows, rows[i])]
+                df2.index = pd.RangeIndex(len(df2))
+                results[i] = df2
+        
+        if concat:
+            return pd.concat(results, keys=range(len(results)), names=['request', None])
+        else:
+            return results
+    
+    
+    
+    def _cached(self, name, build):
+        """
+        Load a derived structure (e.g. an index) from its cache file in the
+        cache directory next to the catalog file, or build it and save it there.
+        
+        The cache file is rebuilt automatically whenever the catalog file 
+        or its deltas change (size or modification time). If the cache file cannot be 
+        written (e.g. a read-only directory), the structure is only kept 
+        in memory.
+
+        Parameters
+        ----------
+        name : str
+            Name of the structure; the cache file is name+'.pkl'.
+        build : callable
+            Builds the structure, if there is no valid cache file.
+
+        Returns
+        -------
+        The structure.
+        """
+        
+        cachefile = os.path.join(_cache_dir(self.path), name + '.pkl')
+        stamp = _source_stamp(self.path)
+        
+        #::: one structure at a time (e.g. concurrent queries of a server), so each is only built once
+        with self._cached_lock:
+            try:
+                with open(cachefile, 'rb') as f:
+                    cached_stamp, obj = pickle.load(f)
+                if cached_stamp == stamp:
+                    return obj
+            except Exception:
+                pass
+            
+            #::: write to a temporary file first, so other processes never read a half-written one
+            obj = build()
+            try:
+                os.makedirs(_cache_dir(self.path), exist_ok=True)
+                tmpfile = cachefile + '.' + str(os.getpid()) + '.tmp'
+                with open(tmpfile, 'wb') as f:
+                    pickle.dump((stamp, obj), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpfile, cachefile)
+            except OSError:
+                pass
+            return obj
+    
+    
+    
+    def _build_sky_tree(self):
+        """
+        Build a KD-tree over the TICv8_ra / TICv8_dec positions (as unit vectors).
+
+        Returns
+        -------
+        tree : scipy.spatial.cKDTree
+        rows : array of int
+            The row position in the catalog of each point in the tree.
+        """
+        
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            raise ImportError('cone_search() and crossmatch() need scipy; please install it via "pip install scipy".')
+        
+        xyz = _radec_to_xyz(self._column('TICv8_ra').to_numpy(dtype=float, na_value=np.nan), 
+                            self._column('TICv8_dec').to_numpy(dtype=float, na_value=np.nan))
+        valid = np.isfinite(xyz).all(axis=1)
+        return cKDTree(xyz[valid]), np.flatnonzero(valid)
+    
+    
+    
+    def _sky_tree(self):
+        """
+        Get the KD-tree over all positions (built once, and cached to disk).
+        """
+        
+        if getattr(self, '_sky_tree_cache', None) is None:
+            self._sky_tree_cache = self._cached('sky_tree', self._build_sky_tree)
+        return self._sky_tree_cache
+        
+        
+    
+    def cone_search(self, ra, dec, radius, keys=None):
+        """
+        Get all targets within a given radius of a sky position.
+
+        Parameters
+        ----------
+        ra : float
+            Right ascension in degrees.
+        dec : float
+            Declination in degrees.
+        radius : float
+            Search radius in arcsec.
+        keys : list, optional
+            The table columns you want returned, see self.get().
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            All targets within the radius, sorted by their distance, with an 
+            additional column 'separation' (in arcsec). The index holds the 
+            row positions in the catalog. Empty if there are no targets 
+            within the radius.
+        """
+        
+        df2 = self.crossmatch(ra, dec, radius, keys=keys)
+        df2 = df2.sort_values('separation', kind='stable').drop(columns='input_index')
+        df2.index = df2.pop('row')
+        df2.index.name = None
+        return df2
+    
+    
+    
+    def crossmatch(self, ra, dec, radius, keys=None, nearest=False):
+        """
+        Crossmatch many sky positions against the catalog at once.
+
+        Parameters
+        ----------
+        ra : float or array of float
+            Right ascension(s) in degrees.
+        dec : float or array of float
+            Declination(s) in degrees.
+        radius : float
+            Matching radius in arcsec.
+        keys : list, optional
+            The table columns you want returned, see self.get().
+        nearest : bool, optional
+            If True, only return the closest target for each position. 
+            The default is False, i.e. return all targets within the radius.
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            One row per match, with the additional columns 'input_index'
+            (the position in ra/dec), 'row' (the row position in the catalog)
+            and 'separation' (in arcsec), sorted by input_index. Positions 
+            without any match within the radius are not included.
+        """
+        
+        tree, tree_rows = self._sky_tree()
+        keys2 = self._translate_keys(keys)
+        
+        #::: query all positions at once (an angle on the sky is a chord between unit vectors)
+        xyz = _radec_to_xyz(np.atleast_1d(ra).astype(float), np.atleast_1d(dec).astype(float))
+        chord = 2. * np.sin( np.deg2rad(radius/3600.) / 2. )
+        matches = tree.query_ball_point(xyz, chord)
+        lengths = np.array([len(m) for m in matches], dtype=np.int64)
+        points = np.concatenate([np.asarray(m, dtype=np.int64) for m in matches]) if lengths.sum() > 0 else np.array([], dtype=np.int64)
+        input_index = np.repeat(np.arange(len(xyz)), lengths)
+        
+        #::: the exact separations (in arcsec)
+        d = np.linalg.norm(tree.data[points] - xyz[input_index], axis=1)
+        separation = np.rad2deg( 2. * np.arcsin(np.minimum(d/2., 1.)) ) * 3600.
+        
+        #::: sort by input_index, then separation; and optionally only keep the closest
+        order = np.lexsort((separation, input_index))
+        points, input_index, separation = points[order], input_index[order], separation[order]
+        if nearest:
+            first = np.r_[True, input_index[1:] != input_index[:-1]] if len(input_index) > 0 else np.array([], dtype=bool)
+            points, input_index, separation = points[first], input_index[first], separation[first]
+        
+        rows = tree_rows[points]
+        df2 = self._take(rows, keys2)
+        df2.index = pd.RangeIndex(len(df2))
+        df2.insert(0, 'input_index', input_index)
+        df2.insert(1, 'row', rows)
+        df2['separation'] = separation
+        return df2
+    
+    
+    
+    def _build_observations(self):
+        """
+        Explode the ';'-joined OBS_Sector, OBS_Camera and OBS_CCD strings 
+        into one compact table with one entry per observation.
+        
+        The entries are stored in row order (self-contained per target, 
+        found via 'row_starts'), and 'order' sorts them by 'code', i.e. by 
+        sector, camera and CCD, so both directions are a np.searchsorted.
+        Cameras and CCDs that do not match the sectors of a target are 0.
+
+        Returns
+        -------
+        obs : dict of arrays
+            'row' (int32), 'sector', 'camera', 'ccd' (uint8) per observation;
+            'row_starts' (int64, n_rows+1) the first observation of each row;
+            'order' (int64) the observations sorted by 'code' (int64, sorted).
+        """
+        
+        sectors = pd.Series(self._column('OBS_Sector').to_numpy(dtype=object)).str.split(';')
+        n_obs = sectors.str.len().fillna(0).to_numpy(dtype=np.int64)
+        rows = np.repeat(np.arange(len(sectors), dtype=np.int32), n_obs)
+        
+        def explode(values, aligned):
+            values = pd.to_numeric(values[aligned].explode(), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            out = np.zeros(n_obs.sum(), dtype=float)
+            out[np.repeat(aligned, n_obs)] = values
+            return np.nan_to_num(out, nan=0.)
+        
+        obs = {'row': rows, 'sector': explode(sectors, n_obs > 0)}
+        for key, name in [('OBS_Camera', 'camera'), ('OBS_CCD', 'ccd')]:
+            values = pd.Series(self._column(key).to_numpy(dtype=object)).str.split(';')
+            aligned = (values.str.len().fillna(-1).to_numpy(dtype=np.int64) == n_obs) & (n_obs > 0)
+            obs[name] = explode(values, aligned)
+        
+        dtype = np.uint8 if obs['sector'].max(initial=0) < 256 else np.uint16
+        obs['sector'] = obs['sector'].astype(dtype)
+        obs['camera'] = obs['camera'].astype(np.uint8)
+        obs['ccd'] = obs['ccd'].astype(np.uint8)
+        obs['row_starts'] = np.r_[0, np.cumsum(n_obs)]
+        code = _observation_code(obs['sector'], obs['camera'], obs['ccd'])
+        obs['order'] = np.argsort(code, kind='stable')
+        obs['code'] = code[obs['order']]
+        return obs
+    
+    
+    
+    def _observations(self):
+        """
+        Get the observation table (built once, and cached to disk).
+        """
+        
+        if getattr(self, '_observations_cache', None) is None:
+            self._observations_cache = self._cached('observations', self._build_observations)
+        return self._observations_cache
+    
+    
+    
+    def _select_observations(self, tic_id=None, sector=None, camera=None, ccd=None):
+        """
+        Select entries of the observation table (see self.observations()).
+
+        Returns
+        -------
+        selected : array of int
+            The positions in the observation table.
+        index : array of int
+            The position in tic_id if given, otherwise the row positions.
+        """
+        
+        obs = self._observations()
+        
+        #::: by TIC ID: all observations of each target, in the requested order
+        if tic_id is not None:
+            rows = self._lookup_tic_rows(tic_id)
+            valid = (rows >= 0)
+            starts = np.where(valid, obs['row_starts'][np.maximum(rows, 0)], 0)
+            lengths = np.where(valid, obs['row_starts'][np.maximum(rows, 0)+1] - starts, 0)
+            offsets = np.cumsum(lengths) - lengths
+            selected = np.arange(lengths.sum()) - np.repeat(offsets, lengths) + np.repeat(starts, lengths)
+            index = np.repeat(np.arange(len(rows)), lengths)
+            if sector is not None:
+                keep = np.isin(obs['sector'][selected], np.atleast_1d(sector).astype(float).astype(np.int64))
+                selected, index = selected[keep], index[keep]
+        
+        #::: by sector: contiguous ranges of the sorted codes, one per sector
+        elif sector is not None:
+            sector = np.unique(np.atleast_1d(sector).astype(float).astype(np.int64))
+            lo = np.searchsorted(obs['code'], _observation_code(sector, 0, 0))
+            hi = np.searchsorted(obs['code'], _observation_code(sector+1, 0, 0))
+            selected = obs['order'][np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)])] if len(sector) > 0 else np.array([], dtype=np.int64)
+            index = None
+        
+        else:
+            selected = obs['order']
+            index = None
+        
+        #::: by camera and CCD: integer comparisons on what is left
+        for values, name in [(camera, 'camera'), (ccd, 'ccd')]:
+            if values is not None:
+                keep = np.isin(obs[name][selected], np.atleast_1d(values).astype(float).astype(np.int64))
+                selected = selected[keep]
+                if index is not None:
+                    index = index[keep]
+        
+        if index is None:
+            index = obs['row'][selected].astype(np.int64)
+        return selected, index
+    
+    
+    
+    def observations(self, tic_id=None, sector=None, camera=None, ccd=None):
+        """
+        Get the individual observations (sector, camera, CCD) of targets.
+        
+        The ';'-joined OBS_Sector, OBS_Camera and OBS_CCD strings are 
+        exploded only once into a compact integer table (cached to disk), 
+        so e.g. "which camera/CCD was TIC X on in sector 14" or "everything 
+        on camera 2, CCD 3 in sector 20" are plain integer operations.
+
+        Parameters
+        ----------
+        tic_id : int or list of int, optional
+            Only observations of these targets. 
+        sector : int or list of int, optional
+            Only observations in these sectors.
+        camera : int or list of int, optional
+            Only observations on these cameras (1-4).
+        ccd : int or list of int, optional
+            Only observations on these CCDs (1-4).
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            One row per observation, with the columns 'TIC_ID', 'sector', 
+            'camera' and 'ccd' (0 if unknown). If tic_id is given, the 
+            observations of each target follow the order of tic_id, and 
+            the index holds the position in tic_id (TIC IDs that are not 
+            in the catalog have no observations). Otherwise they are 
+            sorted by sector, camera and CCD, and the index holds the 
+            row positions in the catalog.
+        """
+        
+        obs = self._observations()
+        selected, index = self._select_observations(tic_id=tic_id, sector=sector, camera=camera, ccd=ccd)
+        rows = obs['row'][selected].astype(np.int64)
+        return pd.DataFrame({'TIC_ID': self._take(rows, ['TIC_ID'])['TIC_ID'].to_numpy(), 
+                             'sector': obs['sector'][selected], 
+                             'camera': obs['camera'][selected], 
+                             'ccd': obs['ccd'][selected]}, index=index)
+    
+    
+    
+    def get_on_ccd(self, sector, camera=None, ccd=None, keys=None):
+        """
+        Get all targets observed on the given camera(s)/CCD(s) in the given sector(s).
+
+        Parameters
+        ----------
+        sector : int or list of int
+            The sector(s).
+        camera : int or list of int, optional
+            The camera(s) (1-4). The default is None, i.e. all cameras.
+        ccd : int or list of int, optional
+            The CCD(s) (1-4). The default is None, i.e. all CCDs.
+        keys : list, optional
+            The table columns you want returned, see self.get().
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            One row per target, in catalog order; the index holds the row 
+            positions in the catalog. Empty if there are no such targets.
+        """
+        
+        keys2 = self._translate_keys(keys)
+        selected, _ = self._select_observations(sector=sector, camera=camera, ccd=ccd)
+        rows = np.unique(self._observations()['row'][selected]).astype(np.int64)
+        df2 = self._take(rows, keys2)
+        df2.index = rows
+        return df2
+    
+    
+    
+    def _build_banyan(self):
+        """
+        Parse the BANYAN_LIST_PROB_YAS strings once into a probability matrix.
+
+        Returns
+        -------
+        names : array of str
+            The associations (columns of the matrix), sorted.
+        rows : array of int
+            The row positions in the catalog of all targets with any 
+            association probability (rows of the matrix), sorted.
+        matrix : array of float32, shape (len(rows), len(names))
+            The probability of each target to belong to each association
+            (0 if the association is not listed).
+        """
+        
+        lists = pd.Series(self._column('BANYAN_LIST_PROB_YAS').to_numpy(dtype=object)).dropna().astype(str)
+        entries = lists.str.extractall(BANYAN_PATTERN)
+        entries = entries[entries[0].str.len() > 0]
+        entry_rows = entries.index.get_level_values(0).to_numpy()
+        rows, row_codes = np.unique(entry_rows, return_inverse=True)
+        names, name_codes = np.unique(entries[0].str.upper().to_numpy(dtype=str), return_inverse=True)
+        matrix = np.zeros((len(rows), len(names)), dtype=np.float32)
+        matrix[row_codes, name_codes] = pd.to_numeric(entries[1], errors='coerce').fillna(0).to_numpy(dtype=np.float32)
+        return names, rows.astype(np.int64), matrix
+    
+    
+    
+    def _banyan(self):
+        """
+        Get the BANYAN probability matrix (built once, and cached to disk).
+        """
+        
+        if getattr(self, '_banyan_cache', None) is None:
+            self._banyan_cache = self._cached('banyan', self._build_banyan)
+        return self._banyan_cache
+    
+    
+    
+    def _association_columns(self, names, associations):
+        """
+        Find the matrix columns of the given association names (case-insensitive).
+        """
+        
+        associations = [str(a).upper() for a in np.atleast_1d(associations)]
+        unknown = [a for a in associations if a not in names]
+        if len(unknown) > 0:
+            raise KeyError('Unknown association(s): '+', '.join(unknown)+'. Options are '+', '.join(names)+'.')
+        return np.searchsorted(names, associations)
+    
+    
+    
+    def get_associations(self):
+        """
+        Get all young associations that appear in BANYAN_LIST_PROB_YAS.
+
+        Returns
+        -------
+        names : list of str
+        """
+        
+        return self._banyan()[0].tolist()
+    
+    
+    
+    def banyan_probabilities(self, tic_id=None, associations=None):
+        """
+        Get the BANYAN Sigma membership probabilities per young association.
+        
+        The packed BANYAN_LIST_PROB_YAS strings (e.g. 'BPMG(0.91);THA(0.02)')
+        are parsed only once into a float32 matrix (cached to disk), so all 
+        queries are vectorized.
+
+        Parameters
+        ----------
+        tic_id : int or list of int, optional
+            Only these targets, in this order. The default is None, i.e. all
+            targets with any association probability.
+        associations : str or list of str, optional
+            Only these associations (e.g. 'BPMG'). The default is None, 
+            i.e. all (see self.get_associations()).
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            One column (float32) per association; 0 if it is not listed for 
+            a target, NaN for TIC IDs that are not in the catalog. The index 
+            holds the position in tic_id if given, otherwise the row 
+            positions in the catalog.
+        """
+        
+        names, rows, matrix = self._banyan()
+        columns = np.arange(len(names)) if associations is None else self._association_columns(names, associations)
+        
+        if tic_id is None:
+            return pd.DataFrame(matrix[:, columns], index=rows, columns=names[columns])
+        
+        tic_rows = self._lookup_tic_rows(tic_id)
+        pos = np.minimum(np.searchsorted(rows, tic_rows), max(len(rows)-1, 0))
+        listed = (rows[pos] == tic_rows) if len(rows) > 0 else np.zeros(len(tic_rows), dtype=bool)
+        probs = np.zeros((len(tic_rows), len(columns)), dtype=np.float32)
+        probs[listed] = matrix[pos[listed]][:, columns]
+        probs[tic_rows < 0] = np.nan
+        return pd.DataFrame(probs, columns=names[columns])
+    
     
     
-    def __init__(self, keys='all', path=None):
+    def get_association(self, association, min_prob=0.5, top=None, keys=None):
         """
-        Initialize the catalog class.
+        Get the most likely members of young association(s), ranked by probability.
 
         Parameters
         ----------
+        association : str or list of str
+            The association(s), e.g. 'BPMG' or ['BPMG', 'THA'] (see 
+            self.get_associations()); for several, the highest of their 
+            probabilities counts.
+        min_prob : float, optional
+            Only targets with at least this probability. The default is 0.5.
+        top : int, optional
+            Only the top most likely members. The default is None, i.e. all.
         keys : list, optional
-             The table columns you want returned. 
-             Options:
-                None / 'default'   defaults to self.default_keys
-                '*' / 'all'        load all columns
-                'OBS'              load all columns starting with OBS_
-                                   (the TESS observing information)
-                'TICv8'            load all columns starting with TICv8_
-                                   (TESS Input Catalog version 8)
-                'GAIADR2'          load all columns starting with GAIADR2_
-                                   (Gaia Data Release 2 information)
-                'BANYAN'           load all columns starting with BANYAN_
-                                   (BANYAN Sigma information)
-             More options (examples):
-                mag                              find and load all TICv8 columns containing magnitudes
-                ['parallax', 'radial_velocity']  find and load columns with those strings
-                ['default','OBS','mag']          find and load all default columns + all columns from OBS + all magnitudes
-             The full list of available keys can be seen by calling 'self.keys'.
-        path : str, optional
-            Path to where the catalog (feather) file is stored on your computer. 
-            The default is None.
+            The table columns you want returned, see self.get().
 
         Returns
         -------
-        None.
+        df2 : pandas.DataFrame
+            The members, sorted by decreasing probability, with an 
+            additional column 'association_prob'. The index holds the row 
+            positions in the catalog. Empty if there are no such targets.
         """
         
-        #::: savefile storing the path to the catalog file
-        savefile = os.path.join( os.path.dirname(os.path.abspath(__file__)), 'tess_infos_path.txt' )
+        names, rows, matrix = self._banyan()
+        keys2 = self._translate_keys(keys)
+        prob = matrix[:, self._association_columns(names, association)].max(axis=1, initial=0)
         
-        #::: if given, set the path to the catalog file
-        if path is not None:
-            with open(savefile, 'w') as sf:
-                sf.write(path)
+        members = np.flatnonzero(prob >= min_prob)
+        members = members[np.argsort(-prob[members], kind='stable')][:top]
+        df2 = self._take(rows[members], keys2)
+        df2.index = rows[members]
+        df2['association_prob'] = prob[members]
+        return df2
+    
+    
+    
+    def _build_cells(self):
+        """
+        Build the cells of the summary cube: one per (sector, camera, CCD) combination.
+
+        Returns
+        -------
+        cells : dict of arrays
+            'code' (int64) the sector/camera/CCD code of each cell (sorted,
+            see _observation_code()); 'cell' (int32) the cell of each 
+            observation (see self._observations()); 'n_targets' and 
+            'n_young' (int64) the number of targets per cell, and of those 
+            whose BANYAN_BEST_HYP is a young association (not 'FIELD').
+        """
         
-        #::: read the path to the catalog file
-        with open(savefile, 'r') as sf:
-            path = sf.read()
+        obs = self._observations()
+        codes, cell = np.unique(_observation_code(obs['sector'], obs['camera'], obs['ccd']), return_inverse=True)
+        hyp = self._column('BANYAN_BEST_HYP')
+        young = (hyp.notna() & (hyp.astype(object) != 'FIELD')).to_numpy(dtype=bool)
+        return {'code': codes,
+                'cell': cell.astype(np.int32),
+                'n_targets': np.bincount(cell, minlength=len(codes)).astype(np.int64),
+                'n_young': np.bincount(cell, weights=young[obs['row']], minlength=len(codes)).astype(np.int64)}
+    
+    
+    
+    def _build_cell_values(self, key):
+        """
+        Aggregate one numeric key over the cells of the summary cube (see self._build_cells()).
+
+        Returns
+        -------
+        values : dict of arrays
+            'count', 'sum', 'min', 'max' of the key per cell (NaN if empty), 
+            'bins' the histogram bin edges (see HISTOGRAM_BINS; otherwise 20 
+            equal bins over the full range), and 'hist' (cells x bins) the 
+            number of values per bin.
+        """
         
-        #::: translate input into keys
-        keys = self._translate_keys(keys)
-        self.keys = keys
-                
-        #::: 15.8 seconds to load all
-        # f = '/Users/mx/Dropbox (Personal)/Science/TESS/TESS_SC_target_lists/unique_targets_S001-S023_obs_tic_gaia_banyan.csv.gz'
-        # self.data = pd.read_csv(f, dtype=str, usecols=keys)
+        obs = self._observations()
+        cells = self._aggregate_cells()
+        n_cells = len(cells['code'])
         
-        #::: 11.8 seconds to load all
-        # f = '/Users/mx/Dropbox (Personal)/Science/TESS/TESS_SC_target_lists/unique_targets_S001-S023_obs_tic_gaia_banyan.h5'
-        # self.data = pd.read_hdf(f, dtype=str, usecols=keys)
+        values = self._column(key).to_numpy(dtype=float, na_value=np.nan)[obs['row']]
+        valid = np.isfinite(values)
+        cell, values = cells['cell'][valid], values[valid]
+        groups = pd.Series(values).groupby(cell)
         
-        #::: 8.2 seconds to load all
-        # f = '/Users/mx/Dropbox (Personal)/Science/TESS/TESS_SC_target_lists/unique_targets_S001-S023_obs_tic_gaia_banyan.feather'
-        # self.data = pd.read_feather(f, columns=keys)
+        bins = HISTOGRAM_BINS.get(key, None)
+        if bins is None:
+            bins = np.linspace(values.min(), values.max(), 21) if len(values) > 0 else np.linspace(0., 1., 21)
+        n_bins = len(bins) - 1
+        ind = np.searchsorted(bins, values, side='right') - 1
+        ind[values == bins[-1]] = n_bins - 1
+        inside = (ind >= 0) & (ind < n_bins)
+        hist = np.bincount(cell[inside].astype(np.int64)*n_bins + ind[inside], minlength=n_cells*n_bins).reshape(n_cells, n_bins)
         
-        ## TO DO ## 
-        ## ADD LINK TO DOWNLOAD FROM WHEREEVER THE CATALOG WILL BE STORED   
-        try:
-            self.data = pd.read_feather(path, columns=keys)
-        except:
-            print('WARNING:',
-                  '--------',
-                  'No catalog found.',
-                  'The following path was searched:',
-                  path,
-                  'You can permanently change this path by calling the function once as catalog(path=blabla).',
-                  'Simply replace blabla with the path were you stored the catalog.',
-                  'If you do not have the latest catalog, please first download it here:',
-                  'https://www.dropbox.com/s/kx5w4xombyvf4tg/unique_targets_S001-S026_obs_tic_gaia_banyan.feather?dl=0',
-                  sep='\n')
-
+        return {'count': np.bincount(cell, minlength=n_cells).astype(np.int64),
+                'sum': np.bincount(cell, weights=values, minlength=n_cells),
+                'min': groups.min().reindex(np.arange(n_cells)).to_numpy(dtype=float),
+                'max': groups.max().reindex(np.arange(n_cells)).to_numpy(dtype=float),
+                'bins': np.asarray(bins, dtype=float),
+                'hist': hist.astype(np.int64)}
+    
+    
+    
+    def _aggregate_cells(self, key=None):
+        """
+        Get the summary cube (key=None), or the aggregates of one key over its cells 
+        (built once, and cached to disk).
+        """
+        
+        if key is None:
+            name, build = 'aggregate_cells', self._build_cells
+        else:
+            if key not in KEY_POSITION:
+                raise KeyError('Unknown key: '+str(key)+'. The full list of available keys can be seen by calling catalog.get_all_keys().')
+            name, build = 'aggregate_'+key, lambda: self._build_cell_values(key)
+        if name not in self._aggregate_cache:
+            self._aggregate_cache[name] = self._cached(name, build)
+        return self._aggregate_cache[name]
+    
+    
+    
+    def _rollup(self, by, columns):
+        """
+        Combine the cells of the summary cube into groups.
 
+        Parameters
+        ----------
+        by : str or list of str
+            Any of 'sector', 'camera', 'ccd' (see AGGREGATE_BY); None or [] for one group.
+        columns : dict
+            Per-cell arrays, each with how to combine them: {name: (array, 'sum'/'min'/'max')}.
 
-    def _translate_keys(self, keys):
+        Returns
+        -------
+        df : pandas.DataFrame
+            One row per group, indexed by the by-dimensions.
         """
-        Translate the user-input into the actual keys.
+        
+        by = [] if by is None else [by] if isinstance(by, str) else list(by)
+        unknown = [b for b in by if b not in AGGREGATE_BY]
+        if len(unknown) > 0:
+            raise ValueError('Unknown dimension(s) in by: '+', '.join(map(str, unknown))+'. Options are '+', '.join(AGGREGATE_BY)+'.')
+        
+        code = self._aggregate_cells()['code']
+        dims = {'sector': code >> 16, 'camera': (code >> 8) & 255, 'ccd': code & 255}
+        cells = pd.DataFrame({name: array for name, (array, _) in columns.items()})
+        how = {name: how for name, (_, how) in columns.items()}
+        groups = [pd.Series(dims[b], name=b) for b in by] if len(by) > 0 else np.zeros(len(code), dtype=int)
+        df = cells.groupby(groups).agg(how)
+        return df.set_axis(['all']) if len(by) == 0 else df
+    
+    
+    
+    def aggregate(self, by='sector', values=SUMMARY_KEYS, stats=('count', 'mean', 'min', 'max')):
+        """
+        Get aggregates per sector, camera and/or CCD, without touching the rows.
+        
+        Everything is precomputed once per (sector, camera, CCD) cell from 
+        the observation table (see self.observations()), and cached to 
+        disk; coarser groups are combined from these cells, so queries 
+        take milliseconds.
 
         Parameters
         ----------
-        keys : str or list of str
-            See above.
+        by : str or list of str, optional
+            Any of 'sector', 'camera', 'ccd'; None for the whole catalog. 
+            The default is 'sector'.
+        values : str or list of str, optional
+            The numeric keys to aggregate (full key names). 
+            The default is SUMMARY_KEYS, i.e. 'TICv8_Tmag' and 'TICv8_Teff'.
+        stats : str or list of str, optional
+            Any of 'count' (non-null values), 'sum', 'mean', 'min', 'max'.
+            The default is ('count', 'mean', 'min', 'max').
 
         Returns
         -------
-        list of str
+        df2 : pandas.DataFrame
+            One row per group, indexed by the by-dimensions, with the 
+            columns 'n_targets', 'n_young' (targets whose BANYAN_BEST_HYP
+            is a young association), and key+'_'+stat for all values and 
+            stats. Without 'sector' in by, a target counts once per sector
+            in which it was observed.
         """
         
-        if (keys is None) or (keys == 'default'):
-            return self.get_default_keys() # return the default keys (a light-weight version)
+        values = [values] if isinstance(values, str) else list(values)
+        stats = [stats] if isinstance(stats, str) else list(stats)
+        unknown = [s for s in stats if s not in ('count', 'sum', 'mean', 'min', 'max')]
+        if len(unknown) > 0:
+            raise ValueError('Unknown stat(s): '+', '.join(map(str, unknown))+'. Options are count, sum, mean, min, max.')
         
-        elif (keys == 'all') or (keys == '*'):
-            return self.get_all_keys() # return all keys
-                                                                                                                                
-        else:                                                                                                                                
-            keys = list(np.atleast_1d(keys)) # make sure the user-input is now a list
-
-            if ('all' in keys) or ('*' in keys):
-                return self.get_all_keys()  # return all keys
-            
-            else: 
-                #::: create a list of the actual keys, chosen by which ones match the user-given substrings
-                keys2 = [] 
-                for k in keys:
-                    if k == 'default':
-                        keys2.append(self.get_default_keys())
-                    else:
-                        for ak in self.get_all_keys():
-                            if k in ak:
-                                keys2.append(ak)
-                
-                #::: always include TIC_ID and OBS_Sector
-                keys2.insert(0, 'TIC_ID')
-                keys2.insert(1, 'OBS_Sector')
+        cells = self._aggregate_cells()
+        columns = {'n_targets': (cells['n_targets'], 'sum'), 'n_young': (cells['n_young'], 'sum')}
+        for key in values:
+            agg = self._aggregate_cells(key)
+            columns[key+'_count'] = (agg['count'], 'sum')
+            columns[key+'_sum'] = (agg['sum'], 'sum')
+            columns[key+'_min'] = (agg['min'], 'min')
+            columns[key+'_max'] = (agg['max'], 'max')
+        df2 = self._rollup(by, columns)
         
-                #::: ensure they are unique (luser-proof)
-                keys2 = list(set(keys2))
+        for key in values:
+            df2[key+'_mean'] = df2[key+'_sum'] / df2[key+'_count'].where(df2[key+'_count'] > 0)
+        return df2[['n_targets', 'n_young'] + [key+'_'+stat for key in values for stat in stats]]
+    
+    
+    
+    def summary(self, by='sector'):
+        """
+        Get the standard monitoring summary per sector, camera and/or CCD.
+
+        Parameters
+        ----------
+        by : str or list of str, optional
+            See self.aggregate(). The default is 'sector'.
+
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            The number of targets and young candidates, and the mean, min 
+            and max of each of SUMMARY_KEYS (Tmag and Teff), per group.
+        """
         
-                #::: sort them in the same order as self.get_all_keys()
-                keys2 = [x for x in self.get_all_keys() if (x in keys2)] 
-                
-                return keys2
+        return self.aggregate(by=by, values=SUMMARY_KEYS, stats=('mean', 'min', 'max'))
     
     
     
-    def get(self, tic_id=None, sector=None, keys=None):
+    def histogram(self, key, by='sector'):
         """
+        Get the binned histogram of a numeric key per sector, camera and/or CCD.
+
         Parameters
         ----------
-        tic_id : int, optional
-             The TESS Input Catalog ID for an object.
-        sector : list, optional
-             The sectors you want to search for stars.
-        keys : list, optional
-             The table columns you want returned. 
-             Options:
-                None / 'default'   defaults to self.default_keys
-                '*' / 'all'        load all columns
-                'OBS'              load all columns starting with OBS_
-                                   (the TESS observing information)
-                'TICv8'            load all columns starting with TICv8_
-                                   (TESS Input Catalog version 8)
-                'GAIADR2'          load all columns starting with GAIADR2_
-                                   (Gaia Data Release 2 information)
-                'BANYAN'           load all columns starting with BANYAN_
-                                   (BANYAN Sigma information)
-             More options (examples):
-                mag                              find and load all TICv8 columns containing magnitudes
-                ['parallax', 'radial_velocity']  find and load columns with those strings
-                ['default','OBS','mag']          find and load all default columns + all columns from OBS + all magnitudes
-             The full list of available keys can be seen by calling 'self.keys'.
+        key : str
+            The full key name, e.g. 'TICv8_Tmag'. The bins are fixed (see 
+            HISTOGRAM_BINS), or 20 equal bins over the full range of the key.
+        by : str or list of str, optional
+            See self.aggregate(). The default is 'sector'.
 
         Returns
         -------
         df2 : pandas.DataFrame
+            One row per group, one column per bin (named '[left, right)'), 
+            holding the number of targets in it.
+        """
+        
+        agg = self._aggregate_cells(key)
+        bins = agg['bins']
+        names = ['[{:g}, {:g})'.format(left, right) for left, right in zip(bins[:-1], bins[1:])]
+        return self._rollup(by, {name: (agg['hist'][:, i], 'sum') for i, name in enumerate(names)})
+    
+    
+    
+    def _build_comoving_tree(self):
+        """
+        Build a KD-tree over the Gaia DR2 positions (as unit vectors) of all 
+        targets with a full astrometric solution and a positive parallax.
+
+        Returns
+        -------
+        tree : scipy.spatial.cKDTree
+        rows : array of int
+            The row position in the catalog of each point in the tree.
+        astrometry : array of float, shape (N, 6)
+            pmra, pmdec, parallax, and their errors (GAIADR2_*_error) of 
+            each point in the tree, in mas/yr and mas.
+        """
+        
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            raise ImportError('find_comoving() and find_comoving_pairs() need scipy; please install it via "pip install scipy".')
+        
+        keys = ['GAIADR2_pmra', 'GAIADR2_pmdec', 'GAIADR2_parallax', 'GAIADR2_pmra_error', 'GAIADR2_pmdec_error', 'GAIADR2_parallax_error']
+        astrometry = np.column_stack([self._column(key).to_numpy(dtype=float, na_value=np.nan) for key in keys])
+        xyz = _radec_to_xyz(self._column('GAIADR2_ra').to_numpy(dtype=float, na_value=np.nan), 
+                            self._column('GAIADR2_dec').to_numpy(dtype=float, na_value=np.nan))
+        valid = np.isfinite(xyz).all(axis=1) & np.isfinite(astrometry).all(axis=1) & (astrometry[:,2] > 0)
+        return cKDTree(xyz[valid]), np.flatnonzero(valid), astrometry[valid]
+    
+    
+    
+    def _comoving_tree(self):
+        """
+        Get the KD-tree for the comoving search (built once, and cached to disk).
+        """
+        
+        if getattr(self, '_comoving_tree_cache', None) is None:
+            self._comoving_tree_cache = self._cached('comoving_tree', self._build_comoving_tree)
+        return self._comoving_tree_cache
+    
+    
+    
+    def _comoving_candidates(self, points, max_separation, max_dv, n_sigma):
         """
+        Find the comoving companions of the given points of the comoving tree.
+
+        Parameters
+        ----------
+        points : array of int
+            The points in the tree (see self._comoving_tree()).
+        max_separation, max_dv, n_sigma : 
+            See self.find_comoving().
 
-        #::: default
-        df2 = self.data
+        Returns
+        -------
+        k : array of int
+            The position in points of each match.
+        j : array of int
+            The companions (points in the tree; never the point itself).
+        separation : array of float
+            The angular separation in arcsec.
+        separation_pc : array of float
+            The projected separation in pc, at the distance of points[k].
+        pm_diff, parallax_diff : array of float
+            The differences of the proper motions (in mas/yr) and the 
+            parallaxes (in mas).
+        """
+        
+        tree, _, astrometry = self._comoving_tree()
+        
+        #::: all neighbours within the projected separation, at the distance of each point
+        angle = max_separation * astrometry[points, 2] / 1000.
+        chord = 2. * np.sin( np.minimum(angle, np.pi) / 2. )
+        matches = tree.query_ball_point(tree.data[points], chord, workers=self.n_threads)
+        lengths = np.array([len(m) for m in matches], dtype=np.int64)
+        k = np.repeat(np.arange(len(points)), lengths)
+        j = np.concatenate([np.asarray(m, dtype=np.int64) for m in matches]) if lengths.sum() > 0 else np.array([], dtype=np.int64)
+        i = points[k]
+        keep = (i != j)
+        k, i, j = k[keep], i[keep], j[keep]
+        
+        #::: the same motion and distance, within the errors plus the allowed physical differences
+        #::: (a velocity difference max_dv, and a depth along the line of sight of max_separation)
+        a, b = astrometry[i], astrometry[j]
+        plx = (a[:,2] + b[:,2]) / 2.
+        pm_diff = np.hypot(a[:,0] - b[:,0], a[:,1] - b[:,1])
+        pm_error = np.sqrt(a[:,3]**2 + b[:,3]**2 + a[:,4]**2 + b[:,4]**2)
+        parallax_diff = np.abs(a[:,2] - b[:,2])
+        parallax_error = np.sqrt(a[:,5]**2 + b[:,5]**2)
+        keep = (pm_diff <= n_sigma*pm_error + max_dv*plx/KAPPA) & (parallax_diff <= n_sigma*parallax_error + plx**2*max_separation/1000.)
+        k, i, j, pm_diff, parallax_diff = k[keep], i[keep], j[keep], pm_diff[keep], parallax_diff[keep]
+        
+        d = np.linalg.norm(tree.data[i] - tree.data[j], axis=1)
+        separation = 2. * np.arcsin(np.minimum(d/2., 1.))
+        separation_pc = separation * 1000. / astrometry[i, 2]
+        return k, j, np.rad2deg(separation) * 3600., separation_pc, pm_diff, parallax_diff
+    
+    
+    
+    def find_comoving(self, tic_id, max_separation=1., max_dv=2., n_sigma=3., keys=None):
+        """
+        Find comoving companions of targets: other targets at a small projected
+        separation, with the same proper motion and parallax (Gaia DR2).
+        
+        The positional search runs on a KD-tree over all targets with full 
+        astrometry (built once, and cached to disk); proper motions and 
+        parallaxes are then compared on the candidates only.
 
+        Parameters
+        ----------
+        tic_id : int or list of int
+            The TESS Input Catalog ID(s).
+        max_separation : float, optional
+            The maximum projected separation in pc (at the distance of the 
+            target); also the allowed difference in depth along the line of 
+            sight. The default is 1.
+        max_dv : float, optional
+            The allowed difference in tangential velocity in km/s (e.g. 
+            orbital motion), on top of the errors. The default is 2.
+        n_sigma : float, optional
+            The allowed differences in proper motion and parallax, in units 
+            of their combined errors (GAIADR2_pmra_error, GAIADR2_pmdec_error, 
+            GAIADR2_parallax_error). The default is 3.
+        keys : list, optional
+            The table columns you want returned, see self.get().
 
-        #::: translate user-input into keys                                                                                                                                          
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            One row per companion, with the additional columns 'input_index'
+            (the position in tic_id), 'row' (the row position in the 
+            catalog), 'separation' (in arcsec), 'separation_pc', 'pm_diff' 
+            (in mas/yr) and 'parallax_diff' (in mas), sorted by input_index,
+            then separation. Targets without companions (or without full 
+            astrometry) are not included.
+        """
+        
+        _, tree_rows, _ = self._comoving_tree()
         keys2 = self._translate_keys(keys)
+        
+        #::: the points of the requested targets in the tree
+        rows = self._lookup_tic_rows(tic_id)
+        pos = np.minimum(np.searchsorted(tree_rows, rows), max(len(tree_rows)-1, 0))
+        found = (tree_rows[pos] == rows) & (rows >= 0) if len(tree_rows) > 0 else np.zeros(len(rows), dtype=bool)
+        points = pos[found]
+        
+        k, j, separation, separation_pc, pm_diff, parallax_diff = self._comoving_candidates(points, max_separation, max_dv, n_sigma)
+        input_index = np.flatnonzero(found)[k]
+        
+        #::: sort by input_index, then separation
+        order = np.lexsort((separation, input_index))
+        companions = tree_rows[j[order]]
+        df2 = self._take(companions, keys2)
+        df2.index = pd.RangeIndex(len(df2))
+        df2.insert(0, 'input_index', input_index[order])
+        df2.insert(1, 'row', companions)
+        df2['separation'] = separation[order]
+        df2['separation_pc'] = separation_pc[order]
+        df2['pm_diff'] = pm_diff[order]
+        df2['parallax_diff'] = parallax_diff[order]
+        return df2
+    
+    
+    
+    def find_comoving_pairs(self, max_separation=1., max_dv=2., n_sigma=3.):
+        """
+        Find all comoving pairs in the whole catalog (see self.find_comoving()).
+        
+        The targets are searched in batches (see COMOVING_BATCH), so the 
+        memory stays bounded.
 
+        Parameters
+        ----------
+        max_separation, max_dv, n_sigma : 
+            See self.find_comoving(). A pair is included if either target 
+            finds the other one.
 
-        #::: filter by tic_id(s), select only requested rows
-        if tic_id is not None: 
-            tic_id = [str(int(t)) for t in np.atleast_1d(tic_id)]
-            df2 = df2.loc[df2['TIC_ID'].isin(list(tic_id))]
-            df2 = pd.merge(pd.DataFrame(data=tic_id,columns=['TIC_ID_requested'],dtype=str), df2, left_on='TIC_ID_requested', right_on='TIC_ID', how='left')
-            # df2 = df2.iloc[pd.Index(df2['TIC_ID']).get_indexer(list(tic_id))]
+        Returns
+        -------
+        df2 : pandas.DataFrame
+            One row per pair, with the columns 'TIC_ID_1', 'TIC_ID_2', 
+            'row_1', 'row_2' (the row positions in the catalog, row_1 < 
+            row_2), 'separation' (in arcsec), 'separation_pc' (at the 
+            distance of the nearer target), 'pm_diff' (in mas/yr) and 
+            'parallax_diff' (in mas), sorted by row_1, then row_2.
+        """
         
+        tree, tree_rows, _ = self._comoving_tree()
         
-        #::: filter by sector(s), select only requested rows
-        if sector is not None: 
-            ind = [False]*len(df2)
-            sector = [str(x) for x in np.atleast_1d(sector)]
-            for i in range(len(df2)):
-                a = list(set(sector) & set(df2['OBS_Sector'][i].split(';')))
-                if len(a)>0: ind[i] = True
-            df2 = df2[ind]
-            
-            
-        if len(df2[keys2]) == 0:
-            print("This combination of TIC ID/Sectors is incorrect.")
-            return None
-        else:
-            return df2[keys2]
-    
-    
-    
-    def get_all_keys(self):
-        return ['TIC_ID',
-                 'OBS_TICID',
-                 'OBS_Tmag',
-                 'OBS_RA',
-                 'OBS_Dec',
-                 'OBS_Sector',
-                 'OBS_Camera',
-                 'OBS_CCD',
-                 'TICv8_ID',
-                 'TICv8_version',
-                 'TICv8_HIP',
-                 'TICv8_TYC',
-                 'TICv8_UCAC',
-                 'TICv8_TWOMASS',
-                 'TICv8_SDSS',
-                 'TICv8_ALLWISE',
-                 'TICv8_GAIA',
-                 'TICv8_APASS',
-                 'TICv8_KIC',
-                 'TICv8_objType',
-                 'TICv8_typeSrc',
-                 'TICv8_ra',
-                 'TICv8_dec',
-                 'TICv8_POSflag',
-                 'TICv8_pmRA',
-                 'TICv8_e_pmRA',
-                 'TICv8_pmDEC',
-                 'TICv8_e_pmDEC',
-                 'TICv8_PMflag',
-                 'TICv8_plx',
-                 'TICv8_e_plx',
-                 'TICv8_PARflag',
-                 'TICv8_gallong',
-                 'TICv8_gallat',
-                 'TICv8_eclong',
-                 'TICv8_eclat',
-                 'TICv8_Bmag',
-                 'TICv8_e_Bmag',
-                 'TICv8_Vmag',
-                 'TICv8_e_Vmag',
-                 'TICv8_umag',
-                 'TICv8_e_umag',
-                 'TICv8_gmag',
-                 'TICv8_e_gmag',
-                 'TICv8_rmag',
-                 'TICv8_e_rmag',
-                 'TICv8_imag',
-                 'TICv8_e_imag',
-                 'TICv8_zmag',
-                 'TICv8_e_zmag',
-                 'TICv8_Jmag',
-                 'TICv8_e_Jmag',
-                 'TICv8_Hmag',
-                 'TICv8_e_Hmag',
-                 'TICv8_Kmag',
-                 'TICv8_e_Kmag',
-                 'TICv8_TWOMflag',
-                 'TICv8_prox',
-                 'TICv8_w1mag',
-                 'TICv8_e_w1mag',
-                 'TICv8_w2mag',
-                 'TICv8_e_w2mag',
-                 'TICv8_w3mag',
-                 'TICv8_e_w3mag',
-                 'TICv8_w4mag',
-                 'TICv8_e_w4mag',
-                 'TICv8_GAIAmag',
-                 'TICv8_e_GAIAmag',
-                 'TICv8_Tmag',
-                 'TICv8_e_Tmag',
-                 'TICv8_TESSflag',
-                 'TICv8_SPFlag',
-                 'TICv8_Teff',
-                 'TICv8_e_Teff',
-                 'TICv8_logg',
-                 'TICv8_e_logg',
-                 'TICv8_MH',
-                 'TICv8_e_MH',
-                 'TICv8_rad',
-                 'TICv8_e_rad',
-                 'TICv8_mass',
-                 'TICv8_e_mass',
-                 'TICv8_rho',
-                 'TICv8_e_rho',
-                 'TICv8_lumclass',
-                 'TICv8_lum',
-                 'TICv8_e_lum',
-                 'TICv8_d',
-                 'TICv8_e_d',
-                 'TICv8_ebv',
-                 'TICv8_e_ebv',
-                 'TICv8_numcont',
-                 'TICv8_contratio',
-                 'TICv8_disposition',
-                 'TICv8_duplicate_id',
-                 'TICv8_priority',
-                 'TICv8_eneg_EBV',
-                 'TICv8_epos_EBV',
-                 'TICv8_EBVflag',
-                 'TICv8_eneg_Mass',
-                 'TICv8_epos_Mass',
-                 'TICv8_eneg_Rad',
-                 'TICv8_epos_Rad',
-                 'TICv8_eneg_rho',
-                 'TICv8_epos_rho',
-                 'TICv8_eneg_logg',
-                 'TICv8_epos_logg',
-                 'TICv8_eneg_lum',
-                 'TICv8_epos_lum',
-                 'TICv8_eneg_dist',
-                 'TICv8_epos_dist',
-                 'TICv8_distflag',
-                 'TICv8_eneg_Teff',
-                 'TICv8_epos_Teff',
-                 'TICv8_TeffFlag',
-                 'TICv8_gaiabp',
-                 'TICv8_e_gaiabp',
-                 'TICv8_gaiarp',
-                 'TICv8_e_gaiarp',
-                 'TICv8_gaiaqflag',
-                 'TICv8_starchareFlag',
-                 'TICv8_VmagFlag',
-                 'TICv8_BmagFlag',
-                 'TICv8_splists',
-                 'TICv8_e_RA',
-                 'TICv8_e_Dec',
-                 'TICv8_RA_orig',
-                 'TICv8_Dec_orig',
-                 'TICv8_e_RA_orig',
-                 'TICv8_e_Dec_orig',
-                 'TICv8_raddflag',
-                 'TICv8_wdflag',
-                 'TICv8_objID',
-                 'GAIADR2_source_id',
-                 'GAIADR2_random_index',
-                 'GAIADR2_ref_epoch',
-                 'GAIADR2_ra',
-                 'GAIADR2_ra_error',
-                 'GAIADR2_dec',
-                 'GAIADR2_dec_error',
-                 'GAIADR2_parallax',
-                 'GAIADR2_parallax_error',
-                 'GAIADR2_parallax_over_error',
-                 'GAIADR2_pmra',
-                 'GAIADR2_pmra_error',
-                 'GAIADR2_pmdec',
-                 'GAIADR2_pmdec_error',
-                 'GAIADR2_ra_dec_corr',
-                 'GAIADR2_ra_parallax_corr',
-                 'GAIADR2_ra_pmra_corr',
-                 'GAIADR2_ra_pmdec_corr',
-                 'GAIADR2_dec_parallax_corr',
-                 'GAIADR2_dec_pmra_corr',
-                 'GAIADR2_dec_pmdec_corr',
-                 'GAIADR2_parallax_pmra_corr',
-                 'GAIADR2_parallax_pmdec_corr',
-                 'GAIADR2_pmra_pmdec_corr',
-                 'GAIADR2_astrometric_n_obs_al',
-                 'GAIADR2_astrometric_n_obs_ac',
-                 'GAIADR2_astrometric_n_good_obs_al',
-                 'GAIADR2_astrometric_n_bad_obs_al',
-                 'GAIADR2_astrometric_gof_al',
-                 'GAIADR2_astrometric_chi2_al',
-                 'GAIADR2_astrometric_excess_noise',
-                 'GAIADR2_astrometric_excess_noise_sig',
-                 'GAIADR2_astrometric_params_solved',
-                 'GAIADR2_astrometric_primary_flag',
-                 'GAIADR2_astrometric_weight_al',
-                 'GAIADR2_astrometric_pseudo_colour',
-                 'GAIADR2_astrometric_pseudo_colour_error',
-                 'GAIADR2_mean_varpi_factor_al',
-                 'GAIADR2_astrometric_matched_observations',
-                 'GAIADR2_visibility_periods_used',
-                 'GAIADR2_astrometric_sigma5d_max',
-                 'GAIADR2_frame_rotator_object_type',
-                 'GAIADR2_matched_observations',
-                 'GAIADR2_duplicated_source',
-                 'GAIADR2_phot_g_n_obs',
-                 'GAIADR2_phot_g_mean_flux',
-                 'GAIADR2_phot_g_mean_flux_error',
-                 'GAIADR2_phot_g_mean_flux_over_error',
-                 'GAIADR2_phot_g_mean_mag',
-                 'GAIADR2_phot_bp_n_obs',
-                 'GAIADR2_phot_bp_mean_flux',
-                 'GAIADR2_phot_bp_mean_flux_error',
-                 'GAIADR2_phot_bp_mean_flux_over_error',
-                 'GAIADR2_phot_bp_mean_mag',
-                 'GAIADR2_phot_rp_n_obs',
-                 'GAIADR2_phot_rp_mean_flux',
-                 'GAIADR2_phot_rp_mean_flux_error',
-                 'GAIADR2_phot_rp_mean_flux_over_error',
-                 'GAIADR2_phot_rp_mean_mag',
-                 'GAIADR2_phot_bp_rp_excess_factor',
-                 'GAIADR2_phot_proc_mode',
-                 'GAIADR2_bp_rp',
-                 'GAIADR2_bp_g',
-                 'GAIADR2_g_rp',
-                 'GAIADR2_radial_velocity',
-                 'GAIADR2_radial_velocity_error',
-                 'GAIADR2_rv_nb_transits',
-                 'GAIADR2_rv_template_teff',
-                 'GAIADR2_rv_template_logg',
-                 'GAIADR2_rv_template_fe_h',
-                 'GAIADR2_phot_variable_flag',
-                 'GAIADR2_l',
-                 'GAIADR2_b',
-                 'GAIADR2_ecl_lon',
-                 'GAIADR2_ecl_lat',
-                 'GAIADR2_priam_flags',
-                 'GAIADR2_teff_val',
-                 'GAIADR2_teff_percentile_lower',
-                 'GAIADR2_teff_percentile_upper',
-                 'GAIADR2_a_g_val',
-                 'GAIADR2_a_g_percentile_lower',
-                 'GAIADR2_a_g_percentile_upper',
-                 'GAIADR2_e_bp_min_rp_val',
-                 'GAIADR2_e_bp_min_rp_percentile_lower',
-                 'GAIADR2_e_bp_min_rp_percentile_upper',
-                 'GAIADR2_flame_flags',
-                 'GAIADR2_radius_val',
-                 'GAIADR2_radius_percentile_lower',
-                 'GAIADR2_radius_percentile_upper',
-                 'GAIADR2_lum_val',
-                 'GAIADR2_lum_percentile_lower',
-                 'GAIADR2_lum_percentile_upper',
-                 'BANYAN_TIC_ID',
-                 'BANYAN_YA_PROB',
-                 'BANYAN_LIST_PROB_YAS',
-                 'BANYAN_BEST_HYP',
-                 'BANYAN_BEST_YA']
-    
-    
-    
-    def get_default_keys(self):
-        return ['TIC_ID',
-                 'OBS_Sector',
-                 'TICv8_TWOMASS',
-                 'TICv8_GAIA',
-                 'TICv8_ra',
-                 'TICv8_dec',
-                 'TICv8_pmRA',
-                 'TICv8_e_pmRA',
-                 'TICv8_pmDEC',
-                 'TICv8_e_pmDEC',
-                 'TICv8_plx',
-                 'TICv8_e_plx',
-                 'TICv8_Vmag',
-                 'TICv8_Kmag',
-                 'TICv8_GAIAmag',
-                 'TICv8_Tmag',
-                 'TICv8_Teff',
-                 'TICv8_e_Teff',
-                 'TICv8_logg',
-                 'TICv8_e_logg',
-                 'TICv8_MH',
-                 'TICv8_e_MH',
-                 'TICv8_rad',
-                 'TICv8_e_rad',
-                 'TICv8_mass',
-                 'TICv8_e_mass',
-                 'TICv8_rho',
-                 'TICv8_e_rho',
-                 'TICv8_lumclass',
-                 'TICv8_lum',
-                 'TICv8_e_lum',
-                 'TICv8_d',
-                 'TICv8_e_d',
-                 'TICv8_ebv',
-                 'TICv8_e_ebv',
-                 'TICv8_contratio',
-                 'TICv8_disposition',
-                 'TICv8_gaiabp',
-                 'TICv8_gaiarp',
-                 'TICv8_e_RA',
-                 'TICv8_e_Dec',
-                 'GAIADR2_radial_velocity',
-                 'GAIADR2_radial_velocity_error',
-                 'BANYAN_YA_PROB',
-                 'BANYAN_BEST_HYP']
-    
-    
-
-    def get_magnitude_keys(self):
-        return ['TICv8_Bmag',
-                 'TICv8_e_Bmag',
-                 'TICv8_Vmag',
-                 'TICv8_e_Vmag',
-                 'TICv8_umag',
-                 'TICv8_e_umag',
-                 'TICv8_gmag',
-                 'TICv8_e_gmag',
-                 'TICv8_rmag',
-                 'TICv8_e_rmag',
-                 'TICv8_imag',
-                 'TICv8_e_imag',
-                 'TICv8_zmag',
-                 'TICv8_e_zmag',
-                 'TICv8_Jmag',
-                 'TICv8_e_Jmag',
-                 'TICv8_Hmag',
-                 'TICv8_e_Hmag',
-                 'TICv8_Kmag',
-                 'TICv8_e_Kmag',
-                 'TICv8_TWOMflag',
-                 'TICv8_prox',
-                 'TICv8_w1mag',
-                 'TICv8_e_w1mag',
-                 'TICv8_w2mag',
-                 'TICv8_e_w2mag',
-                 'TICv8_w3mag',
-                 'TICv8_e_w3mag',
-                 'TICv8_w4mag',
-                 'TICv8_e_w4mag',
-                 'TICv8_GAIAmag',
-                 'TICv8_e_GAIAmag',
-                 'TICv8_Tmag',
-                 'TICv8_e_Tmag']
+        #::: all companions of all points, batch by batch
+        results = []
+        for start in range(0, max(tree.n, 1), COMOVING_BATCH):
+            k, *matches = self._comoving_candidates(np.arange(start, min(start+COMOVING_BATCH, tree.n)), max_separation, max_dv, n_sigma)
+            results.append([start + k] + matches)
+        i, j, separation, separation_pc, pm_diff, parallax_diff = [np.concatenate(arrays) for arrays in zip(*results)]
+        
+        #::: each pair only once (found from either side; keep the smaller projected separation)
+        first, second = np.minimum(i, j), np.maximum(i, j)
+        order = np.lexsort((separation_pc, second, first))
+        unique = np.r_[True, (first[order][1:] != first[order][:-1]) | (second[order][1:] != second[order][:-1])] if len(order) > 0 else np.array([], dtype=bool)
+        order = order[unique]
+        
+        rows_1, rows_2 = tree_rows[first[order]], tree_rows[second[order]]
+        tic = self._take(np.r_[rows_1, rows_2], ['TIC_ID'])['TIC_ID'].to_numpy()
+        return pd.DataFrame({'TIC_ID_1': tic[:len(rows_1)], 
+                             'TIC_ID_2': tic[len(rows_1):],
+                             'row_1': rows_1, 
+                             'row_2': rows_2, 
+                             'separation': separation[order],
+                             'separation_pc': separation_pc[order],
+                             'pm_diff': pm_diff[order],
+                             'parallax_diff': parallax_diff[order]})
+    
+    
+    
+    @staticmethod
+    def get_all_keys():
+        return list(ALL_KEYS)
+    
+    
+    
+    @staticmethod
+    def get_schema():
+        """
+        Returns
+        -------
+        schema : dict
+            The dtype of each key: 'Int64' (nullable integers) for all IDs 
+            and counts, 'category' for flags, 'str' for lists and 
+            designations, 'float32' for magnitudes, and 'float64' for 
+            everything else.
+        """
+        return dict(SCHEMA)
+    
+    
+    
+    @staticmethod
+    def get_default_keys():
+        return list(DEFAULT_KEYS)
+    
+    
+
+    @staticmethod
+    def get_magnitude_keys():
+        return list(MAGNITUDE_KEYS)
 
 
 
 if __name__ == '__main__':
-    t0 = timer()
-    cat = catalog()
-    t1 = timer()
-    print('took',t1-t0,'s')
+    cat = catalog(stats=True)
+    print(cat.stats)
     print(cat.data)
 
 
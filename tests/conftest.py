@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures of the tests: a small synthetic catalog (see tess_infos.synthetic),
+written in every storage format, and its observations exploded in plain Python.
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import shutil
+import pandas as pd
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import convert_catalog, convert_to_dataset
+from tess_infos.synthetic import make_catalog
+
+
+
+
+@pytest.fixture(scope='session', autouse=True)
+def stored_path():
+    """
+    catalog(path=...) permanently saves its path, so restore the stored one afterwards.
+    """
+    savefile = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tess_infos', 'tess_infos_path.txt')
+    stored = open(savefile).read() if os.path.isfile(savefile) else None
+    yield
+    if stored is not None:
+        with open(savefile, 'w') as f:
+            f.write(stored)
+
+
+
+@pytest.fixture(scope='session')
+def raw():
+    """
+    The synthetic catalog, with all columns as strings (like the original catalog file),
+    and some IDs missing as empty strings.
+    """
+    raw = make_catalog(n_rows=3000, seed=7)
+    raw.loc[::7, ['TICv8_GAIA', 'GAIADR2_source_id', 'TICv8_Teff']] = ''
+    return raw
+
+
+
+@pytest.fixture(scope='session')
+def files(raw, tmp_path_factory):
+    """
+    The synthetic catalog in all storage formats: all strings (strings.feather), typed 
+    (typed.feather), typed and uncompressed (uncompressed.feather), and as a partitioned dataset.
+    """
+    workdir = str(tmp_path_factory.mktemp('catalog'))
+    raw.to_feather(os.path.join(workdir, 'strings.feather'))
+    convert_catalog(os.path.join(workdir, 'strings.feather'), os.path.join(workdir, 'typed.feather'))
+    convert_catalog(os.path.join(workdir, 'strings.feather'), os.path.join(workdir, 'uncompressed.feather'), compression='uncompressed')
+    convert_to_dataset(os.path.join(workdir, 'typed.feather'), os.path.join(workdir, 'dataset'), row_group_size=500)
+    return workdir
+
+
+
+@pytest.fixture
+def fresh(files, tmp_path):
+    """
+    A private copy of the typed and uncompressed catalog files and of the dataset, for tests that change them.
+    """
+    shutil.copy(os.path.join(files, 'typed.feather'), str(tmp_path / 'typed.feather'))
+    shutil.copy(os.path.join(files, 'uncompressed.feather'), str(tmp_path / 'uncompressed.feather'))
+    shutil.copytree(os.path.join(files, 'dataset'), str(tmp_path / 'dataset'))
+    return str(tmp_path)
+
+
+
+@pytest.fixture(scope='session')
+def reference_observations(raw):
+    """
+    All observations of the all-string catalog, exploded in plain Python.
+    """
+    entries = []
+    for row, (tic, sectors, cameras, ccds) in enumerate(raw[['TIC_ID', 'OBS_Sector', 'OBS_Camera', 'OBS_CCD']].itertuples(index=False)):
+        if not isinstance(sectors, str) or (sectors == ''):
+            continue
+        sectors = sectors.split(';')
+        cameras = cameras.split(';') if isinstance(cameras, str) and (len(cameras.split(';')) == len(sectors)) else ['0']*len(sectors)
+        ccds = ccds.split(';') if isinstance(ccds, str) and (len(ccds.split(';')) == len(sectors)) else ['0']*len(sectors)
+        for s, c, d in zip(sectors, cameras, ccds):
+            entries.append((row, int(tic), int(s), int(c), int(d)))
+    return pd.DataFrame(entries, columns=['row', 'TIC_ID', 'sector', 'camera', 'ccd'])
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the precomputed summary cube (see catalog.aggregate(), catalog.summary() 
+and catalog.histogram()), against a plain pandas groupby over all observations.
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog, HISTOGRAM_BINS
+
+
+
+
+@pytest.fixture(scope='module')
+def observed(raw, reference_observations):
+    """
+    All observations, with the values of their targets.
+    """
+    obs = reference_observations.copy()
+    for key in ['TICv8_Tmag', 'TICv8_Teff', 'GAIADR2_pmra']:
+        obs[key] = pd.to_numeric(raw[key], errors='coerce').to_numpy()[obs['row']]
+    hyp = raw['BANYAN_BEST_HYP'].to_numpy(dtype=object)[obs['row']]
+    obs['young'] = [isinstance(h, str) and (h not in ('', 'FIELD')) for h in hyp]
+    obs['all'] = 'all'
+    return obs
+
+
+
+@pytest.mark.parametrize('filename, kwargs', [('typed.feather', {}), ('typed.feather', {'lazy': True}), ('dataset', {})])
+def test_aggregate(files, observed, filename, kwargs):
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    for by in ['sector', ['camera', 'ccd'], ['sector', 'camera', 'ccd'], None]:
+        got = cat.aggregate(by=by, values=['TICv8_Tmag', 'GAIADR2_pmra'], stats=['count', 'sum', 'mean', 'min', 'max'])
+        groups = observed.groupby('all' if by is None else by)
+        assert got['n_targets'].tolist() == groups.size().tolist()
+        assert got['n_young'].tolist() == groups['young'].sum().tolist()
+        for key in ['TICv8_Tmag', 'GAIADR2_pmra']:
+            for stat in ['count', 'sum', 'mean', 'min', 'max']:
+                np.testing.assert_allclose(got[key+'_'+stat].to_numpy(dtype=float), groups[key].agg(stat).to_numpy(dtype=float), rtol=1e-5, err_msg=key+'_'+stat)
+        if by is not None:
+            assert list(got.index) == list(groups.size().index)
+    
+    #::: the summary is a fixed selection of the aggregates
+    pd.testing.assert_frame_equal(cat.summary(by='camera'), cat.aggregate(by='camera', stats=['mean', 'min', 'max']))
+    
+    with pytest.raises(ValueError):
+        cat.aggregate(stats='median')
+    with pytest.raises(KeyError):
+        cat.aggregate(values='nonsense')
+
+
+
+@pytest.mark.parametrize('filename, kwargs', [('typed.feather', {}), ('dataset', {})])
+def test_histogram(files, observed, filename, kwargs):
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    
+    #::: fixed bins, or 20 equal bins over the full range
+    bins = {'TICv8_Tmag': HISTOGRAM_BINS['TICv8_Tmag'], 
+            'GAIADR2_pmra': np.linspace(observed['GAIADR2_pmra'].min(), observed['GAIADR2_pmra'].max(), 21)}
+    for key in bins:
+        for by in ['sector', ['camera', 'ccd']]:
+            got = cat.histogram(key, by=by)
+            assert got.shape[1] == len(bins[key]) - 1
+            assert got.columns[0] == '[{:g}, {:g})'.format(bins[key][0], bins[key][1])
+            expected = observed.groupby(by)[key].apply(lambda v: np.histogram(v.dropna(), bins=bins[key])[0])
+            np.testing.assert_array_equal(got.to_numpy(), np.stack(expected.to_numpy()))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the background loading and the asyncio interface 
+(see catalog(background=True), catalog.aload(), catalog.aget()).
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import asyncio
+import pandas as pd
+
+#::: my modules
+from tess_infos.tess_infos import catalog
+
+
+
+
+#::: the queries issued while the keys are still loading
+QUERIES = [{'sector': 3, 'keys': 'all'},
+           {'where': ('GAIADR2_pmra', '>', 0), 'keys': 'BANYAN'},
+           {'keys': 'default'}]
+
+
+
+
+def test_background(raw, files):
+    path = os.path.join(files, 'typed.feather')
+    eager = catalog(path=path)
+    tics = [int(t) for t in raw['TIC_ID'].iloc[::301]]
+    
+    cat = catalog(path=path, background=True)
+    assert {'TIC_ID', 'OBS_Sector'} <= set(cat.keys)
+    for query in QUERIES + [{'tic_id': tics, 'keys': 'all'}]:
+        pd.testing.assert_frame_equal(cat.get(**query), eager.get(**query))
+    assert cat.wait_loaded(timeout=60)
+    
+    #::: in the end, exactly like a catalog loaded at once
+    assert cat.keys == eager.keys
+    pd.testing.assert_frame_equal(cat.data, eager.data)
+    
+    #::: reloading stops the loader, and starts a new one
+    cat.reload()
+    assert cat.wait_loaded(timeout=60)
+    assert cat.keys == eager.keys
+    
+    #::: only the requested keys
+    cat = catalog(path=path, keys='default', background=True)
+    assert cat.wait_loaded(timeout=60)
+    assert cat.keys == catalog(path=path, keys='default').keys
+    assert catalog(path=path).wait_loaded()
+
+
+
+def test_asyncio(raw, files):
+    path = os.path.join(files, 'typed.feather')
+    eager = catalog(path=path)
+    
+    async def main():
+        cat = await catalog.aload(path=path)
+        results = await asyncio.gather(*[cat.aget(**query) for query in QUERIES])
+        done = await cat.await_loaded()
+        return cat, results, done
+    
+    cat, results, done = asyncio.run(main())
+    assert done
+    for query, result in zip(QUERIES, results):
+        pd.testing.assert_frame_equal(result, eager.get(**query))
+    assert cat.keys == eager.keys
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the parsed BANYAN Sigma probabilities (see catalog.banyan_probabilities() 
+and catalog.get_association()), against the BANYAN_LIST_PROB_YAS strings parsed in plain Python.
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import numpy as np
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog
+
+
+
+
+@pytest.fixture(scope='module')
+def reference_banyan(raw):
+    """
+    {row: {association: probability}} for all targets with any association probability.
+    """
+    probs = {}
+    for row, packed in enumerate(raw['BANYAN_LIST_PROB_YAS']):
+        if isinstance(packed, str) and (packed != ''):
+            probs[row] = {name.strip(): float(p.rstrip(')')) for name, p in (item.split('(') for item in packed.split(';'))}
+    return probs
+
+
+
+@pytest.mark.parametrize('filename, kwargs', [('typed.feather', {}), ('typed.feather', {'lazy': True}), ('dataset', {})])
+def test_banyan_probabilities(raw, files, reference_banyan, filename, kwargs):
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    ref = reference_banyan
+    names = sorted(set(name for p in ref.values() for name in p))
+    assert cat.get_associations() == names
+    
+    #::: all targets with any probability (matched by TIC ID, as a dataset stores the rows in another order)
+    got = cat.banyan_probabilities()
+    assert list(got.columns) == names
+    tics = cat.get(keys='TIC_ID')['TIC_ID'].to_numpy()
+    got.index = tics[got.index]
+    assert sorted(got.index) == sorted(int(raw['TIC_ID'].iloc[row]) for row in ref)
+    for row, p in ref.items():
+        expected = [p.get(name, 0.) for name in names]
+        np.testing.assert_allclose(got.loc[int(raw['TIC_ID'].iloc[row])].to_numpy(), expected, rtol=1e-6)
+    
+    #::: selected targets (in their order, NaN if unknown) and associations (case-insensitive)
+    rows = sorted(ref)[:3] + [0]
+    query = [int(raw['TIC_ID'].iloc[row]) for row in rows] + [42]
+    association = list(ref[rows[0]])[0]
+    got = cat.banyan_probabilities(tic_id=query, associations=[association.lower(), names[-1]])
+    assert list(got.columns) == [association, names[-1]]
+    assert list(got.index) == list(range(len(query)))
+    for i, row in enumerate(rows):
+        np.testing.assert_allclose(got.iloc[i].to_numpy(), [ref.get(row, {}).get(name, 0.) for name in got.columns], rtol=1e-6)
+    assert got.iloc[-1].isna().all()
+    
+    with pytest.raises(KeyError, match='NONSENSE'):
+        cat.banyan_probabilities(associations='nonsense')
+
+
+
+@pytest.mark.parametrize('filename, kwargs', [('typed.feather', {}), ('dataset', {})])
+def test_get_association(raw, files, reference_banyan, filename, kwargs):
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    ref = reference_banyan
+    names = cat.get_associations()
+    
+    for association, min_prob, top in [(names[0], 0.5, None), (names[:4], 0.1, None), (names, 0., 5)]:
+        got = cat.get_association(association, min_prob=min_prob, top=top, keys=['TIC_ID', 'TICv8_Tmag'])
+        prob = {int(raw['TIC_ID'].iloc[row]): max([p.get(name, 0.) for name in np.atleast_1d(association)]) for row, p in ref.items()}
+        expected = sorted([tic for tic, pr in prob.items() if pr >= min_prob], key=lambda tic: -prob[tic])[:top]
+        assert np.all(np.diff(got['association_prob']) <= 0)
+        np.testing.assert_allclose(got['association_prob'], [prob[tic] for tic in expected], rtol=1e-6)
+        assert sorted(got['TIC_ID']) == sorted(expected)
+    
+    assert len(cat.get_association(names[0], min_prob=1.1)) == 0
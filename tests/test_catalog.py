@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of tess_infos.catalog on a small synthetic catalog (see tess_infos.synthetic).
+
+The results of catalog.get() are checked against the original string and
+merge logic, for every storage backend, together with ingested deltas,
+compaction, and the rebuilding of the cache.
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog, ingest, compact, SCHEMA, _delta_dir
+
+
+
+
+#::: the storage backends: which file to open, and how (the files are written in conftest.py)
+BACKENDS = {'strings': ('strings.feather', {}),
+            'typed': ('typed.feather', {}),
+            'lazy': ('typed.feather', {'lazy': True}),
+            'memory_map': ('uncompressed.feather', {'memory_map': True}),
+            'memory_map_lazy': ('uncompressed.feather', {'memory_map': True, 'lazy': True}),
+            'dataset': ('dataset', {}),
+            'cache': ('typed.feather', {'cache': True, 'lazy': True})}
+
+#::: the modes in which ingested deltas must be visible
+DELTA_MODES = {'eager': {},
+               'lazy': {'lazy': True},
+               'memory_map': {'memory_map': True},
+               'cache': {'cache': True, 'lazy': True},
+               'dataset': {}}
+
+
+
+
+def reference_get(raw, tic_id=None, sector=None):
+    """
+    The original catalog.get(), on the all-string catalog.
+    """
+    df2 = raw
+    if tic_id is not None:
+        tic_id = [str(int(t)) for t in np.atleast_1d(tic_id)]
+        df2 = df2.loc[df2['TIC_ID'].isin(tic_id)]
+        df2 = pd.merge(pd.DataFrame(data=tic_id, columns=['TIC_ID_requested'], dtype=str), df2,
+                       left_on='TIC_ID_requested', right_on='TIC_ID', how='left')
+    if sector is not None:
+        sector = set(str(x) for x in np.atleast_1d(sector))
+        df2 = df2[[isinstance(s, str) and len(sector & set(s.split(';'))) > 0 for s in df2['OBS_Sector']]]
+    return df2
+
+
+
+def assert_same(got, expected, keys):
+    """
+    Compare typed results with all-string ones, key by key.
+    """
+    assert len(got) == len(expected)
+    for key in keys:
+        a, b = got[key].reset_index(drop=True), expected[key].reset_index(drop=True)
+        if SCHEMA[key] in ('float32', 'float64'):
+            np.testing.assert_allclose(a.to_numpy(dtype=float, na_value=np.nan), pd.to_numeric(b, errors='coerce').to_numpy(dtype=float), rtol=1e-6, err_msg=key)
+        else:
+            #::: integer IDs are compared exactly, as strings ('' is missing)
+            assert [None if pd.isna(v) else str(v) for v in a] == [None if (pd.isna(v) or (v == '')) else str(v) for v in b], key
+
+
+
+def by_tic(df):
+    """
+    The rows sorted by TIC_ID (a partitioned dataset stores the rows in another order).
+    """
+    return df.iloc[np.argsort(pd.to_numeric(df['TIC_ID']).to_numpy(dtype=float), kind='stable')]
+
+
+
+def tic_ids(raw, n=25):
+    """
+    Some TIC IDs of the catalog, plus an unknown one and a repeated one.
+    """
+    tics = [int(t) for t in raw['TIC_ID'].iloc[np.linspace(0, len(raw)-1, n).astype(int)]]
+    return tics + [42, tics[3]]
+
+
+
+
+@pytest.mark.parametrize('backend', list(BACKENDS))
+def test_get_tic_id(raw, files, backend):
+    filename, kwargs = BACKENDS[backend]
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    tics = tic_ids(raw)
+    got = cat.get(tic_id=tics, keys='all')
+    assert list(got.columns) == list(cat.get_all_keys())
+    assert_same(got, reference_get(raw, tic_id=tics), got.columns)
+
+
+
+@pytest.mark.parametrize('backend', list(BACKENDS))
+def test_get_sector(raw, files, backend):
+    filename, kwargs = BACKENDS[backend]
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    for sector in [1, [3, 7], 26]:
+        got = cat.get(sector=sector, keys='default')
+        expected = reference_get(raw, sector=sector)
+        if backend != 'dataset':
+            assert list(got.index) == list(expected.index)
+        assert_same(by_tic(got), by_tic(expected), got.columns)
+    tics = tic_ids(raw, n=300)
+    got = cat.get(tic_id=tics, sector=[3, 7], keys='default')
+    assert_same(got, reference_get(raw, tic_id=tics, sector=[3, 7]), got.columns)
+
+
+
+@pytest.mark.parametrize('backend', ['strings', 'typed', 'memory_map'])
+def test_get_unloaded_keys(raw, files, backend):
+    #::: like the original catalog.get(): keys that were not loaded raise a KeyError, instead of returning NaNs
+    filename, kwargs = BACKENDS[backend]
+    cat = catalog(path=os.path.join(files, filename), keys='default', **kwargs)
+    for query in [{'tic_id': tic_ids(raw)}, {'sector': 1}, {}]:
+        with pytest.raises(KeyError, match='GAIADR2_pmra'):
+            cat.get(keys='GAIADR2_pmra', **query)
+    assert len(cat.get(sector=1, keys='TICv8_Tmag')) == len(reference_get(raw, sector=1))
+
+
+
+@pytest.mark.parametrize('backend', list(BACKENDS))
+def test_get_where(raw, files, backend):
+    filename, kwargs = BACKENDS[backend]
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    tmag, teff = pd.to_numeric(raw['TICv8_Tmag']), pd.to_numeric(raw['TICv8_Teff'], errors='coerce')
+
+    got = cat.get(where=[('TICv8_Tmag', '<', 10), ('TICv8_Teff', 'between', (3000, 6000))], keys='default')
+    expected = raw[((tmag < 10) & (teff >= 3000) & (teff <= 6000)).to_numpy()]
+    assert_same(by_tic(got), by_tic(expected), got.columns)
+
+    got = cat.get(sector=[3, 7], where=('TICv8_Teff', 'isnull', None), keys='default')
+    expected = reference_get(raw, sector=[3, 7])
+    assert_same(by_tic(got), by_tic(expected[pd.to_numeric(expected['TICv8_Teff'], errors='coerce').isna().to_numpy()]), got.columns)
+
+    #::: no matches at all
+    assert cat.get(where=('TICv8_Tmag', '<', -50)) is None
+
+
+
+
+@pytest.mark.parametrize('backend', ['strings', 'typed', 'memory_map'])
+def test_get_where_unloaded_keys(raw, files, backend):
+    #::: predicates on keys that were not loaded raise a KeyError (instead of matching against NaNs),
+    #::: also if no rows are left by the previous predicates
+    filename, kwargs = BACKENDS[backend]
+    cat = catalog(path=os.path.join(files, filename), keys='default', **kwargs)
+    for where in [('GAIADR2_pmra', '>', 0), ('GAIADR2_pmra', 'isnull', None), [('TICv8_Tmag', '<', -50), ('GAIADR2_pmra', '>', 0)]]:
+        with pytest.raises(KeyError, match='GAIADR2_pmra'):
+            cat.get(where=where, keys='TICv8_Tmag')
+    
+    #::: a lazy catalog loads them on first use
+    cat = catalog(path=os.path.join(files, filename), keys='default', lazy=True, **kwargs)
+    pmra = pd.to_numeric(raw['GAIADR2_pmra'], errors='coerce')
+    assert len(cat.get(where=('GAIADR2_pmra', '>', 0), keys='TICv8_Tmag')) == (pmra > 0).sum()
+    assert len(cat.get(where=('GAIADR2_pmra', 'isnull', None), keys='TICv8_Tmag')) == pmra.isna().sum()
+
+
+
+
+@pytest.mark.parametrize('mode', list(DELTA_MODES))
+def test_deltas(raw, files, fresh, mode):
+    filename = {'memory_map': 'uncompressed.feather', 'dataset': 'dataset'}.get(mode, 'typed.feather')
+    path = os.path.join(fresh, filename)
+    old, new = int(raw['TIC_ID'].iloc[11]), 1234567890
+    ingest(pd.DataFrame({'TIC_ID': [old, new],
+                         'OBS_Sector': [raw['OBS_Sector'].iloc[11]+';27', '27'],
+                         'TICv8_Tmag': [-5., 9.25],
+                         'TICv8_GAIA': pd.array([None, 6917528443525529728], dtype='Int64')}), path=path)
+
+    def check(cat):
+        got = cat.get(tic_id=[old, new, 42], keys=['Tmag', 'GAIA'])
+        assert got['TICv8_Tmag'].iloc[:2].tolist() == [-5., 9.25]
+        assert got['TICv8_GAIA'].tolist()[:2] == [int(raw['TICv8_GAIA'].iloc[11]), 6917528443525529728]
+        assert got['TIC_ID'].isna().tolist() == [False, False, True]
+        assert set(cat.get(sector=27)['TIC_ID']) == {old, new}
+        bright = (pd.to_numeric(raw['TICv8_Tmag']) < 2).to_numpy(copy=True)
+        bright[11] = True
+        assert len(cat.get(keys='default', where=('TICv8_Tmag', '<', 2))) == bright.sum()
+        #::: (the updated value is outside the statistics of its row group in a dataset)
+        assert cat.get(where=('TICv8_Tmag', '<', -4))['TIC_ID'].tolist() == [old]
+        assert set(cat.get(where=('TICv8_Tmag', 'between', (9, 9.5)))['TIC_ID']) >= {new}
+
+    check(catalog(path=path, **DELTA_MODES[mode]))
+
+    #::: after compaction the deltas are part of the catalog file, and its compression is kept
+    compact(path)
+    assert not os.path.isdir(_delta_dir(path))
+    check(catalog(path=path, **DELTA_MODES[mode]))
+    if mode != 'dataset':
+        assert os.path.getsize(path) == pytest.approx(os.path.getsize(os.path.join(files, filename)), rel=0.01)
+
+
+
+def test_cache_rebuilt(raw, fresh):
+    path = os.path.join(fresh, 'typed.feather')
+    tic = int(raw['TIC_ID'].iloc[5])
+    assert catalog(path=path, cache=True, lazy=True).get(tic_id=tic, keys='Tmag')['TICv8_Tmag'].iloc[0] \
+        == pytest.approx(float(raw['TICv8_Tmag'].iloc[5]), rel=1e-6)
+
+    #::: rewrite the catalog file with a changed value
+    df = pd.read_feather(path)
+    df.loc[5, 'TICv8_Tmag'] = 3.25
+    df.to_feather(path)
+    for kwargs in [{'lazy': True}, {'memory_map': True}]:
+        cat = catalog(path=path, cache=True, **kwargs)
+        assert cat.get(tic_id=tic, keys='Tmag')['TICv8_Tmag'].iloc[0] == 3.25
+
+    #::: and again after an ingested delta
+    ingest(pd.DataFrame({'TIC_ID': [tic], 'TICv8_Tmag': [4.5]}), path=path)
+    assert catalog(path=path, cache=True, lazy=True).get(tic_id=tic, keys='Tmag')['TICv8_Tmag'].iloc[0] == 4.5
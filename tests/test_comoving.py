@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the comoving-companion search (see catalog.find_comoving() and 
+catalog.find_comoving_pairs()), against a brute-force comparison of all targets.
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+#::: my modules
+import tess_infos.tess_infos as ti
+
+pytest.importorskip('scipy')
+
+
+
+
+#::: generous limits, so that the small test catalog has plenty of companions
+LIMITS = {'max_separation': 30., 'max_dv': 20., 'n_sigma': 3.}
+
+
+
+
+def brute_force(data, max_separation, max_dv, n_sigma):
+    """
+    All companions of all targets with full astrometry, as a set of (row, companion row).
+    """
+    get = lambda key: data[key].to_numpy(dtype=float, na_value=np.nan)
+    ra, dec = np.deg2rad(get('GAIADR2_ra')), np.deg2rad(get('GAIADR2_dec'))
+    pmra, pmdec, plx = get('GAIADR2_pmra'), get('GAIADR2_pmdec'), get('GAIADR2_parallax')
+    e_pmra, e_pmdec, e_plx = get('GAIADR2_pmra_error'), get('GAIADR2_pmdec_error'), get('GAIADR2_parallax_error')
+    valid = np.flatnonzero(np.isfinite(np.column_stack([ra, dec, pmra, pmdec, plx, e_pmra, e_pmdec, e_plx])).all(axis=1) & (plx > 0))
+    
+    pairs = set()
+    for i in valid:
+        j = valid[valid != i]
+        angle = np.arccos(np.clip(np.sin(dec[i])*np.sin(dec[j]) + np.cos(dec[i])*np.cos(dec[j])*np.cos(ra[j]-ra[i]), -1, 1))
+        p = (plx[i] + plx[j]) / 2.
+        ok = (angle <= max_separation*plx[i]/1000.) \
+            & (np.hypot(pmra[j]-pmra[i], pmdec[j]-pmdec[i]) <= n_sigma*np.sqrt(e_pmra[i]**2 + e_pmra[j]**2 + e_pmdec[i]**2 + e_pmdec[j]**2) + max_dv*p/ti.KAPPA) \
+            & (np.abs(plx[j]-plx[i]) <= n_sigma*np.sqrt(e_plx[i]**2 + e_plx[j]**2) + p**2*max_separation/1000.)
+        pairs.update((int(i), int(k)) for k in j[ok])
+    return pairs
+
+
+
+@pytest.fixture(scope='module')
+def companions(files):
+    return brute_force(ti.catalog(path=os.path.join(files, 'typed.feather')).data, **LIMITS)
+
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'lazy': True}])
+def test_find_comoving(raw, files, companions, kwargs):
+    cat = ti.catalog(path=os.path.join(files, 'typed.feather'), **kwargs)
+    targets = sorted(set(i for i, _ in companions))[:20]
+    tics = [int(raw['TIC_ID'].iloc[i]) for i in targets] + [42, int(raw['TIC_ID'].iloc[targets[0]])]
+    got = cat.find_comoving(tics, keys='TIC_ID', **LIMITS)
+    assert len(got) > 0
+    for n, tic in enumerate(tics):
+        rows = np.flatnonzero(pd.to_numeric(raw['TIC_ID']).to_numpy() == tic)
+        expected = set(j for i, j in companions if (len(rows) > 0) and (i == rows[0]))
+        assert set(got.loc[got['input_index'] == n, 'row']) == expected
+    assert got['TIC_ID'].tolist() == [int(raw['TIC_ID'].iloc[r]) for r in got['row']]
+    
+    #::: sorted by input_index, then separation
+    assert np.all(np.diff(got['input_index']) >= 0)
+    for _, group in got.groupby('input_index'):
+        assert np.all(np.diff(group['separation']) >= 0)
+    assert len(cat.find_comoving(42)) == 0
+
+
+
+def test_find_comoving_pairs(files, companions, monkeypatch):
+    cat = ti.catalog(path=os.path.join(files, 'typed.feather'))
+    pairs = cat.find_comoving_pairs(**LIMITS)
+    assert set(zip(pairs['row_1'], pairs['row_2'])) == set((min(i, j), max(i, j)) for i, j in companions)
+    assert (pairs['row_1'] < pairs['row_2']).all()
+    assert pairs[['row_1', 'row_2']].equals(pairs[['row_1', 'row_2']].sort_values(['row_1', 'row_2']))
+    
+    #::: the same in small batches
+    monkeypatch.setattr(ti, 'COMOVING_BATCH', 97)
+    pd.testing.assert_frame_equal(ti.catalog(path=os.path.join(files, 'typed.feather')).find_comoving_pairs(**LIMITS), pairs)
+
+
+
+def test_find_comoving_delta(raw, fresh):
+    #::: a companion from an ingested delta, right next to a target with full astrometry
+    path = os.path.join(fresh, 'typed.feather')
+    cat = ti.catalog(path=path)
+    data = cat.data
+    i = int(np.flatnonzero((pd.to_numeric(data['GAIADR2_parallax']) > 1).to_numpy() & data['GAIADR2_pmra_error'].notna().to_numpy())[0])
+    twin = {key: [data[key].iloc[i]] for key in data.columns if key.startswith('GAIADR2_') and (key != 'GAIADR2_source_id')}
+    twin['GAIADR2_ra'] = [data['GAIADR2_ra'].iloc[i] + 1e-4]
+    ti.ingest(pd.DataFrame(dict(TIC_ID=[1234567890], **twin)), path=path)
+    cat.reload()
+    got = cat.find_comoving(int(data['TIC_ID'].iloc[i]), keys='TIC_ID')
+    assert 1234567890 in got['TIC_ID'].tolist()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the lookups by cross-identifier (Gaia DR2, 2MASS, HIP, TYC, KIC) in catalog.get().
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog, ingest
+
+
+
+
+#::: the backends on which the lookups are checked
+ID_BACKENDS = {'eager': ('typed.feather', {}),
+               'lazy': ('typed.feather', {'lazy': True}),
+               'memory_map': ('uncompressed.feather', {'memory_map': True}),
+               'dataset': ('dataset', {})}
+
+
+
+
+def known(raw, key, n=3):
+    """
+    The positions of n targets with a known identifier, spread over the catalog.
+    """
+    positions = np.flatnonzero((raw[key].notna() & (raw[key] != '')).to_numpy())
+    return positions[np.linspace(0, len(positions)-1, n).astype(int)]
+
+
+
+def tics_of(raw, positions):
+    return [int(raw['TIC_ID'].iloc[i]) if i is not None else None for i in positions]
+
+
+
+def looked_up(df):
+    return [None if pd.isna(t) else int(t) for t in df['TIC_ID']]
+
+
+
+@pytest.mark.parametrize('backend', list(ID_BACKENDS))
+def test_identifier_lookup(raw, files, backend):
+    filename, kwargs = ID_BACKENDS[backend]
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    
+    #::: Gaia DR2 IDs need all 19 digits, as numbers or strings with or without prefix
+    positions = known(raw, 'TICv8_GAIA')
+    gaia = [int(raw['TICv8_GAIA'].iloc[i]) for i in positions]
+    for query in [gaia + [1], [str(gaia[0]), 'Gaia DR2 '+str(gaia[1]), gaia[2], 1]]:
+        got = cat.get(gaia_id=query, keys='GAIA')
+        assert looked_up(got) == tics_of(raw, list(positions) + [None])
+        assert list(got.index) == list(range(4))
+    assert looked_up(cat.get(gaia_id=gaia[0]+1)) == [None]
+    
+    #::: the other identifiers, with their prefixes
+    for name, key, prefix in [('twomass', 'TICv8_TWOMASS', '2MASS J'), ('hip', 'TICv8_HIP', 'HIP '), ('tyc', 'TICv8_TYC', 'TYC '), ('kic', 'TICv8_KIC', 'KIC ')]:
+        positions = known(raw, key)
+        values = [str(raw[key].iloc[i]) for i in positions]
+        for query in [values, [prefix+v for v in values]]:
+            got = cat.get(keys='default', **{name: query[::-1]})
+            assert looked_up(got) == tics_of(raw, positions[::-1]), name
+    
+    #::: together with sector and where
+    positions = known(raw, 'TICv8_TWOMASS', n=50)
+    twomass = [str(raw['TICv8_TWOMASS'].iloc[i]) for i in positions]
+    got = cat.get(twomass=twomass, where=('TICv8_Tmag', '<', 12), keys='Tmag')
+    expected = [int(raw['TIC_ID'].iloc[i]) for i in positions if float(raw['TICv8_Tmag'].iloc[i]) < 12]
+    assert looked_up(got) == expected
+    
+    with pytest.raises(ValueError):
+        cat.get(tic_id=1, gaia_id=gaia[0])
+
+
+
+def test_identifier_shared_and_delta(raw, fresh):
+    #::: an identifier shared by two targets returns both, also right after an ingested delta
+    #::: (and the old identifier of the updated target is gone)
+    path = os.path.join(fresh, 'typed.feather')
+    cat = catalog(path=path, lazy=True)
+    cat.get(twomass=str(raw['TICv8_TWOMASS'].iloc[10]))
+    ingest(pd.DataFrame({'TIC_ID': [int(raw['TIC_ID'].iloc[20])], 'TICv8_TWOMASS': [raw['TICv8_TWOMASS'].iloc[10]]}), path=path)
+    cat.reload()
+    got = cat.get(twomass=['J'+raw['TICv8_TWOMASS'].iloc[10], raw['TICv8_TWOMASS'].iloc[20]], keys='TWOMASS')
+    assert list(got.index) == [0, 0, 1]
+    assert sorted(looked_up(got)[:2]) == sorted(tics_of(raw, [10, 20]))
+    assert looked_up(got)[2] is None
+    assert list(got['TICv8_TWOMASS'].iloc[:2]) == [raw['TICv8_TWOMASS'].iloc[10]]*2
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the per-target observation table (see catalog.observations() and 
+catalog.get_on_ccd()), against the exploded OBS_Sector, OBS_Camera and OBS_CCD strings 
+(see reference_observations in conftest.py).
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import numpy as np
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog
+
+
+
+
+def as_set(df):
+    return set(map(tuple, df[['TIC_ID', 'sector', 'camera', 'ccd']].astype(np.int64).to_numpy().tolist()))
+
+
+
+@pytest.mark.parametrize('filename, kwargs', [('typed.feather', {}), ('typed.feather', {'lazy': True}), ('dataset', {})])
+def test_observations(raw, files, reference_observations, filename, kwargs):
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    ref = reference_observations
+    
+    #::: all observations, sorted by sector, camera and CCD
+    got = cat.observations()
+    assert as_set(got) == as_set(ref)
+    assert len(got) == len(ref)
+    codes = got['sector'].to_numpy(dtype=np.int64)*100 + got['camera'].to_numpy(dtype=np.int64)*10 + got['ccd'].to_numpy(dtype=np.int64)
+    assert np.all(np.diff(codes) >= 0)
+    
+    #::: selections
+    for query in [{'sector': 14}, {'sector': [3, 20], 'camera': 2}, {'sector': 20, 'camera': 2, 'ccd': [3, 4]}, {'camera': 1, 'ccd': 1}]:
+        ind = np.ones(len(ref), dtype=bool)
+        for key, value in query.items():
+            ind &= ref[key].isin(np.atleast_1d(value)).to_numpy()
+        assert as_set(cat.observations(**query)) == as_set(ref[ind])
+    
+    #::: per target, in the order of tic_id, with the position in tic_id as index
+    tics = [int(t) for t in raw['TIC_ID'].iloc[[0, 6, 42]]] + [42, int(raw['TIC_ID'].iloc[0])]
+    got = cat.observations(tic_id=tics)
+    expected = [(i, t) for i, t in enumerate(tics) for _ in range((ref['TIC_ID'] == t).sum())]
+    assert list(zip(got.index, got['TIC_ID'])) == expected
+    assert as_set(got) == as_set(ref[ref['TIC_ID'].isin(tics)])
+    assert as_set(cat.observations(tic_id=tics, sector=ref['sector'].iloc[0])) == \
+        as_set(ref[ref['TIC_ID'].isin(tics) & (ref['sector'] == ref['sector'].iloc[0])])
+
+
+
+@pytest.mark.parametrize('filename, kwargs', [('typed.feather', {}), ('dataset', {})])
+def test_get_on_ccd(files, reference_observations, filename, kwargs):
+    cat = catalog(path=os.path.join(files, filename), **kwargs)
+    ref = reference_observations
+    for sector, camera, ccd in [(20, 2, 3), (1, None, None), ([5, 6], 4, None), (99, None, None)]:
+        ind = ref['sector'].isin(np.atleast_1d(sector)).to_numpy(copy=True)
+        if camera is not None:
+            ind &= (ref['camera'] == camera).to_numpy()
+        if ccd is not None:
+            ind &= (ref['ccd'] == ccd).to_numpy()
+        got = cat.get_on_ccd(sector, camera=camera, ccd=ccd, keys=['TIC_ID', 'TICv8_Tmag'])
+        assert sorted(got['TIC_ID']) == sorted(set(ref['TIC_ID'][ind]))
+        assert list(got.columns) == list(cat.get(tic_id=ref['TIC_ID'].iloc[0], keys=['TIC_ID', 'TICv8_Tmag']).columns)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the query APIs built on top of catalog.get(), on the synthetic catalog
+(see conftest.py): every result is checked against plain catalog.get() calls,
+or against a brute-force computation.
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog
+
+
+
+
+#::: the backends on which the query APIs are checked
+QUERY_BACKENDS = {'eager': ('typed.feather', {}),
+                  'lazy': ('typed.feather', {'lazy': True}),
+                  'memory_map': ('uncompressed.feather', {'memory_map': True}),
+                  'dataset': ('dataset', {})}
+
+
+
+
+def open_catalog(files, backend, **kwargs):
+    filename, kwargs2 = QUERY_BACKENDS[backend]
+    return catalog(path=os.path.join(files, filename), **dict(kwargs2, **kwargs))
+
+
+
+
+@pytest.mark.parametrize('backend', list(QUERY_BACKENDS))
+def test_get_many(raw, files, backend):
+    cat = open_catalog(files, backend)
+    tics = [int(t) for t in raw['TIC_ID'].iloc[[0, 17, 250, 1999, 2999]]]
+    requests = [(tics[0], 'Tmag'), 
+                ([tics[1], 42, tics[2]], 'default'), 
+                (tics[3], 'BANYAN'), 
+                ([tics[2], tics[2], tics[4]], 'Tmag')]
+    results = cat.get_many(requests)
+    assert len(results) == len(requests)
+    for (tic_id, keys), got in zip(requests, results):
+        pd.testing.assert_frame_equal(got, cat.get(tic_id=tic_id, keys=keys))
+    
+    #::: an empty request gives an empty result (where get() prints a message and returns None)
+    assert len(cat.get_many(requests+[([], 'Tmag')])[-1]) == 0
+    
+    #::: long form
+    long = cat.get_many(requests, concat=True)
+    assert list(long.index.get_level_values('request')) == [i for i, df in enumerate(results) for _ in range(len(df))]
+    pd.testing.assert_frame_equal(long.loc[1][results[1].columns], results[1])
+
+
+
+def angular_separation(ra1, dec1, ra2, dec2):
+    """
+    The angular separation (in arcsec) by the haversine formula, for the brute-force checks.
+    """
+    ra1, dec1, ra2, dec2 = [np.deg2rad(np.asarray(x, dtype=float)) for x in (ra1, dec1, ra2, dec2)]
+    h = np.sin((dec2-dec1)/2.)**2 + np.cos(dec1)*np.cos(dec2)*np.sin((ra2-ra1)/2.)**2
+    return np.rad2deg(2.*np.arcsin(np.sqrt(np.minimum(h, 1.)))) * 3600.
+
+
+
+@pytest.mark.parametrize('backend', list(QUERY_BACKENDS))
+def test_cone_search(raw, files, backend):
+    cat = open_catalog(files, backend)
+    ra, dec = pd.to_numeric(raw['TICv8_ra']).to_numpy(), pd.to_numeric(raw['TICv8_dec']).to_numpy()
+    radius = 10.*3600.
+    for ra0, dec0 in [(ra[100], dec[100]), (0.5, 89.9), (359.9, -3.)]:
+        got = cat.cone_search(ra0, dec0, radius, keys=['TIC_ID'])
+        sep = angular_separation(ra0, dec0, ra, dec)
+        expected = np.flatnonzero(sep <= radius)
+        assert sorted(got['TIC_ID']) == sorted(pd.to_numeric(raw['TIC_ID'].iloc[expected]))
+        assert np.all(np.diff(got['separation']) >= 0)
+        #::: (the index holds the row positions in the catalog file, which differ for a dataset, so match by TIC ID)
+        position = pd.Series(np.arange(len(raw)), index=pd.to_numeric(raw['TIC_ID']))
+        np.testing.assert_allclose(got['separation'], sep[position[got['TIC_ID']]], rtol=1e-6, atol=1e-3)
+    assert len(cat.cone_search(ra[100], dec[100], 1e-3)) == 1
+
+
+
+@pytest.mark.parametrize('backend', list(QUERY_BACKENDS))
+def test_crossmatch(raw, files, backend):
+    cat = open_catalog(files, backend)
+    ra, dec = pd.to_numeric(raw['TICv8_ra']).to_numpy(), pd.to_numeric(raw['TICv8_dec']).to_numpy()
+    ra0, dec0 = np.r_[ra[[5, 500, 2500]]+0.01, 180.], np.r_[dec[[5, 500, 2500]], 0.]
+    radius = 5.*3600.
+    got = cat.crossmatch(ra0, dec0, radius, keys='TIC_ID')
+    assert np.all(np.diff(got['input_index']) >= 0)
+    for i in range(len(ra0)):
+        sep = angular_separation(ra0[i], dec0[i], ra, dec)
+        assert sorted(got.loc[got['input_index'] == i, 'TIC_ID']) == sorted(pd.to_numeric(raw['TIC_ID'].iloc[np.flatnonzero(sep <= radius)]))
+    
+    #::: only the closest target per position
+    nearest = cat.crossmatch(ra0, dec0, radius, keys='TIC_ID', nearest=True)
+    for _, match in nearest.iterrows():
+        sep = angular_separation(ra0[match['input_index']], dec0[match['input_index']], ra, dec)
+        assert match['TIC_ID'] == int(raw['TIC_ID'].iloc[np.argmin(sep)])
+    assert set(nearest['input_index']) == set(got['input_index'])
+
+
+
+@pytest.mark.parametrize('backend', list(QUERY_BACKENDS))
+def test_iter_batches(raw, files, backend):
+    cat = open_catalog(files, backend)
+    tics = [int(t) for t in raw['TIC_ID'].iloc[::11]] + [42]
+    for query in [{}, {'sector': [3, 7]}, {'tic_id': tics}, {'where': ('TICv8_Tmag', '<', 10)}]:
+        expected = cat.get(keys='default', **query)
+        batches = list(cat.iter_batches(keys='default', batch_size=128, **query))
+        assert all(len(b) <= 128 for b in batches)
+        pd.testing.assert_frame_equal(pd.concat(batches), expected)
+        
+        #::: as Arrow record batches
+        batches = list(cat.iter_batches(keys='default', batch_size=128, arrow=True, **query))
+        assert sum(b.num_rows for b in batches) == len(expected)
+        assert batches[0].schema.names == list(expected.columns)
+
+
+
+@pytest.mark.parametrize('backend', ['eager', 'memory_map'])
+def test_iter_batches_unloaded_keys(files, backend):
+    #::: keys that were not loaded raise the same KeyError as in get(), already when calling iter_batches()
+    cat = open_catalog(files, backend, keys='default')
+    with pytest.raises(KeyError, match='GAIADR2_pmra'):
+        cat.get(sector=1, keys='GAIADR2_pmra')
+    with pytest.raises(KeyError, match='GAIADR2_pmra'):
+        cat.iter_batches(sector=1, keys='GAIADR2_pmra')
+    
+    #::: a lazy catalog reads them batch by batch instead
+    cat = open_catalog(files, backend, keys='default', lazy=True)
+    batches = list(cat.iter_batches(sector=1, keys='GAIADR2_pmra', batch_size=100))
+    pd.testing.assert_frame_equal(pd.concat(batches), cat.get(sector=1, keys='GAIADR2_pmra'))
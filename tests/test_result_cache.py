@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the LRU result cache of catalog.get() (see catalog(result_cache=...)).
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import pandas as pd
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog, ingest
+
+
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'lazy': True}])
+def test_result_cache_same_results(raw, files, kwargs):
+    path = os.path.join(files, 'typed.feather')
+    plain = catalog(path=path, **kwargs)
+    cached = catalog(path=path, result_cache=50, **kwargs)
+    in_sector_3 = raw['OBS_Sector'].str.split(';').apply(lambda s: '3' in s).to_numpy()
+    tics = [int(t) for t in raw['TIC_ID'].iloc[[3, 400, 1200, 2500]]] + [int(raw['TIC_ID'][in_sector_3].iloc[0])]
+    queries = [{'tic_id': tics + [42], 'keys': 'Tmag'},
+               {'tic_id': tics[::-1] + [42, tics[0]], 'keys': 'Tmag'},
+               {'tic_id': tics[1], 'keys': 'all'},
+               {'sector': [7, 3], 'keys': 'default'},
+               {'sector': [3, 7], 'keys': 'default'},
+               {'tic_id': tics, 'sector': [3, 7], 'keys': 'Tmag'},
+               {'where': [('TICv8_Tmag', 'between', (8, 9))], 'keys': 'default'}]
+    for _ in range(2):
+        for query in queries:
+            pd.testing.assert_frame_equal(cached.get(**query), plain.get(**query))
+    
+    #::: queries with the same set of TIC IDs (or sectors) share one entry
+    info = cached.result_cache_info()
+    assert (info['misses'], info['hits'], info['entries']) == (5, 2*len(queries)-5, 5)
+
+
+
+def test_result_cache_copies(raw, files):
+    cat = catalog(path=os.path.join(files, 'typed.feather'), result_cache=10)
+    tic = int(raw['TIC_ID'].iloc[9])
+    first = cat.get(tic_id=tic, keys='Tmag')
+    expected = first.copy()
+    first.loc[:, 'TICv8_Tmag'] = -99.
+    pd.testing.assert_frame_equal(cat.get(tic_id=tic, keys='Tmag'), expected)
+
+
+
+def test_result_cache_limits(raw, files):
+    cat = catalog(path=os.path.join(files, 'typed.feather'), result_cache=3)
+    for sector in [1, 2, 3, 1, 4]:
+        cat.get(sector=sector, keys='Tmag')
+    info = cat.result_cache_info()
+    assert (info['entries'], info['hits'], info['misses']) == (3, 1, 4)
+    
+    #::: sector 2 was the least recently used one, so it is gone
+    cat.get(sector=2, keys='Tmag')
+    assert cat.result_cache_info()['misses'] == 5
+    
+    #::: results larger than the byte limit are not kept at all
+    cat = catalog(path=os.path.join(files, 'typed.feather'), result_cache=10, result_cache_bytes=20000)
+    cat.get(keys='all')
+    cat.get(tic_id=int(raw['TIC_ID'].iloc[0]), keys='Tmag')
+    info = cat.result_cache_info()
+    assert info['entries'] == 1
+    assert 0 < info['bytes'] <= 20000
+    
+    cat.clear_result_cache()
+    assert cat.result_cache_info()['entries'] == 0
+    assert catalog(path=os.path.join(files, 'typed.feather')).result_cache_info() is None
+
+
+
+def test_result_cache_reload(raw, fresh):
+    path = os.path.join(fresh, 'typed.feather')
+    cat = catalog(path=path, result_cache=10)
+    tic = int(raw['TIC_ID'].iloc[9])
+    cat.get(tic_id=tic, keys='Tmag')
+    
+    #::: after an ingested delta and a reload, the stored results are dropped
+    ingest(pd.DataFrame({'TIC_ID': [tic], 'TICv8_Tmag': [4.5]}), path=path)
+    cat.reload()
+    assert cat.result_cache_info()['entries'] == 0
+    assert cat.get(tic_id=tic, keys='Tmag')['TICv8_Tmag'].iloc[0] == 4.5
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the local query server and its client (see tess_infos.server): 
+every answer must equal the one of the catalog itself.
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import threading
+import pandas as pd
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog
+from tess_infos.server import make_server, client
+
+
+
+
+@pytest.fixture(params=['port', 'unix_socket'])
+def served(files, tmp_path, request):
+    """
+    A lazy catalog, served in a background thread on a free port or on a Unix socket.
+    """
+    cat = catalog(path=os.path.join(files, 'typed.feather'), lazy=True)
+    if request.param == 'port':
+        server = make_server(cat, port=0)
+        address = {'port': server.server_address[1]}
+    else:
+        address = {'unix_socket': str(tmp_path / 'tess_infos.sock')}
+        server = make_server(cat, **address)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield cat, address
+    server.shutdown()
+    server.server_close()
+
+
+
+
+def test_server_same_results(raw, served):
+    cat, address = served
+    remote = client(**address)
+    assert remote.path == cat.path
+    tics = [int(t) for t in raw['TIC_ID'].iloc[::97]] + [42]
+    
+    for query in [{'tic_id': tics, 'keys': 'all'}, 
+                  {'sector': [3, 4], 'keys': ['Tmag', 'OBS']}, 
+                  {'where': [('TICv8_Tmag', '<', 10), ('TICv8_lumclass', '==', 'DWARF')]}]:
+        pd.testing.assert_frame_equal(remote.get(**query), cat.get(**query))
+    
+    requests = [(tics[:3], 'Tmag'), ([tics[5]], 'BANYAN'), (tics[1], 'Tmag')]
+    for got, expected in zip(remote.get_many(requests), cat.get_many(requests)):
+        pd.testing.assert_frame_equal(got, expected)
+    pd.testing.assert_frame_equal(pd.concat(remote.iter_batches(sector=5, keys='default', batch_size=100)), 
+                                  cat.get(sector=5, keys='default'))
+    pd.testing.assert_frame_equal(remote.cone_search(10., 10., 10*3600., keys='ra'), cat.cone_search(10., 10., 10*3600., keys='ra'))
+    assert remote.get(where=('TICv8_Tmag', '<', -50)) is None
+    
+    #::: a stream that is not read to its end, and the next request on the same client
+    batches = remote.iter_batches(sector=5, batch_size=10)
+    next(batches)
+    batches.close()
+    assert len(remote.get(tic_id=tics[0], keys='Tmag')) == 1
+
+
+
+def test_server_errors(served):
+    cat, address = served
+    remote = client(**address)
+    for func in [lambda: remote.get(where=('nonsense', '<', 1)), 
+                 lambda: remote.iter_batches(where=('nonsense', '<', 1)),
+                 lambda: remote.banyan_probabilities(associations=['nonsense'])]:
+        with pytest.raises(KeyError) as error:
+            func()
+        #::: the message itself, as raised by the catalog (not quoted again by the server)
+        assert error.value.args[0][0] != "'"
+        assert 'nonsense' in error.value.args[0].lower()
+    with pytest.raises(ValueError):
+        remote.get(where=('TICv8_Tmag', '~', 1))
+
+
+
+def test_server_parallel_requests(served):
+    cat, address = served
+    
+    #::: two requests that can only finish together: they time out if the server runs them one at a time
+    barrier = threading.Barrier(2, timeout=10)
+    def summary(by='sector'):
+        barrier.wait()
+        return pd.DataFrame({'by': [by]})
+    cat.summary = summary
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client(**address).summary(by='camera'))) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 2
+    
+    #::: many clients at once, on a lazy catalog that loads its keys on demand
+    del cat.summary
+    keys = ['Tmag', 'Teff', 'GAIA', 'BANYAN', 'pmra', 'OBS']
+    results = {}
+    def query(key):
+        results[key] = client(**address).get(sector=2, keys=key)
+    threads = [threading.Thread(target=query, args=(key,)) for key in keys]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for key in keys:
+        pd.testing.assert_frame_equal(results[key], cat.get(sector=2, keys=key))
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the timing and counter instrumentation (see catalog(stats=True) and catalog_stats).
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import json
+import logging
+import threading
+import pytest
+
+#::: my modules
+from tess_infos.tess_infos import catalog, catalog_stats
+
+
+
+
+def test_stats_off(files):
+    assert catalog(path=os.path.join(files, 'typed.feather')).stats is None
+
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'lazy': True}])
+def test_stats_calls_phases_counts(raw, files, kwargs):
+    cat = catalog(path=os.path.join(files, 'typed.feather'), stats=True, result_cache=5, **kwargs)
+    stats = cat.stats
+    assert isinstance(stats, catalog_stats)
+    assert stats.calls == {'load': 1}
+    assert {'read', 'schema', 'tic_index', 'load'} <= set(stats.seconds)
+    
+    n_sector = len(cat.get(sector=1, keys='TICv8_Tmag'))
+    cat.get(sector=1, keys='TICv8_Tmag')
+    n_where = len(cat.get(where=('TICv8_Tmag', '<', 10), keys='TICv8_Tmag'))
+    assert stats.calls == {'load': 1, 'get': 3}
+    assert {'translate_keys', 'select_sector', 'select_where', 'materialize', 'get'} <= set(stats.seconds)
+    assert all(sec >= 0 for sec in stats.seconds.values())
+    assert stats.counts['rows_returned'] == 2*n_sector + n_where
+    assert stats.counts['rows_scanned'] == 2*len(raw)
+    assert (stats.counts['result_cache_misses'], stats.counts['result_cache_hits']) == (2, 1)
+    
+    #::: the last call only
+    assert stats.last['operation'] == 'get'
+    assert stats.last['counts']['rows_returned'] == n_where
+    assert 'select_sector' not in stats.last['seconds']
+    
+    #::: everything as plain JSON, and back to zero
+    assert json.loads(json.dumps(stats.as_dict()))['calls'] == {'load': 1, 'get': 3}
+    assert 'get' in repr(stats)
+    stats.reset()
+    assert stats.as_dict() == {'calls': {}, 'seconds': {}, 'counts': {}, 'last': {}}
+
+
+
+def test_stats_log(files, caplog):
+    with caplog.at_level(logging.INFO, logger='tess_infos'):
+        cat = catalog(path=os.path.join(files, 'typed.feather'), log_stats=logging.INFO)
+        cat.get(sector=2, keys='TICv8_Tmag')
+    messages = [r.getMessage() for r in caplog.records if r.name == 'tess_infos']
+    assert messages[0].startswith('load: ')
+    assert messages[-1].startswith('get: ') and 'select_sector=' in messages[-1] and 'rows_returned=' in messages[-1]
+
+
+
+def test_stats_threads(files):
+    #::: concurrent queries each count as their own call, with their own phases
+    cat = catalog(path=os.path.join(files, 'typed.feather'), stats=True)
+    n_rows = sum(len(cat.get(sector=s, keys='TICv8_Tmag')) for s in range(1, 5))
+    cat.stats.reset()
+    threads = [threading.Thread(target=lambda: [cat.get(sector=s, keys='TICv8_Tmag') for s in range(1, 5)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cat.stats.calls['get'] == 16
+    assert cat.stats.counts['rows_returned'] == 4*n_rows
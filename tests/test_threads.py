@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the multi-threaded load, conversion and query paths (see catalog(n_threads=...)):
+they must give exactly the same results as a single thread.
+
+Usage:
+    python -m pytest tests
+
+@author:
+Maximilian N. Günther
+MIT Kavli Institute for Astrophysics and Space Research,
+Massachusetts Institute of Technology,
+77 Massachusetts Avenue,
+Cambridge, MA 02109,
+USA
+Email: maxgue@mit.edu
+Web: www.mnguenther.com
+"""
+
+from __future__ import print_function, division, absolute_import
+
+#::: modules
+import os
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+#::: my modules
+import tess_infos.tess_infos as ti
+
+
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """
+    Split up operations already from 256 rows on, so the small test catalog runs in parallel chunks.
+    """
+    monkeypatch.setattr(ti, 'PARALLEL_MIN_ROWS', 256)
+
+
+
+@pytest.mark.parametrize('filename, kwargs', [('strings.feather', {}),
+                                              ('typed.feather', {'lazy': True}),
+                                              ('uncompressed.feather', {'memory_map': True}),
+                                              ('dataset', {})])
+def test_threads_same_results(files, small_chunks, filename, kwargs):
+    path = os.path.join(files, filename)
+    single = ti.catalog(path=path, n_threads=1, **kwargs)
+    multi = ti.catalog(path=path, n_threads=3, **kwargs)
+    assert multi.n_threads == 3
+    for query in [{'keys': 'all'}, 
+                  {'sector': [1, 2, 3], 'keys': 'default'}, 
+                  {'where': [('TICv8_Tmag', '<', 12), ('TICv8_Teff', 'notnull', None)], 'keys': 'all'}]:
+        pd.testing.assert_frame_equal(multi.get(**query), single.get(**query))
+
+
+
+def test_threads_convert(files, small_chunks, tmp_path):
+    for n_threads in [1, 3]:
+        ti.convert_catalog(os.path.join(files, 'strings.feather'), str(tmp_path / ('typed_'+str(n_threads)+'.feather')), n_threads=n_threads)
+    pd.testing.assert_frame_equal(pd.read_feather(str(tmp_path / 'typed_3.feather')), pd.read_feather(str(tmp_path / 'typed_1.feather')))
+
+
+
+def test_threads_keep_pyarrow_pool(files, tmp_path):
+    #::: pyarrow's process-wide thread pool is never resized
+    before = pa.cpu_count()
+    for n_threads in [1, 2, 3, None]:
+        ti.catalog(path=os.path.join(files, 'typed.feather'), n_threads=n_threads)
+        ti.convert_catalog(os.path.join(files, 'strings.feather'), str(tmp_path / 'typed.feather'), n_threads=n_threads)
+        assert pa.cpu_count() == before